@@ -1,12 +1,13 @@
 from rest_framework import serializers
 from django.core.validators import MinLengthValidator
 from .models import User
-from django.urls import reverse
 from bloodbank.models import BloodGroup
 from universities.models import University, AcademicUnit, TeacherDesignation
 from django.core.exceptions import ValidationError as DjangoValidationError
+from campus_connect.prefetch import QuerysetPlanMixin
+from campus_connect.links import get_link_builder
 
-class SimpleUserSerializer(serializers.ModelSerializer):
+class SimpleUserSerializer(QuerysetPlanMixin, serializers.ModelSerializer):
     detail_url = serializers.SerializerMethodField()
 
     class Meta:
@@ -18,7 +19,7 @@ class SimpleUserSerializer(serializers.ModelSerializer):
         if request is None:
             return None
         try:
-            return request.build_absolute_uri(reverse('accounts:user-detail', kwargs={'pk': obj.pk}))
+            return get_link_builder(request).url('accounts:user-detail', obj.pk)
         except:
             return None
 
@@ -32,7 +33,7 @@ class UserListSerializer(serializers.ModelSerializer):
     def get_detail_url(self, obj):
         request = self.context.get('request')
         if request:
-            return request.build_absolute_uri(reverse('accounts:user-detail', args=[obj.id]))
+            return get_link_builder(request).url('accounts:user-detail', obj.id)
         return None
 
     def to_representation(self, instance):
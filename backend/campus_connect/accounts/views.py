@@ -10,7 +10,7 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.authtoken.models import Token
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from rest_framework.pagination import LimitOffsetPagination
+from campus_connect.pagination import KeysetPagination
 from .serializers import (
     RegisterSerializer, EmailVerificationSerializer, LoginSerializer, 
     UserSerializer, UserListSerializer, UserProfileSerializer
@@ -161,7 +161,8 @@ class UserListView(generics.ListAPIView):
     queryset = User.objects.all()
     serializer_class = UserListSerializer
     permission_classes = [IsAuthenticated]
-    pagination_class = LimitOffsetPagination
+    pagination_class = KeysetPagination
+    ordering = ('email',)
 
 class ProfileView(APIView):
     serializer_class = UserProfileSerializer
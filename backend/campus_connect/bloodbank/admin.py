@@ -21,7 +21,7 @@ class DonorAdmin(admin.ModelAdmin):
 
 @admin.register(BloodRequest)
 class BloodRequestAdmin(admin.ModelAdmin):
-    list_display = ['title', 'user', 'blood_group', 'request_date', 'location', 'status']
+    list_display = ['title', 'user', 'blood_group', 'request_date', 'location', 'status', 'donors_count']
     list_filter = ['status', 'blood_group', 'request_date']
     search_fields = ['title', 'description', 'user__email']
     autocomplete_fields = ['user', 'university']
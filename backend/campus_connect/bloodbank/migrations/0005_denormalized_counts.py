@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:48
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def recompute_counts(apps, schema_editor):
+    BloodRequestDonor = apps.get_model('bloodbank', 'BloodRequestDonor')
+    counts = BloodRequestDonor.objects.filter(blood_request=OuterRef('pk')).order_by().values(
+        'blood_request'
+    ).annotate(total=Count('pk')).values('total')
+    apps.get_model('bloodbank', 'BloodRequest').objects.update(donors_count=Coalesce(Subquery(counts), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bloodbank', '0004_remove_bloodrequest_bloodbank_b_blood_g_f81f34_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bloodrequest',
+            name='donors_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(recompute_counts, migrations.RunPython.noop),
+    ]
@@ -2,6 +2,7 @@ from django.db import models
 from django.conf import settings
 from django.core.validators import RegexValidator
 from django.utils.translation import gettext_lazy as _
+from campus_connect.counts import CountedModel
 
 class BloodGroup(models.Model):
     name = models.CharField(max_length=3, unique=True)
@@ -40,7 +41,7 @@ class Donor(models.Model):
             models.Index(fields=['last_donated']),
         ]
 
-class BloodRequest(models.Model):
+class BloodRequest(CountedModel):
     STATUS_CHOICES = (
         ('open', 'Open'),
         ('fulfilled', 'Fulfilled'),
@@ -77,6 +78,7 @@ class BloodRequest(models.Model):
         blank=True,
         related_name='resolved_blood_requests'
     )
+    donors_count = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         ordering = ['-created_at']
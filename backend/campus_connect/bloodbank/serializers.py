@@ -1,10 +1,11 @@
-from django.urls import NoReverseMatch, reverse
+from django.urls import NoReverseMatch
 from rest_framework import serializers
 from django.utils import timezone
 from django.core.validators import RegexValidator
 from .models import BloodGroup, Donor, BloodRequest, BloodRequestDonor
 from universities.models import University
 from accounts.serializers import SimpleUserSerializer
+from campus_connect.links import get_link_builder
 import logging
 from django.db import models
 
@@ -46,7 +47,7 @@ class DonorSerializer(serializers.ModelSerializer):
             logger.warning("Request context missing in DonorSerializer.get_detail_url")
             return None
         try:
-            return request.build_absolute_uri(reverse('donor-detail', kwargs={'pk': obj.pk}))
+            return get_link_builder(request).url('bloodbank:donor-detail', obj.pk)
         except NoReverseMatch as e:
             logger.error(f"Failed to reverse 'donor-detail' for donor ID {obj.pk}: {e}")
             return None
@@ -77,8 +78,8 @@ class BloodRequestDonorSerializer(serializers.ModelSerializer):
             'blood_group': obj.donor.user.blood_group.name if obj.donor.user.blood_group else None,
             'emergency_contact': obj.donor.emergency_contact,
             'preferred_location': obj.donor.preferred_location,
-            'detail_url': request.build_absolute_uri(
-                reverse('donor-detail', kwargs={'pk': obj.donor.pk})
+            'detail_url': get_link_builder(request).url(
+                'bloodbank:donor-detail', obj.donor.pk
                 ) if request else None
         }
 
@@ -113,7 +114,7 @@ class BloodRequestSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'user', 'blood_group', 'university', 'title', 'description',
             'request_date', 'urgent', 'location', 'status',
-            'created_at', 'updated_at', 'resolved_by', 'media', 'registered_donors'
+            'created_at', 'updated_at', 'resolved_by', 'media', 'registered_donors', 'donors_count'
         ]
         read_only_fields = ['user', 'created_at', 'updated_at', 'resolved_by']
 
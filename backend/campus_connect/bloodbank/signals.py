@@ -0,0 +1,9 @@
+from campus_connect.counts import register_count
+from campus_connect.response_cache import register_tags
+from .models import BloodRequest, BloodRequestDonor
+
+register_count(BloodRequest, 'donors_count', BloodRequestDonor, 'blood_request')
+
+# The anonymous request list shows each request with its donor count.
+register_tags(BloodRequest, lambda instance: ['blood-requests'])
+register_tags(BloodRequestDonor, lambda instance: ['blood-requests'])
@@ -0,0 +1,37 @@
+from datetime import timedelta
+from django.test import TestCase
+from django.utils import timezone
+from accounts.models import User
+from universities.models import University
+from .models import BloodGroup, BloodRequest, BloodRequestDonor, Donor
+
+
+class DonorsCountTestCase(TestCase):
+    def setUp(self):
+        university = University.objects.create(name="Test University", short_name="TU")
+        owner = User.objects.create_user(email="owner@example.com", password="password123", name="Owner")
+        self.request = BloodRequest.objects.create(
+            user=owner, blood_group=BloodGroup.objects.create(name='A+'), university=university,
+            title="Need A+", description="Surgery", request_date=timezone.now().date() + timedelta(days=1),
+            location="City hospital"
+        )
+        self.donors = [
+            Donor.objects.create(
+                user=User.objects.create_user(email=f"donor{i}@example.com", password="password123", name="Donor"),
+                emergency_contact="+1234567890", preferred_location="City", consent=True
+            )
+            for i in range(2)
+        ]
+
+    def test_donors_count_follows_registrations(self):
+        registrations = [
+            BloodRequestDonor.objects.create(
+                blood_request=self.request, donor=donor, message="Happy to help", contact_info="+1234567890"
+            )
+            for donor in self.donors
+        ]
+        self.request.refresh_from_db()
+        self.assertEqual(self.request.donors_count, 2)
+        registrations[0].delete()
+        self.request.refresh_from_db()
+        self.assertEqual(self.request.donors_count, 1)
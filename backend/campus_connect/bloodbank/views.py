@@ -8,6 +8,9 @@ from django.db.models import Q
 from .models import BloodGroup, Donor, BloodRequest, BloodRequestDonor
 from .serializers import BloodGroupSerializer, DonorSerializer, BloodRequestSerializer, BloodRequestDonorSerializer
 from lostandfound.views import AdminPermission, UniversityAdminPermission
+from campus_connect.pagination import KeysetPagination
+from campus_connect.response_cache import cache_response
+from campus_connect.conditional import conditional_response, row_validators, tag_validators
 import logging
 
 logger = logging.getLogger(__name__)
@@ -117,7 +120,7 @@ class DonorDetailView(APIView):
 
 class DonorListView(APIView):
     permission_classes = [AllowAny]
-    pagination_class = LimitOffsetPagination
+    pagination_class = KeysetPagination
 
     def get(self, request):
         blood_group = request.query_params.get('blood_group', None)
@@ -145,18 +148,23 @@ class DonorListView(APIView):
                 return Response({"message": "Invalid date format for last_donated_after. Use YYYY-MM-DD."}, status=status.HTTP_400_BAD_REQUEST)
 
         paginator = self.pagination_class()
-        paginated_donors = paginator.paginate_queryset(donors, request)
+        paginated_donors = paginator.paginate_queryset(donors, request, view=self)
         serializer = DonorSerializer(paginated_donors, many=True, context={'request': request})
         logger.info(f"Retrieved donor list for request by {request.user.email if request.user.is_authenticated else 'anonymous'}")
         return paginator.get_paginated_response(serializer.data)
 
 class BloodRequestListCreateView(generics.ListCreateAPIView):
     permission_classes = [AllowAny]
-    pagination_class = LimitOffsetPagination
+    pagination_class = KeysetPagination
 
     def get_permissions(self):
         return [AllowAny()] if self.request.method == 'GET' else [IsAuthenticated()]
 
+    @conditional_response(lambda view, request: tag_validators(['blood-requests']))
+    @cache_response(tags=['blood-requests'], timeout=30)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
     def get_serializer_class(self):
         return BloodRequestSerializer
 
@@ -182,6 +190,9 @@ class BloodRequestListCreateView(generics.ListCreateAPIView):
 class BloodRequestDetailView(APIView):
     permission_classes = [AllowAny]
 
+    @conditional_response(lambda view, request, pk: row_validators(
+        BloodRequest.objects.filter(status='open'), pk, ('donors_count',)
+    ))
     def get(self, request, pk):
         try:
             blood_request = BloodRequest.objects.get(
@@ -0,0 +1,85 @@
+import hashlib
+from functools import wraps
+from django.conf import settings
+from django.db.models import Count, Max, Sum
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+from .media import get_media_expiry
+from .response_cache import get_tag_versions
+
+
+def queryset_validators(queryset, latest='updated_at', sums=()):
+    """
+    (newest `latest`, [row count, newest `latest`, *sums of `sums`]) for a queryset,
+    from a single aggregate query. The sums catch counter columns such as
+    claims_count that change without touching updated_at.
+    """
+    values = queryset.order_by().aggregate(
+        count=Count('pk'), latest=Max(latest), **{f'sum_{field}': Sum(field) for field in sums}
+    )
+    return values['latest'], list(values.values())
+
+
+def row_validators(queryset, pk, fields=()):
+    """(updated_at, [updated_at, *fields]) of one row, None when the queryset has no such row."""
+    row = queryset.filter(pk=pk).order_by().values_list('updated_at', *fields).first()
+    return None if row is None else (row[0], list(row))
+
+
+def tag_validators(tags):
+    """
+    Validators of a list response from the versions of the response cache tags it
+    depends on, which every relevant write bumps; see register_tags(). Reading them
+    is one cache lookup whatever the size of the tables, and it gives no last
+    modified moment: a row that is deleted or leaves the list moves no timestamp.
+    """
+    return None, get_tag_versions(sorted(tags))
+
+
+def merge_validators(*validators):
+    """Validators of a response built from several querysets."""
+    moments = [moment for moment, _ in validators if moment is not None]
+    return max(moments, default=None), [values for _, values in validators]
+
+
+def get_signing_window_start():
+    """Signed media links minted in a response change when this does, see get_media_expiry()."""
+    return get_media_expiry() - 2 * settings.MEDIA_URL_TTL
+
+
+def conditional_response(get_validators):
+    """
+    Gives GET requests a weak ETag and a Last-Modified header, and answers a
+    matching If-None-Match or If-Modified-Since with 304 before the view loads or
+    serializes anything. get_validators() takes the view method's arguments and
+    returns (last modified, values) describing the rows behind the response, or
+    None to let the view answer as usual, e.g. with a 404. A last modified moment
+    of None leaves out Last-Modified, so only the ETag validates.
+    The ETag also covers the requesting user, since bodies carry per-user fields
+    like is_admin and resolve_url, and the media signing window, so a client never
+    revalidates a body whose signed links have expired.
+    """
+    def decorator(method):
+        @wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            validators = get_validators(view, request, *args, **kwargs)
+            if validators is None:
+                return method(view, request, *args, **kwargs)
+            last_modified, values = validators
+            window_start = get_signing_window_start()
+            user = request.user
+            key = repr((values, user.pk, getattr(user, 'admin_level', None), window_start))
+            etag = f'W/"{hashlib.md5(key.encode()).hexdigest()}"'
+            timestamp = None if last_modified is None else int(max(last_modified.timestamp(), window_start))
+
+            response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+            if response is None:
+                response = method(view, request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                response['ETag'] = etag
+                if timestamp is not None:
+                    response['Last-Modified'] = http_date(timestamp)
+            patch_vary_headers(response, ['Authorization'])
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,83 @@
+from django.db import models, router, transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.db.models.signals import post_delete, post_save
+
+# Every count registered with register_count(), in registration order.
+COUNTED_FIELDS = []
+
+
+class DenormalizedCount:
+    """
+    A counter column on `model` holding the number of `related_model` rows whose
+    `related_field` foreign key points at it, e.g. LostItem.claims_count for
+    LostItemClaim.lost_item. Creating or deleting a related row moves the counter
+    with an F() expression, so no COUNT query is needed to read it.
+    """
+    def __init__(self, model, field, related_model, related_field):
+        self.model = model
+        self.field = field
+        self.related_model = related_model
+        self.related_field = related_field
+        self.attname = related_model._meta.get_field(related_field).attname
+
+    def __str__(self):
+        return f"{self.model._meta.label}.{self.field}"
+
+    def adjust(self, instance, delta):
+        pk = getattr(instance, self.attname)
+        if pk is not None:
+            self.model.objects.filter(pk=pk).update(**{self.field: F(self.field) + delta})
+
+    def on_save(self, sender, instance, created, raw=False, **kwargs):
+        if created and not raw:
+            self.adjust(instance, 1)
+
+    def on_delete(self, sender, instance, **kwargs):
+        self.adjust(instance, -1)
+
+    def recompute(self):
+        """Sets the counter on every row with a single UPDATE; returns the number of rows."""
+        counts = self.related_model.objects.filter(**{self.related_field: OuterRef('pk')}).order_by().values(
+            self.related_field
+        ).annotate(total=Count('pk')).values('total')
+        return self.model.objects.update(**{self.field: Coalesce(Subquery(counts), 0)})
+
+
+def get_counter_fields(model):
+    """Names of the counter columns registered on `model`."""
+    return {count.field for count in COUNTED_FIELDS if count.model is model}
+
+
+class CountedModel(models.Model):
+    """
+    Base for models with registered counters. Saving a row that already exists
+    leaves the counter columns out of the UPDATE unless update_fields names them,
+    so a stale in-memory value never overwrites an F() adjustment made after
+    the instance was loaded. The save runs in a transaction together with its
+    signal receivers, so counters they maintain commit or roll back with the row.
+    """
+    class Meta:
+        abstract = True
+
+    def save(self, *args, **kwargs):
+        if kwargs.get('update_fields') is None and not kwargs.get('force_insert') and not self._state.adding:
+            counters = get_counter_fields(type(self))
+            if counters:
+                # Deferred fields stay out too, as Django leaves them out of a plain save.
+                deferred = self.get_deferred_fields()
+                kwargs['update_fields'] = [
+                    field.name for field in self._meta.concrete_fields
+                    if not field.primary_key and field.name not in counters and field.attname not in deferred
+                ]
+        with transaction.atomic(using=kwargs.get('using') or router.db_for_write(type(self), instance=self)):
+            super().save(*args, **kwargs)
+
+
+def register_count(model, field, related_model, related_field):
+    """Declares a DenormalizedCount and connects the signals that maintain it."""
+    count = DenormalizedCount(model, field, related_model, related_field)
+    post_save.connect(count.on_save, sender=related_model, weak=False, dispatch_uid=f"{count}.save")
+    post_delete.connect(count.on_delete, sender=related_model, weak=False, dispatch_uid=f"{count}.delete")
+    COUNTED_FIELDS.append(count)
+    return count
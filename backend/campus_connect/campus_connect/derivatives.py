@@ -0,0 +1,129 @@
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from PIL import Image, ImageOps
+from .response_cache import invalidate_instance
+
+logger = logging.getLogger(__name__)
+
+# Longest edge in pixels of each derivative.
+DERIVATIVE_SIZES = {
+    'thumb': 320,
+    'medium': 1280,
+}
+DERIVATIVE_SIZE_CHOICES = [('thumb', 'Thumbnail'), ('medium', 'Medium')]
+DERIVATIVE_STATUS_CHOICES = [('pending', 'Pending'), ('ready', 'Ready'), ('failed', 'Failed')]
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+FORMAT_EXTENSIONS = {'WEBP': 'webp', 'JPEG': 'jpg'}
+
+_executor = None
+
+
+def get_executor():
+    """Process pool shared by the whole process, started on first use."""
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.MEDIA_DERIVATIVE_WORKERS,
+            mp_context=multiprocessing.get_context('spawn'),
+        )
+    return _executor
+
+
+def render_derivatives(source_path, targets, image_format):
+    """
+    Runs in a worker process: writes each (size, target_path) of the source image,
+    scaled down to fit DERIVATIVE_SIZES[size], and returns [(size, width, height)].
+    """
+    results = []
+    with Image.open(source_path) as image:
+        image = ImageOps.exif_transpose(image)
+        keep_alpha = image_format != 'JPEG' and 'A' in image.getbands()
+        image = image.convert('RGBA' if keep_alpha else 'RGB')
+        for size, target_path in targets:
+            derivative = image.copy()
+            derivative.thumbnail((DERIVATIVE_SIZES[size], DERIVATIVE_SIZES[size]))
+            os.makedirs(os.path.dirname(target_path), exist_ok=True)
+            derivative.save(target_path, image_format, quality=80)
+            results.append((size, derivative.width, derivative.height))
+    return results
+
+
+def get_derivative_name(name, size, image_format):
+    """lostandfound/media/abc.jpg -> lostandfound/media/derivatives/abc_thumb.webp"""
+    directory, filename = os.path.split(name)
+    stem = os.path.splitext(filename)[0]
+    return f"{directory}/derivatives/{stem}_{size}.{FORMAT_EXTENSIONS[image_format]}"
+
+
+def schedule_derivatives(media, derivative_model):
+    """
+    Records pending derivatives for an uploaded image and renders them in the process
+    pool once the upload transaction commits. Videos are left as they are.
+    """
+    if not media.file.name.lower().endswith(IMAGE_EXTENSIONS):
+        return
+    derivative_model.objects.bulk_create([
+        derivative_model(media=media, size=size) for size in DERIVATIVE_SIZES
+    ])
+    transaction.on_commit(partial(generate_derivatives, derivative_model, media.pk, media.file))
+
+
+def generate_derivatives(derivative_model, media_pk, source):
+    image_format = settings.MEDIA_DERIVATIVE_FORMAT
+    names = {size: get_derivative_name(source.name, size, image_format) for size in DERIVATIVE_SIZES}
+    targets = [(size, source.storage.path(name)) for size, name in names.items()]
+    record = partial(record_derivatives, derivative_model, media_pk, names)
+    if not settings.MEDIA_DERIVATIVE_WORKERS:
+        try:
+            results = render_derivatives(source.path, targets, image_format)
+        except Exception as e:
+            return record(error=e)
+        return record(results)
+
+    submitter = threading.get_ident()
+
+    def on_done(future):
+        # Runs on the pool's management thread, which keeps its own connection, unless
+        # the work was already done when the callback was added: then it runs right here.
+        close_old_connections()
+        try:
+            error = future.exception()
+            record(None if error else future.result(), error)
+        finally:
+            if threading.get_ident() != submitter:
+                connection.close()
+
+    get_executor().submit(render_derivatives, source.path, targets, image_format).add_done_callback(on_done)
+
+
+def record_derivatives(derivative_model, media_pk, names, results=None, error=None):
+    derivatives = derivative_model.objects.filter(media_id=media_pk)
+    if error is not None:
+        logger.error(f"Derivatives for media {media_pk} failed: {error}")
+        derivatives.update(status='failed')
+        return
+    for size, width, height in results:
+        derivatives.filter(size=size).update(status='ready', file=names[size], width=width, height=height)
+    logger.info(f"Derivatives for media {media_pk} ready")
+    # Cached responses may link to the original while the thumbnail was pending.
+    media = derivative_model._meta.get_field('media').related_model.objects.filter(pk=media_pk).first()
+    if media is not None:
+        invalidate_instance(media)
+
+
+def get_media_file(media, size=None):
+    """
+    The file to serve for `size`: the ready derivative, otherwise the original.
+    Reads the prefetched derivatives when present.
+    """
+    if size:
+        for derivative in media.derivatives.all():
+            if derivative.size == size and derivative.status == 'ready':
+                return derivative.file
+    return media.file
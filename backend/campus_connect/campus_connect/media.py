@@ -0,0 +1,152 @@
+import os
+import re
+import time
+from urllib.parse import quote
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.crypto import constant_time_compare, salted_hmac
+from django.utils.http import http_date
+from .links import get_link_builder
+
+MEDIA_CONTENT_TYPES = {
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.webp': 'image/webp',
+    '.mp4': 'video/mp4',
+    '.mov': 'video/quicktime',
+}
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+CHUNK_SIZE = 64 * 1024
+SIGNING_SALT = 'campus_connect.media'
+
+
+def get_content_type(name):
+    return MEDIA_CONTENT_TYPES.get(os.path.splitext(name)[1].lower(), 'application/octet-stream')
+
+
+def get_byte_range(header, size):
+    """
+    Parses a single 'bytes=start-end' range against a file of `size` bytes.
+    Returns (start, end) inclusive, None when there is no usable header, or
+    False when the range cannot be satisfied.
+    """
+    match = RANGE_RE.match(header.strip()) if header else None
+    if not match or match.groups() == ('', ''):
+        return None
+    start, end = match.groups()
+    if start:
+        start = int(start)
+        end = min(int(end), size - 1) if end else size - 1
+    else:
+        # Suffix range: the last N bytes.
+        start, end = max(size - int(end), 0), size - 1
+    if start > end or start >= size:
+        return False
+    return start, end
+
+
+def iter_file_range(path, start, length):
+    with open(path, 'rb') as handle:
+        handle.seek(start)
+        while length > 0:
+            chunk = handle.read(min(CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def sign_media(name, expires):
+    return salted_hmac(SIGNING_SALT, f'{name}:{expires}', algorithm='sha256').hexdigest()
+
+
+def get_media_expiry(now=None):
+    """
+    Expiry for links minted now. It is rounded up to a MEDIA_URL_TTL window so the
+    same file keeps the same URL (and browser cache entry) for a while, and every
+    link stays valid for at least one full TTL.
+    """
+    ttl = settings.MEDIA_URL_TTL
+    now = int(time.time() if now is None else now)
+    return (now // ttl + 2) * ttl
+
+
+def signed_media_url(request, name, expires=None):
+    """Absolute URL of the signed media endpoint for a storage name."""
+    expires = expires or get_media_expiry()
+    url = get_link_builder(request).url('signed-media', name, kwarg='name', safe='/')
+    return f"{url}?expires={expires}&signature={sign_media(name, expires)}"
+
+
+def check_media_signature(name, expires, signature):
+    """Returns None when the link is valid, otherwise the reason it is rejected."""
+    if not expires or not signature or not expires.isdigit():
+        return "Invalid media link."
+    if not constant_time_compare(sign_media(name, expires), signature):
+        return "Invalid media link."
+    if int(expires) < time.time():
+        return "Media link has expired."
+    return None
+
+
+def serve_media(request, name, storage=None, backend=None):
+    """
+    Returns the response for a stored media file once access has been granted.
+
+    Sends a strong ETag built from the file size and mtime plus Last-Modified, and
+    answers If-None-Match / If-Modified-Since with 304. With the 'direct' backend the
+    file is streamed by Django, including single byte ranges for video seeking. With
+    'x-sendfile' or 'x-accel-redirect' the transfer (and Range handling) is handed to
+    the front proxy. The backend defaults to settings.MEDIA_DELIVERY_BACKEND.
+    Raises FileNotFoundError when the file is missing.
+    """
+    storage = storage or default_storage
+    path = storage.path(name)
+    stat = os.stat(path)
+    etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+    last_modified = int(stat.st_mtime)
+    content_type = get_content_type(path)
+
+    not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if not_modified is not None:
+        not_modified['ETag'] = etag
+        not_modified['Last-Modified'] = http_date(last_modified)
+        return not_modified
+
+    backend = backend or getattr(settings, 'MEDIA_DELIVERY_BACKEND', 'direct')
+    if backend == 'x-sendfile':
+        response = HttpResponse(content_type=content_type)
+        response['X-Sendfile'] = path
+    elif backend == 'x-accel-redirect':
+        response = HttpResponse(content_type=content_type)
+        prefix = getattr(settings, 'MEDIA_ACCEL_REDIRECT_PREFIX', '/protected-media/')
+        # nginx decodes the URI it is handed, so non-ASCII or reserved characters must arrive percent-encoded.
+        response['X-Accel-Redirect'] = prefix.rstrip('/') + '/' + quote(name.lstrip('/'))
+    else:
+        byte_range = None
+        if_range = request.headers.get('If-Range')
+        if not if_range or if_range == etag:
+            byte_range = get_byte_range(request.headers.get('Range'), stat.st_size)
+        if byte_range is False:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{stat.st_size}'
+            return response
+        if byte_range:
+            start, end = byte_range
+            length = end - start + 1
+            response = StreamingHttpResponse(
+                iter_file_range(path, start, length), status=206, content_type=content_type
+            )
+            response['Content-Range'] = f'bytes {start}-{end}/{stat.st_size}'
+            response['Content-Length'] = str(length)
+        else:
+            response = FileResponse(open(path, 'rb'), content_type=content_type)
+
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    return response
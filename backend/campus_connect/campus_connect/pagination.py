@@ -0,0 +1,155 @@
+import base64
+import binascii
+import json
+from collections import OrderedDict
+from django.core.exceptions import FieldDoesNotExist, ValidationError as DjangoValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination keyed on an ordering such as ('-created_at', 'id').
+    Each page is fetched with a WHERE on the last row seen instead of an OFFSET scan,
+    so deep pages cost the same as the first one. next/previous carry opaque cursors.
+
+    Views pick the key with an `ordering` attribute. Feeds that merge several models
+    name a `source_field`, which is appended to the key so rows of different models
+    sharing a created_at and an id stay distinct. Requests that still send ?offset=
+    are served by LimitOffsetPagination, and ?count=false skips the COUNT(*) query.
+    """
+    ordering = ('-created_at', 'id')
+    page_size = api_settings.PAGE_SIZE
+    max_page_size = 100
+    page_size_query_param = 'limit'
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    include_count = True
+    offset_pagination_class = LimitOffsetPagination
+    invalid_cursor_message = 'Invalid cursor.'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.offset_paginator = None
+        if self.offset_pagination_class.offset_query_param in request.query_params:
+            self.offset_paginator = self.offset_pagination_class()
+            return self.offset_paginator.paginate_queryset(queryset, request, view)
+
+        self.ordering = self.get_keyset_ordering(queryset, view)
+        self.page_size = self.get_page_size(request)
+        position, reverse = self.decode_cursor(request, queryset)
+        self.count = queryset.count() if self.get_include_count(request) else None
+
+        queryset = queryset.order_by(*self.get_ordering(reverse))
+        if position is not None:
+            queryset = queryset.filter(self.get_keyset_filter(position, reverse))
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        self.page = results[:self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, position is not None
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+    def get_paginated_data(self, data):
+        paginator = self.offset_paginator or self
+        count = paginator.count
+        fields = [('count', count)] if count is not None else []
+        return OrderedDict(fields + [
+            ('next', paginator.get_next_link()),
+            ('previous', paginator.get_previous_link()),
+            ('results', data),
+        ])
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_include_count(self, request):
+        value = request.query_params.get(self.count_query_param)
+        if value is None:
+            return self.include_count
+        return value.lower() not in ('false', '0', 'no')
+
+    def get_keyset_ordering(self, queryset, view):
+        ordering = tuple(getattr(view, 'ordering', None) or self.ordering)
+        source_field = getattr(queryset, 'source_field', None)
+        if source_field and source_field not in {field.lstrip('-') for field in ordering}:
+            ordering += (source_field,)
+        return ordering
+
+    def get_ordering(self, reverse=False):
+        if not reverse:
+            return self.ordering
+        return tuple(field[1:] if field.startswith('-') else f'-{field}' for field in self.ordering)
+
+    def get_keyset_filter(self, position, reverse):
+        """Rows strictly after `position`: (a > x) OR (a = x AND b > y) OR ..."""
+        keyset = Q()
+        equal = Q()
+        for field, value in zip(self.ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') != reverse else 'gt'
+            keyset |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return keyset
+
+    def get_position(self, obj):
+        position = []
+        for field in self.ordering:
+            value = getattr(obj, field.lstrip('-'))
+            position.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+        return position
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.get_position(self.page[-1]), reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.encode_cursor(self.get_position(self.page[0]), reverse=True)
+
+    def encode_cursor(self, position, reverse):
+        payload = json.dumps({'p': position, 'r': int(reverse)}, separators=(',', ':'))
+        token = base64.urlsafe_b64encode(payload.encode()).decode()
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, token)
+
+    def decode_cursor(self, request, queryset):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None, False
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(token.encode()).decode())
+            position, reverse = payload['p'], bool(payload['r'])
+            if not isinstance(position, list) or len(position) != len(self.ordering):
+                raise ValueError
+            position = [
+                self.to_python(queryset, field.lstrip('-'), value)
+                for field, value in zip(self.ordering, position)
+            ]
+        except (TypeError, ValueError, KeyError, binascii.Error, FieldDoesNotExist, DjangoValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def to_python(self, queryset, name, value):
+        if name == getattr(queryset, 'source_field', None):
+            if not isinstance(value, int) or isinstance(value, bool):
+                raise ValueError
+            return value
+        return queryset.model._meta.get_field(name).to_python(value)
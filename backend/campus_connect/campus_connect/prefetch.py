@@ -0,0 +1,43 @@
+from rest_framework import serializers
+
+
+class QuerysetPlanMixin:
+    """
+    Lets a serializer declare the relations it reads, so views can load a whole page
+    with a fixed number of queries. setup_queryset() applies select_related for the
+    declared foreign keys and prefetch_related for the declared reverse relations,
+    including the relations declared by nested serializers.
+    """
+    select_related_fields = ()
+    prefetch_related_fields = ()
+
+    @classmethod
+    def get_queryset_plan(cls, prefix='', prefetched=False):
+        """Returns (select_related, prefetch_related) lookups, prefixed for nesting."""
+        select_related = []
+        prefetch_related = []
+        for lookup in cls.select_related_fields:
+            (prefetch_related if prefetched else select_related).append(prefix + lookup)
+        for lookup in cls.prefetch_related_fields:
+            prefetch_related.append(prefix + lookup)
+        for name, field in cls._declared_fields.items():
+            many = isinstance(field, serializers.ListSerializer)
+            nested = field.child if many else field
+            if not isinstance(nested, QuerysetPlanMixin) or field.source == '*':
+                continue
+            nested_select, nested_prefetch = type(nested).get_queryset_plan(
+                prefix=f"{prefix}{field.source or name}__",
+                prefetched=prefetched or many,
+            )
+            select_related.extend(nested_select)
+            prefetch_related.extend(nested_prefetch)
+        return select_related, prefetch_related
+
+    @classmethod
+    def setup_queryset(cls, queryset):
+        select_related, prefetch_related = cls.get_queryset_plan()
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        return queryset
@@ -0,0 +1,156 @@
+import hashlib
+import secrets
+from functools import wraps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.utils.http import urlencode
+from rest_framework.response import Response
+
+KEY_PREFIX = 'response-cache'
+OUTCOMES = ('hit', 'miss', 'bypass')
+# Names of the views wrapped with cache_response(), for the metrics report.
+CACHED_VIEWS = []
+# {model: get_tags} for every model registered with register_tags().
+TAGGED_MODELS = {}
+
+
+def get_tag_key(tag):
+    return f'{KEY_PREFIX}:tag:{tag}'
+
+
+def get_tag_versions(tags):
+    """
+    The current version token of each tag. A response is stored under the versions
+    of its tags, so bumping a tag orphans every response that depends on it.
+    """
+    keys = [get_tag_key(tag) for tag in tags]
+    versions = cache.get_many(keys)
+    missing = {key: secrets.token_hex(4) for key in keys if key not in versions}
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def invalidate_tags(tags):
+    """
+    Drops every cached response depending on one of `tags`. The tags are bumped
+    now and again once the transaction commits, so a response rebuilt from the
+    old rows in between does not survive either.
+    """
+    tags = set(tags)
+    if not tags:
+        return
+
+    def bump():
+        cache.set_many({get_tag_key(tag): secrets.token_hex(4) for tag in tags}, None)
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def get_response_key(request, versions):
+    """Key of a response: scheme, host, path and the sorted query, plus the tag versions."""
+    query = urlencode(sorted(
+        (name, value) for name, values in request.query_params.lists() for value in values
+    ))
+    url = f'{request.scheme}://{request.get_host()}{request.path}?{query}'
+    digest = hashlib.sha256(f"{url}|{':'.join(versions)}".encode()).hexdigest()
+    return f'{KEY_PREFIX}:response:{digest}'
+
+
+def record_outcome(view_name, outcome):
+    key = f'{KEY_PREFIX}:metrics:{view_name}:{outcome}'
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, None)
+        cache.incr(key)
+
+
+def get_metrics():
+    """{view name: {'hit': n, 'miss': n, 'bypass': n}} for every cached view."""
+    keys = {
+        (name, outcome): f'{KEY_PREFIX}:metrics:{name}:{outcome}'
+        for name in CACHED_VIEWS for outcome in OUTCOMES
+    }
+    values = cache.get_many(keys.values())
+    metrics = {name: dict.fromkeys(OUTCOMES, 0) for name in CACHED_VIEWS}
+    for (name, outcome), key in keys.items():
+        metrics[name][outcome] = values.get(key, 0)
+    return metrics
+
+
+def reset_metrics():
+    cache.delete_many([f'{KEY_PREFIX}:metrics:{name}:{outcome}' for name in CACHED_VIEWS for outcome in OUTCOMES])
+
+
+def cache_response(tags, timeout=None):
+    """
+    Caches the 200 responses a view method gives anonymous users. `tags` lists the
+    tags the response depends on, or is a callable taking the view method's
+    arguments and returning them; see register_tags() for what bumps them.
+    Authenticated requests always run the view, since their responses carry
+    per-user fields such as is_admin and resolve_url. `timeout` defaults to
+    RESPONSE_CACHE_TIMEOUT and is capped at MEDIA_URL_TTL, so cached signed media
+    links are still valid when served.
+    """
+    def decorator(method):
+        view_name = method.__qualname__.split('.')[0]
+        CACHED_VIEWS.append(view_name)
+
+        @wraps(method)
+        def wrapper(view, request, *args, **kwargs):
+            if not settings.RESPONSE_CACHE_ENABLED or request.user.is_authenticated:
+                record_outcome(view_name, 'bypass')
+                return method(view, request, *args, **kwargs)
+
+            response_tags = sorted(tags(view, request, *args, **kwargs) if callable(tags) else tags)
+            key = get_response_key(request, get_tag_versions(response_tags))
+            cached = cache.get(key)
+            if cached is not None:
+                record_outcome(view_name, 'hit')
+                response = Response(cached)
+                response['X-Cache'] = 'HIT'
+                return response
+
+            record_outcome(view_name, 'miss')
+            response = method(view, request, *args, **kwargs)
+            if response.status_code == 200:
+                response_timeout = min(timeout or settings.RESPONSE_CACHE_TIMEOUT, settings.MEDIA_URL_TTL)
+                cache.set(key, response.data, response_timeout)
+            response['X-Cache'] = 'MISS'
+            return response
+        return wrapper
+    return decorator
+
+
+def register_tags(model, get_tags, track_changes=False):
+    """
+    Invalidates get_tags(instance) whenever an instance of `model` is saved or
+    deleted. With track_changes the tags of the stored row are invalidated too,
+    for tags that depend on fields a save can change, like a place's parent.
+    """
+    def on_pre_save(sender, instance, raw=False, **kwargs):
+        stored = None if raw or instance.pk is None else model._default_manager.filter(pk=instance.pk).first()
+        instance._stored_cache_tags = set(get_tags(stored)) if stored else set()
+
+    def on_change(sender, instance, raw=False, **kwargs):
+        if not raw:
+            invalidate_tags(set(get_tags(instance)) | getattr(instance, '_stored_cache_tags', set()))
+
+    TAGGED_MODELS[model] = get_tags
+    uid = f'response_cache.{model._meta.label}'
+    if track_changes:
+        pre_save.connect(on_pre_save, sender=model, weak=False, dispatch_uid=f'{uid}.pre_save')
+    post_save.connect(on_change, sender=model, weak=False, dispatch_uid=f'{uid}.save')
+    post_delete.connect(on_change, sender=model, weak=False, dispatch_uid=f'{uid}.delete')
+
+
+def invalidate_instance(instance):
+    """Invalidates the tags of a registered model instance changed without signals, e.g. by update()."""
+    get_tags = TAGGED_MODELS.get(type(instance))
+    if get_tags is not None:
+        invalidate_tags(get_tags(instance))
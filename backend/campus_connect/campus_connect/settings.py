@@ -143,4 +143,43 @@ SIMPLE_JWT = {
 AUTH_USER_MODEL = 'accounts.User'
 
 MEDIA_URL = '/media/'
-MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
\ No newline at end of file
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# How protected media is delivered once access is granted:
+# 'direct' streams from Django, 'x-sendfile' (Apache/lighttpd) and
+# 'x-accel-redirect' (nginx) hand the transfer to the front proxy.
+MEDIA_DELIVERY_BACKEND = os.getenv('MEDIA_DELIVERY_BACKEND', 'direct')
+# nginx `internal` location that aliases MEDIA_ROOT, used by x-accel-redirect.
+MEDIA_ACCEL_REDIRECT_PREFIX = os.getenv('MEDIA_ACCEL_REDIRECT_PREFIX', '/protected-media/')
+# Lifetime in seconds of the signed media links minted by the serializers.
+MEDIA_URL_TTL = int(os.getenv('MEDIA_URL_TTL', 900))
+# Worker processes rendering thumbnails/medium images after uploads; 0 renders inline.
+MEDIA_DERIVATIVE_WORKERS = int(os.getenv('MEDIA_DERIVATIVE_WORKERS', 2))
+# 'WEBP' or 'JPEG'.
+MEDIA_DERIVATIVE_FORMAT = os.getenv('MEDIA_DERIVATIVE_FORMAT', 'WEBP')
+# Resumable upload sessions: largest accepted file, lifetime of an unfinished
+# session in seconds, and how often expired sessions are swept.
+MEDIA_UPLOAD_MAX_SIZE = int(os.getenv('MEDIA_UPLOAD_MAX_SIZE', 500 * 1024 * 1024))
+MEDIA_UPLOAD_SESSION_TTL = int(os.getenv('MEDIA_UPLOAD_SESSION_TTL', 24 * 60 * 60))
+MEDIA_UPLOAD_SWEEP_INTERVAL = int(os.getenv('MEDIA_UPLOAD_SWEEP_INTERVAL', 60 * 60))
+
+# The response cache and its tag versions must be shared by every process serving
+# the API: a tag bumped in one worker has to orphan the responses the others cached.
+# The default directory is shared by the processes of one host; point CACHE_BACKEND
+# and CACHE_LOCATION at memcached or redis when serving from several hosts. A
+# per-process backend such as locmem would keep serving stale responses.
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.filebased.FileBasedCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', str(BASE_DIR / 'cache')),
+    }
+}
+# Cached anonymous responses of the public feeds, kept this many seconds unless
+# a view sets its own timeout; model signals invalidate them sooner.
+RESPONSE_CACHE_ENABLED = os.getenv('RESPONSE_CACHE_ENABLED', 'True') == 'True'
+RESPONSE_CACHE_TIMEOUT = int(os.getenv('RESPONSE_CACHE_TIMEOUT', 60))
+
+# Resolved lost and found items older than this many days are moved to the
+# archive tables by `archive_resolved_items`, this many items per transaction.
+ITEM_ARCHIVE_AFTER_DAYS = int(os.getenv('ITEM_ARCHIVE_AFTER_DAYS', 180))
+ITEM_ARCHIVE_BATCH_SIZE = int(os.getenv('ITEM_ARCHIVE_BATCH_SIZE', 500))
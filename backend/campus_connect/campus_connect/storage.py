@@ -0,0 +1,169 @@
+import hashlib
+import logging
+import os
+import queue
+import tempfile
+import threading
+from functools import partial
+from django.core.files import locks
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+
+logger = logging.getLogger(__name__)
+
+BLOB_DIR = 'blobs'
+CHUNK_SIZE = 64 * 1024
+
+_removals = queue.Queue()
+_removal_worker = None
+_removal_lock = threading.Lock()
+
+
+def hash_file(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for chunk in iter(lambda: handle.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Keeps one copy of each distinct file under MEDIA_ROOT/blobs/<ab>/<sha256>. The
+    name returned by save() is a hard link to that blob, so stored names stay plain
+    paths for signed links, X-Sendfile and derivatives while identical uploads share
+    their bytes. The link count is the reference count: a blob whose only remaining
+    link is its own entry under blobs/ is no longer used.
+    """
+    def get_blob_name(self, digest):
+        return f"{BLOB_DIR}/{digest[:2]}/{digest}"
+
+    def get_blob_path(self, digest):
+        return self.path(self.get_blob_name(digest))
+
+    def _save(self, name, content):
+        if hasattr(content, 'temporary_file_path'):
+            # Already on disk (large uploads, upload sessions): hash it and move it.
+            source = content.temporary_file_path()
+            digest = hash_file(source)
+            staged = False
+        else:
+            # Hash while streaming into a scratch file next to the blobs.
+            os.makedirs(self.path(BLOB_DIR), exist_ok=True)
+            fd, source = tempfile.mkstemp(prefix='.incoming-', dir=self.path(BLOB_DIR))
+            hasher = hashlib.sha256()
+            with os.fdopen(fd, 'wb') as handle:
+                locks.lock(handle, locks.LOCK_EX)
+                for chunk in content.chunks():
+                    hasher.update(chunk)
+                    handle.write(chunk)
+            digest = hasher.hexdigest()
+            staged = True
+
+        blob_path = self.get_blob_path(digest)
+        if os.path.exists(blob_path):
+            if staged:
+                os.remove(source)
+        else:
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            file_move_safe(source, blob_path, allow_overwrite=True)
+            if self.file_permissions_mode is not None:
+                os.chmod(blob_path, self.file_permissions_mode)
+
+        while True:
+            full_path = self.path(name)
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            try:
+                os.link(blob_path, full_path)
+                break
+            except FileExistsError:
+                name = self.get_available_name(name)
+        return str(name).replace('\\', '/')
+
+    def delete(self, name):
+        """Removes the name, and its blob too when no other name links to it."""
+        path = self.path(name)
+        try:
+            shared = os.stat(path).st_nlink > 2
+        except FileNotFoundError:
+            return
+        blob_path = None if shared else self.get_blob_path(hash_file(path))
+        super().delete(name)
+        if blob_path and os.path.exists(blob_path) and os.stat(blob_path).st_nlink == 1:
+            os.remove(blob_path)
+
+    def adopt(self, name):
+        """
+        Turns a file stored before deduplication into a link to its blob. Returns
+        the number of bytes this frees, which is 0 for the first copy of a blob.
+        """
+        path = self.path(name)
+        stat = os.stat(path)
+        if stat.st_nlink > 1:
+            return 0
+        blob_path = self.get_blob_path(hash_file(path))
+        if not os.path.exists(blob_path):
+            os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+            os.link(path, blob_path)
+            return 0
+        temp_path = f"{path}.dedupe"
+        os.link(blob_path, temp_path)
+        os.replace(temp_path, path)
+        return stat.st_size
+
+    def prune_blobs(self):
+        """Deletes blobs no stored name links to any more; returns how many were removed."""
+        removed = 0
+        for directory, _, filenames in os.walk(self.path(BLOB_DIR)):
+            for filename in filenames:
+                path = os.path.join(directory, filename)
+                if not filename.startswith('.') and os.stat(path).st_nlink == 1:
+                    os.remove(path)
+                    removed += 1
+        return removed
+
+
+media_storage = ContentAddressedStorage()
+
+
+def get_media_storage():
+    """Storage for uploaded item and place media; a callable so migrations reference it by path."""
+    return media_storage
+
+
+def remove_files(names, storage=None):
+    """
+    Deletes stored names on a background thread once the transaction commits, so
+    bulk deletes do not hold their write lock while files are unlinked and blobs
+    hashed. Nothing is removed if the transaction rolls back.
+    """
+    names = [name for name in names if name]
+    if names:
+        transaction.on_commit(partial(queue_removals, storage or media_storage, names))
+
+
+def queue_removals(storage, names):
+    global _removal_worker
+    with _removal_lock:
+        if _removal_worker is None:
+            _removal_worker = threading.Thread(target=process_removals, daemon=True)
+            _removal_worker.start()
+    for name in names:
+        _removals.put((storage, name))
+
+
+def process_removals():
+    while True:
+        storage, name = _removals.get()
+        try:
+            storage.delete(name)
+        except OSError as e:
+            logger.error(f"Could not remove {name}: {e}")
+        finally:
+            _removals.task_done()
+
+
+def wait_for_removals():
+    """Blocks until every queued removal is done."""
+    _removals.join()
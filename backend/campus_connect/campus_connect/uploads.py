@@ -0,0 +1,321 @@
+import json
+import logging
+import os
+import re
+import secrets
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from rest_framework import serializers
+from .links import get_link_builder
+
+logger = logging.getLogger(__name__)
+
+STAGING_DIR = 'uploads'
+SESSION_ID_RE = re.compile(r'^[A-Za-z0-9_-]{16,64}$')
+ALLOWED_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.mp4', '.mov')
+CHUNK_SIZE = 64 * 1024
+
+_last_sweep = 0
+_sweep_lock = threading.Lock()
+
+
+class UploadError(Exception):
+    """A chunk or session request that cannot be applied; `status` is the HTTP status to answer with."""
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class StagedFile(File):
+    """A session's data file, offered to storages as a temporary file they may move."""
+    def temporary_file_path(self):
+        return self.file.name
+
+
+def get_staging_root():
+    return os.path.join(settings.MEDIA_ROOT, STAGING_DIR)
+
+
+class UploadSession:
+    """
+    A resumable upload staged under MEDIA_ROOT/uploads/<id>/: 'meta.json' holds the
+    owner, file name and declared size, and 'data' receives the chunks. The number of
+    bytes received so far is the size of 'data', so a client that lost its connection
+    asks for the offset and carries on from there.
+    """
+    def __init__(self, session_id, meta):
+        self.id = session_id
+        self.meta = meta
+
+    @property
+    def directory(self):
+        return os.path.join(get_staging_root(), self.id)
+
+    @property
+    def data_path(self):
+        return os.path.join(self.directory, 'data')
+
+    @property
+    def claimed_path(self):
+        return os.path.join(self.directory, 'claimed')
+
+    @property
+    def meta_path(self):
+        return os.path.join(self.directory, 'meta.json')
+
+    @property
+    def filename(self):
+        return self.meta['filename']
+
+    @property
+    def size(self):
+        return self.meta['size']
+
+    @property
+    def user_id(self):
+        return self.meta['user']
+
+    @property
+    def complete(self):
+        return self.meta['complete']
+
+    @property
+    def offset(self):
+        return os.path.getsize(self.data_path)
+
+    @property
+    def expires(self):
+        return self.meta['created'] + settings.MEDIA_UPLOAD_SESSION_TTL
+
+    @classmethod
+    def create(cls, user, filename, size):
+        filename = os.path.basename(filename or '')
+        if not filename.lower().endswith(ALLOWED_EXTENSIONS):
+            raise UploadError(f"Only {', '.join(ALLOWED_EXTENSIONS)} files can be uploaded.")
+        if size <= 0 or size > settings.MEDIA_UPLOAD_MAX_SIZE:
+            raise UploadError(f"Size must be between 1 and {settings.MEDIA_UPLOAD_MAX_SIZE} bytes.")
+        session = cls(secrets.token_urlsafe(24), {
+            'user': user.pk, 'filename': filename, 'size': size, 'created': int(time.time()), 'complete': False,
+        })
+        os.makedirs(session.directory)
+        open(session.data_path, 'xb').close()
+        session.save_meta()
+        start_sweep()
+        return session
+
+    @classmethod
+    def load(cls, session_id, user=None):
+        """The session with this ID, owned by `user` when given; None if there is none."""
+        if not SESSION_ID_RE.match(session_id or ''):
+            return None
+        try:
+            with open(os.path.join(get_staging_root(), session_id, 'meta.json')) as handle:
+                session = cls(session_id, json.load(handle))
+        except (OSError, ValueError):
+            return None
+        if user is not None and session.user_id != user.pk:
+            return None
+        return session
+
+    def save_meta(self):
+        temp_path = f'{self.meta_path}.tmp'
+        with open(temp_path, 'w') as handle:
+            json.dump(self.meta, handle)
+        os.replace(temp_path, self.meta_path)
+
+    def write_chunk(self, offset, length, stream):
+        """
+        Appends `length` bytes read from `stream` at `offset`, which must be the current
+        offset. The body is copied to the staging file in CHUNK_SIZE pieces, never
+        held in memory. Returns the new offset.
+        """
+        if self.complete:
+            raise UploadError("Upload is already complete.", status=409)
+        current = self.offset
+        if offset != current:
+            raise UploadError(f"Offset must be {current}.", status=409)
+        if length <= 0 or offset + length > self.size:
+            raise UploadError(f"Chunk must be between 1 and {self.size - offset} bytes.", status=413)
+        with open(self.data_path, 'r+b') as handle:
+            handle.seek(offset)
+            remaining = length
+            while remaining > 0:
+                chunk = stream.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                handle.write(chunk)
+                remaining -= len(chunk)
+            if remaining:
+                # The client went away mid-chunk: keep only what arrived.
+                handle.truncate(offset + length - remaining)
+        return self.offset
+
+    def finalize(self):
+        if self.offset != self.size:
+            raise UploadError(f"Upload is incomplete: {self.offset} of {self.size} bytes received.", status=409)
+        self.meta['complete'] = True
+        self.save_meta()
+
+    def commit(self, file_field):
+        """
+        Saves the finished upload through `file_field`'s storage and returns the
+        storage name to assign to the field. The data file is first claimed with a
+        rename, so a concurrent commit of the same session finds it gone, and the
+        storage moves a hard link to it: the session keeps its data until delete(),
+        or until release() hands it back after a failed post.
+        """
+        os.rename(self.data_path, self.claimed_path)
+        link_path = os.path.join(self.directory, f'commit-{secrets.token_hex(4)}')
+        try:
+            os.link(self.claimed_path, link_path)
+            with StagedFile(open(link_path, 'rb'), name=self.filename) as staged:
+                return file_field.storage.save(file_field.generate_filename(None, self.filename), staged)
+        except BaseException:
+            self.release()
+            raise
+        finally:
+            # Left in place when the storage already held the same bytes.
+            if os.path.exists(link_path):
+                os.remove(link_path)
+
+    def release(self):
+        """Makes a claimed session committable again."""
+        if os.path.exists(self.claimed_path):
+            os.rename(self.claimed_path, self.data_path)
+
+    def delete(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def clear_expired_sessions(now=None):
+    """Deletes sessions older than MEDIA_UPLOAD_SESSION_TTL; returns how many were removed."""
+    now = time.time() if now is None else now
+    root = get_staging_root()
+    removed = 0
+    for session_id in os.listdir(root) if os.path.isdir(root) else []:
+        session = UploadSession.load(session_id)
+        if session is None:
+            # Missing or unreadable metadata: judge by the directory's age.
+            path = os.path.join(root, session_id)
+            expired = os.path.getmtime(path) + settings.MEDIA_UPLOAD_SESSION_TTL < now
+            if expired:
+                shutil.rmtree(path, ignore_errors=True)
+        else:
+            expired = session.expires < now
+            if expired:
+                session.delete()
+        removed += expired
+    return removed
+
+
+def start_sweep():
+    """Clears expired sessions on a background thread, at most once per MEDIA_UPLOAD_SWEEP_INTERVAL."""
+    global _last_sweep
+    with _sweep_lock:
+        if time.time() - _last_sweep < settings.MEDIA_UPLOAD_SWEEP_INTERVAL:
+            return
+        _last_sweep = time.time()
+
+    def sweep():
+        try:
+            removed = clear_expired_sessions()
+        except OSError as e:
+            logger.error(f"Upload session sweep failed: {e}")
+            return
+        if removed:
+            logger.info(f"Removed {removed} expired upload sessions")
+
+    threading.Thread(target=sweep, daemon=True).start()
+
+
+class UploadSessionField(serializers.CharField):
+    """An upload session ID that resolves to the requester's finished UploadSession."""
+    default_error_messages = {
+        'not_found': 'Upload session not found.',
+        'incomplete': 'Upload session is not finalized.',
+    }
+
+    def to_internal_value(self, data):
+        session_id = super().to_internal_value(data)
+        request = self.context.get('request')
+        session = UploadSession.load(session_id, user=request.user if request else None)
+        if session is None:
+            self.fail('not_found')
+        if not session.complete:
+            self.fail('incomplete')
+        return session
+
+
+class UploadSessionListField(serializers.ListField):
+    """Upload session IDs, each resolved by UploadSessionField and allowed only once."""
+    default_error_messages = {
+        'duplicate': 'Each upload session can only be used once.',
+    }
+
+    def __init__(self, **kwargs):
+        kwargs.setdefault('child', UploadSessionField())
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        sessions = super().to_internal_value(data)
+        if len({session.id for session in sessions}) != len(sessions):
+            self.fail('duplicate')
+        return sessions
+
+
+@contextmanager
+def commit_sessions(sessions, file_field):
+    """
+    Commits each session through `file_field` and yields the storage names, for a
+    block that saves them in a transaction. If the block raises, including when its
+    transaction fails to commit, the names are deleted and the sessions released
+    for the client to post again; otherwise the sessions are deleted once the
+    transaction commits. A session whose staged file is gone, e.g. claimed by a
+    concurrent request, is a ValidationError.
+    """
+    names = []
+    committed = []
+
+    def roll_back():
+        for name in names:
+            file_field.storage.delete(name)
+        for session in committed:
+            session.release()
+
+    try:
+        for session in sessions:
+            names.append(session.commit(file_field))
+            committed.append(session)
+    except BaseException as e:
+        roll_back()
+        if isinstance(e, FileNotFoundError):
+            raise serializers.ValidationError({'upload_ids': ['Upload session is no longer available.']})
+        raise
+    try:
+        yield names
+    except BaseException:
+        roll_back()
+        raise
+    for session in committed:
+        transaction.on_commit(session.delete)
+
+
+def get_upload_url(request, session):
+    return get_link_builder(request).url('upload-session', session.id, kwarg='session_id')
+
+
+def serialize_session(request, session):
+    return {
+        'id': session.id,
+        'filename': session.filename,
+        'size': session.size,
+        'offset': session.offset,
+        'complete': session.complete,
+        'expires': session.expires,
+        'upload_url': get_upload_url(request, session),
+    }
@@ -2,6 +2,7 @@ from django.contrib import admin
 from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
+from .views import SignedMediaView, UploadSessionCreateView, UploadSessionView, UploadSessionFinalizeView
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -10,6 +11,10 @@ urlpatterns = [
     path('api/universities/', include('universities.urls', namespace='universities')),
     path('api/lostandfound/', include('lostandfound.urls', namespace='lostandfound')),
     path('api/places/', include('places.urls', namespace='places')),
+    path('api/media/<path:name>', SignedMediaView.as_view(), name='signed-media'),
+    path('api/uploads/', UploadSessionCreateView.as_view(), name='upload-session-create'),
+    path('api/uploads/<str:session_id>/', UploadSessionView.as_view(), name='upload-session'),
+    path('api/uploads/<str:session_id>/finalize/', UploadSessionFinalizeView.as_view(), name='upload-session-finalize'),
 ]
 
 urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
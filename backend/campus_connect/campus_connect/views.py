@@ -0,0 +1,105 @@
+from rest_framework.views import APIView
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.permissions import AllowAny, IsAuthenticated
+from .media import check_media_signature, serve_media
+from .uploads import UploadError, UploadSession, serialize_session
+
+
+class SignedMediaView(APIView):
+    """
+    Serves media through links signed by the serializers, which have already made
+    the access decision. Only the signature and expiry are checked: no authentication
+    and no database access, so the files could equally be served by a static server.
+    """
+    authentication_classes = []
+    permission_classes = [AllowAny]
+
+    def get(self, request, name):
+        error = check_media_signature(
+            name, request.query_params.get('expires'), request.query_params.get('signature')
+        )
+        if error:
+            return Response({"error": error}, status=status.HTTP_403_FORBIDDEN)
+        try:
+            return serve_media(request, name)
+        except FileNotFoundError:
+            return Response({"error": "Media file not found on server."}, status=status.HTTP_404_NOT_FOUND)
+
+
+class UploadSessionCreateView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        """
+        Starts a resumable upload for a file of `size` bytes named `filename`.
+        Send the bytes with PUT requests to upload_url, each carrying an Upload-Offset
+        header, finalize it, then pass its id in `upload_ids` when creating a post.
+        """
+        try:
+            size = int(request.data.get('size', ''))
+        except (TypeError, ValueError):
+            return Response({"error": "size must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            session = UploadSession.create(request.user, request.data.get('filename'), size)
+        except UploadError as e:
+            return Response({"error": str(e)}, status=e.status)
+        return Response(serialize_session(request, session), status=status.HTTP_201_CREATED)
+
+
+class UploadSessionView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get_session(self, request, session_id):
+        return UploadSession.load(session_id, user=request.user)
+
+    def get(self, request, session_id):
+        """Reports the session, including the offset to resume from."""
+        session = self.get_session(request, session_id)
+        if session is None:
+            return Response({"error": "Upload session not found."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(serialize_session(request, session), status=status.HTTP_200_OK)
+
+    def put(self, request, session_id):
+        """
+        Writes the raw request body at the Upload-Offset header, which must equal the
+        session's current offset. A 409 answer carries the offset to resume from.
+        """
+        session = self.get_session(request, session_id)
+        if session is None:
+            return Response({"error": "Upload session not found."}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            offset = int(request.headers.get('Upload-Offset', ''))
+            length = int(request.headers.get('Content-Length', ''))
+        except ValueError:
+            return Response(
+                {"error": "Upload-Offset and Content-Length headers are required."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        try:
+            session.write_chunk(offset, length, request.stream)
+        except UploadError as e:
+            return Response({"error": str(e), "offset": session.offset}, status=e.status)
+        return Response(serialize_session(request, session), status=status.HTTP_200_OK)
+
+    def delete(self, request, session_id):
+        session = self.get_session(request, session_id)
+        if session is None:
+            return Response({"error": "Upload session not found."}, status=status.HTTP_404_NOT_FOUND)
+        session.delete()
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class UploadSessionFinalizeView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, session_id):
+        """Marks a fully received upload as ready to be attached to a post."""
+        session = UploadSession.load(session_id, user=request.user)
+        if session is None:
+            return Response({"error": "Upload session not found."}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            session.finalize()
+        except UploadError as e:
+            return Response({"error": str(e), "offset": session.offset}, status=e.status)
+        return Response(serialize_session(request, session), status=status.HTTP_200_OK)
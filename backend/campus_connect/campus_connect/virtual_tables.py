@@ -0,0 +1,106 @@
+from django.db import connections
+from django.db.models.expressions import RawSQL
+
+
+def install_missing(using, table, triggers, statements):
+    """
+    Runs `statements`, which create a SQLite virtual table with its triggers and
+    fill it, unless the table and every trigger already exist. SQLite drops
+    triggers when a migration remakes the table they watch, so this is safe, and
+    needed, to run after every migrate. Returns whether anything was installed.
+    """
+    expected = {table, *triggers}
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            f"SELECT name FROM sqlite_master WHERE name IN ({', '.join(['%s'] * len(expected))})", sorted(expected)
+        )
+        if {row[0] for row in cursor.fetchall()} == expected:
+            return False
+        for statement in statements:
+            cursor.execute(statement)
+    return True
+
+
+def drop(using, table, triggers):
+    with connections[using].cursor() as cursor:
+        for name in triggers:
+            cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+
+
+class FullTextResults:
+    """
+    Rows from one or more querysets that match an FTS5 query, best BM25 rank first,
+    ties broken by queryset and id. The querysets only restrict which rows qualify,
+    so any filter works. Supports count() and slicing for the paginators, and a
+    slice loads only its own rows.
+    Subclasses name the FTS5 table indexing each model and its bm25() weights.
+    """
+    weights = ()
+
+    def __init__(self, match, *querysets):
+        self.match = match
+        self.querysets = querysets
+
+    @property
+    def model(self):
+        return self.querysets[0].model
+
+    def get_fts_table(self, model):
+        raise NotImplementedError
+
+    def matches(self, queryset):
+        fts = self.get_fts_table(queryset.model)
+        return queryset.filter(pk__in=RawSQL(f"SELECT rowid FROM {fts} WHERE {fts} MATCH %s", [self.match]))
+
+    def get_part(self, queryset, select):
+        """
+        SQL selecting `select` from the FTS table for the queryset's matching rows.
+        The queryset is itself narrowed to the MATCH hits, otherwise SQLite walks every
+        row the filters allow and runs the full-text query once per row.
+        """
+        fts = self.get_fts_table(queryset.model)
+        sql, params = self.matches(queryset).order_by().values('id').query.sql_with_params()
+        return (
+            f"SELECT {select} FROM {fts} WHERE {fts} MATCH %s AND {fts}.rowid IN ({sql})",
+            [self.match, *params],
+        )
+
+    def count(self):
+        total = 0
+        with connections[self.querysets[0].db].cursor() as cursor:
+            for queryset in self.querysets:
+                sql, params = self.get_part(queryset, 'COUNT(*)')
+                cursor.execute(sql, params)
+                total += cursor.fetchone()[0]
+        return total
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            return self[key:key + 1][0]
+        start = key.start or 0
+        limit = -1 if key.stop is None else max(key.stop - start, 0)
+        weights = ', '.join(str(weight) for weight in self.weights)
+        parts = []
+        for index, queryset in enumerate(self.querysets):
+            fts = self.get_fts_table(queryset.model)
+            parts.append(self.get_part(queryset, f"{fts}.rowid, {index}, bm25({fts}, {weights})"))
+        sql = ' UNION ALL '.join(f'SELECT * FROM ({part})' for part, _ in parts) + ' ORDER BY 3, 2, 1 LIMIT %s OFFSET %s'
+        params = [param for _, part_params in parts for param in part_params] + [limit, start]
+        with connections[self.querysets[0].db].cursor() as cursor:
+            cursor.execute(sql, params)
+            keys = [(pk, source) for pk, source, _ in cursor.fetchall()]
+        return self.load(keys)
+
+    def load(self, keys):
+        ids_by_source = {}
+        for pk, source in keys:
+            ids_by_source.setdefault(source, []).append(pk)
+        rows = {
+            source: self.querysets[source].in_bulk(ids)
+            for source, ids in ids_by_source.items()
+        }
+        return [rows[source][pk] for pk, source in keys if pk in rows[source]]
@@ -1,7 +1,9 @@
 from django.contrib import admin
+from django.db.models import Count
 from django.utils.html import format_html
 from django.urls import reverse
-from .models import LostItem, FoundItem, ItemMedia, LostItemClaim, FoundItemClaim
+from .moderation import moderate_items
+from .models import LostItem, FoundItem, ItemMedia, ItemMediaDerivative, LostItemClaim, FoundItemClaim
 from django.utils import timezone
 from datetime import timedelta
 
@@ -49,8 +51,11 @@ class LostItemClaimInline(admin.TabularInline):
     readonly_fields = ['claimant', 'created_at', 'media_count']
     extra = 0
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(media_total=Count('media'))
+
     def media_count(self, obj):
-        return obj.media.count()
+        return obj.media_total
     media_count.short_description = "Media Files"
 
 # Inline for FoundItemClaim
@@ -60,13 +65,39 @@ class FoundItemClaimInline(admin.TabularInline):
     readonly_fields = ['claimant', 'created_at', 'media_count']
     extra = 0
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(media_total=Count('media'))
+
     def media_count(self, obj):
-        return obj.media.count()
+        return obj.media_total
     media_count.short_description = "Media Files"
 
+# Approve/reject actions shared by the lost and found admins
+class ModerationActionsMixin:
+    post_type = None
+
+    def moderate(self, request, queryset, approval_status, verb):
+        if not request.user.admin_level in ['app', 'university']:
+            self.message_user(request, f"You do not have permission to {verb} items.", level='error')
+            return
+        outcomes = moderate_items(request.user, approval_status, {
+            self.post_type: list(queryset.values_list('id', flat=True))
+        })[self.post_type]
+        changed = sum(outcome == approval_status for outcome in outcomes.values())
+        self.message_user(request, f"{changed} of {len(outcomes)} selected items {approval_status}.")
+
+    def approve_items(self, request, queryset):
+        self.moderate(request, queryset, 'approved', 'approve')
+    approve_items.short_description = "Approve selected items"
+
+    def reject_items(self, request, queryset):
+        self.moderate(request, queryset, 'rejected', 'reject')
+    reject_items.short_description = "Reject selected items"
+
 @admin.register(LostItem)
-class LostItemAdmin(admin.ModelAdmin):
-    list_display = ['title', 'user', 'university', 'status', 'approval_status', 'lost_date', 'created_at', 'media_count']
+class LostItemAdmin(ModerationActionsMixin, admin.ModelAdmin):
+    post_type = 'lost'
+    list_display = ['title', 'user', 'university', 'status', 'approval_status', 'lost_date', 'created_at', 'claims_count', 'media_count']
     list_filter = ['status', 'approval_status', 'university', DateRangeFilter]
     search_fields = ['title', 'description', 'user__email']
     ordering = ['-created_at']
@@ -88,34 +119,6 @@ class LostItemAdmin(admin.ModelAdmin):
     )
     actions = ['approve_items', 'reject_items', 'mark_found', 'mark_externally_found']
 
-    def media_count(self, obj):
-        return obj.media.count()
-    media_count.short_description = "Media Files"
-
-    def approve_items(self, request, queryset):
-        if not request.user.admin_level in ['app', 'university']:
-            self.message_user(request, "You do not have permission to approve items.", level='error')
-            return
-        for item in queryset:
-            if request.user.admin_level == 'university' and item.university != request.user.university:
-                continue
-            item.approval_status = 'approved'
-            item.save()
-        self.message_user(request, "Selected items approved.")
-    approve_items.short_description = "Approve selected items"
-
-    def reject_items(self, request, queryset):
-        if not request.user.admin_level in ['app', 'university']:
-            self.message_user(request, "You do not have permission to reject items.", level='error')
-            return
-        for item in queryset:
-            if request.user.admin_level == 'university' and item.university != request.user.university:
-                continue
-            item.approval_status = 'rejected'
-            item.save()
-        self.message_user(request, "Selected items rejected.")
-    reject_items.short_description = "Reject selected items"
-
     def mark_found(self, request, queryset):
         if not request.user.admin_level in ['app', 'university']:
             self.message_user(request, "You do not have permission to resolve items.", level='error')
@@ -143,8 +146,9 @@ class LostItemAdmin(admin.ModelAdmin):
     mark_externally_found.short_description = "Mark selected items as externally found"
 
 @admin.register(FoundItem)
-class FoundItemAdmin(admin.ModelAdmin):
-    list_display = ['title', 'user', 'university', 'status', 'approval_status', 'found_date', 'created_at', 'media_count']
+class FoundItemAdmin(ModerationActionsMixin, admin.ModelAdmin):
+    post_type = 'found'
+    list_display = ['title', 'user', 'university', 'status', 'approval_status', 'found_date', 'created_at', 'claims_count', 'media_count']
     list_filter = ['status', 'approval_status', 'university', DateRangeFilter]
     search_fields = ['title', 'description', 'user__email']
     ordering = ['-created_at']
@@ -166,34 +170,6 @@ class FoundItemAdmin(admin.ModelAdmin):
     )
     actions = ['approve_items', 'reject_items', 'mark_returned', 'mark_externally_returned']
 
-    def media_count(self, obj):
-        return obj.media.count()
-    media_count.short_description = "Media Files"
-
-    def approve_items(self, request, queryset):
-        if not request.user.admin_level in ['app', 'university']:
-            self.message_user(request, "You do not have permission to approve items.", level='error')
-            return
-        for item in queryset:
-            if request.user.admin_level == 'university' and item.university != request.user.university:
-                continue
-            item.approval_status = 'approved'
-            item.save()
-        self.message_user(request, "Selected items approved.")
-    approve_items.short_description = "Approve selected items"
-
-    def reject_items(self, request, queryset):
-        if not request.user.admin_level in ['app', 'university']:
-            self.message_user(request, "You do not have permission to reject items.", level='error')
-            return
-        for item in queryset:
-            if request.user.admin_level == 'university' and item.university != request.user.university:
-                continue
-            item.approval_status = 'rejected'
-            item.save()
-        self.message_user(request, "Selected items rejected.")
-    reject_items.short_description = "Reject selected items"
-
     def mark_returned(self, request, queryset):
         if not request.user.admin_level in ['app', 'university']:
             self.message_user(request, "You do not have permission to resolve items.", level='error')
@@ -220,8 +196,18 @@ class FoundItemAdmin(admin.ModelAdmin):
         self.message_user(request, "Selected items marked as externally returned.")
     mark_externally_returned.short_description = "Mark selected items as externally returned"
 
+# Inline for ItemMediaDerivative
+class ItemMediaDerivativeInline(admin.TabularInline):
+    model = ItemMediaDerivative
+    fields = ['size', 'status', 'file', 'width', 'height', 'updated_at']
+    readonly_fields = fields
+    extra = 0
+    max_num = 0
+    can_delete = False
+
 @admin.register(ItemMedia)
 class ItemMediaAdmin(admin.ModelAdmin):
+    inlines = [ItemMediaDerivativeInline]
     list_display = ['file_preview', 'lost_item', 'found_item', 'lost_item_claim', 'found_item_claim', 'uploaded_at']
     search_fields = ['lost_item__title', 'found_item__title', 'lost_item_claim__description', 'found_item_claim__description']
     ordering = ['-uploaded_at']
@@ -244,8 +230,11 @@ class LostItemClaimAdmin(admin.ModelAdmin):
     readonly_fields = ['created_at']
     inlines = [ItemMediaInline]
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(media_total=Count('media'))
+
     def media_count(self, obj):
-        return obj.media.count()
+        return obj.media_total
     media_count.short_description = "Media Files"
 
 @admin.register(FoundItemClaim)
@@ -256,6 +245,9 @@ class FoundItemClaimAdmin(admin.ModelAdmin):
     readonly_fields = ['created_at']
     inlines = [ItemMediaInline]
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(media_total=Count('media'))
+
     def media_count(self, obj):
-        return obj.media.count()
+        return obj.media_total
     media_count.short_description = "Media Files"
\ No newline at end of file
@@ -0,0 +1,128 @@
+import logging
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from campus_connect.response_cache import invalidate_tags
+from .models import (
+    LostItem, FoundItem, LostItemClaim, FoundItemClaim, ItemMedia, ItemMediaDerivative, ItemToken,
+    ArchivedLostItem, ArchivedFoundItem, ArchivedLostItemClaim, ArchivedFoundItemClaim,
+    ArchivedItemMedia, ArchivedItemMediaDerivative,
+)
+from .feeds import get_item_tags
+
+logger = logging.getLogger(__name__)
+
+RESOLVED_STATUSES = {
+    LostItem: ['found', 'externally_found'],
+    FoundItem: ['returned', 'externally_returned'],
+}
+# (kind, item model, claim model, foreign key to the item on claims and media)
+TIERS = [
+    ('lost', LostItem, LostItemClaim, 'lost_item'),
+    ('found', FoundItem, FoundItemClaim, 'found_item'),
+]
+ARCHIVE_MODELS = {
+    LostItem: ArchivedLostItem,
+    FoundItem: ArchivedFoundItem,
+    LostItemClaim: ArchivedLostItemClaim,
+    FoundItemClaim: ArchivedFoundItemClaim,
+    ItemMedia: ArchivedItemMedia,
+    ItemMediaDerivative: ArchivedItemMediaDerivative,
+}
+
+
+def copy_rows(model, ids):
+    """INSERT ... SELECT of the rows with these ids into the model's archive table, columns unchanged."""
+    if not ids:
+        return
+    archive = ARCHIVE_MODELS[model]
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(field.column) for field in model._meta.concrete_fields)
+    placeholders = ', '.join(['%s'] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {quote(archive._meta.db_table)} ({columns}) "
+            f"SELECT {columns} FROM {quote(model._meta.db_table)} WHERE {quote(model._meta.pk.column)} IN ({placeholders})",
+            list(ids)
+        )
+
+
+def delete_rows(model, ids):
+    """
+    Plain DELETE of the rows with these ids. Unlike QuerySet.delete() it sends no
+    signals, so counters keep counting the items, which now live in the archive.
+    """
+    if not ids:
+        return
+    quote = connection.ops.quote_name
+    placeholders = ', '.join(['%s'] * len(ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {quote(model._meta.db_table)} WHERE {quote(model._meta.pk.column)} IN ({placeholders})",
+            list(ids)
+        )
+
+
+def get_archivable_items(model, cutoff):
+    """Resolved items last updated before `cutoff`, oldest id first."""
+    return model.objects.filter(status__in=RESOLVED_STATUSES[model], updated_at__lt=cutoff).order_by('pk')
+
+
+def archive_batch(tier, cutoff, batch_size):
+    """
+    Moves up to `batch_size` items of one tier, with their claims, media and media
+    derivatives, in a single short transaction. Returns the number of items moved.
+    """
+    kind, model, claim_model, item_field = tier
+    with transaction.atomic():
+        rows = list(get_archivable_items(model, cutoff).values_list('pk', 'university_id')[:batch_size])
+        if not rows:
+            return 0
+        ids = [pk for pk, _ in rows]
+        claim_ids = list(claim_model.objects.filter(**{f'{item_field}__in': ids}).values_list('pk', flat=True))
+        media_ids = list(ItemMedia.objects.filter(
+            Q(**{f'{item_field}__in': ids}) | Q(**{f'{item_field}_claim__in': claim_ids})
+        ).values_list('pk', flat=True))
+        derivative_ids = list(ItemMediaDerivative.objects.filter(media__in=media_ids).values_list('pk', flat=True))
+
+        # Parents first on the way in, children first on the way out.
+        copy_rows(model, ids)
+        copy_rows(claim_model, claim_ids)
+        copy_rows(ItemMedia, media_ids)
+        copy_rows(ItemMediaDerivative, derivative_ids)
+        delete_rows(ItemMediaDerivative, derivative_ids)
+        delete_rows(ItemMedia, media_ids)
+        delete_rows(claim_model, claim_ids)
+        ItemToken.objects.filter(item_type=kind, item_id__in=ids).delete()
+        delete_rows(model, ids)
+        # The rows left the owners' lists without signals.
+        invalidate_tags(get_item_tags(*{university_id for _, university_id in rows}))
+    return len(ids)
+
+
+def archive_resolved_items(days=None, batch_size=None, pause=0):
+    """
+    Moves items resolved more than `days` ago to the archive tables, `batch_size`
+    items per transaction. Each batch commits on its own, so the write lock is
+    only held briefly and an interrupted run resumes where it stopped when run
+    again. `pause` seconds between batches let other writers in.
+    Returns {'lost': moved, 'found': moved}.
+    """
+    days = settings.ITEM_ARCHIVE_AFTER_DAYS if days is None else days
+    batch_size = batch_size or settings.ITEM_ARCHIVE_BATCH_SIZE
+    cutoff = timezone.now() - timedelta(days=days)
+    moved = {}
+    for tier in TIERS:
+        moved[tier[0]] = 0
+        while True:
+            count = archive_batch(tier, cutoff, batch_size)
+            moved[tier[0]] += count
+            if count < batch_size:
+                break
+            if pause:
+                time.sleep(pause)
+        logger.info(f"Archived {moved[tier[0]]} resolved {tier[0]} items")
+    return moved
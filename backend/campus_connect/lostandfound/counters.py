@@ -0,0 +1,106 @@
+from collections import Counter
+from django.db import transaction
+from django.db.models import Count, F
+from .models import LostItem, FoundItem, ArchivedLostItem, ArchivedFoundItem, ItemCounter
+
+COUNTED_MODELS = {'lost': LostItem, 'found': FoundItem}
+# Archived items still count: the archiver moves rows without sending signals.
+ARCHIVED_MODELS = {'lost': ArchivedLostItem, 'found': ArchivedFoundItem}
+UNRESOLVED_STATUSES = ['open', 'claimed']
+STAT_NAMES = ('open', 'claimed', 'resolved', 'pending', 'rejected')
+
+
+def get_kind(model):
+    return 'lost' if model is LostItem else 'found'
+
+
+def get_counter_key(item):
+    return (item.university_id, get_kind(type(item)), item.status, item.approval_status)
+
+
+def get_stored_key(item):
+    """
+    The counter key of the item as it is in the database, None if it isn't saved yet.
+    Must run inside the transaction of the write: the row stays locked until it
+    commits, so a concurrent save of another copy reads the key this one leaves.
+    """
+    if item.pk is None:
+        return None
+    row = type(item).objects.select_for_update().filter(pk=item.pk).values_list(
+        'university_id', 'status', 'approval_status'
+    ).first()
+    if row is None:
+        return None
+    university_id, item_status, approval_status = row
+    return (university_id, get_kind(type(item)), item_status, approval_status)
+
+
+def apply_deltas(deltas):
+    """Adds {(university_id, kind, status, approval_status): delta} to the counters."""
+    with transaction.atomic():
+        for (university_id, kind, item_status, approval_status), delta in deltas.items():
+            if not delta:
+                continue
+            counter, _ = ItemCounter.objects.get_or_create(
+                university_id=university_id, kind=kind, status=item_status, approval_status=approval_status
+            )
+            ItemCounter.objects.filter(pk=counter.pk).update(count=F('count') + delta)
+
+
+def record_change(old_key, new_key):
+    if old_key == new_key:
+        return
+    deltas = Counter()
+    if old_key is not None:
+        deltas[old_key] -= 1
+    if new_key is not None:
+        deltas[new_key] += 1
+    apply_deltas(deltas)
+
+
+def reconcile_counters():
+    """
+    Recomputes every counter with one GROUP BY per model and replaces the table,
+    fixing drift from bulk_create() or writes that bypassed the signals.
+    Returns the number of counter rows.
+    """
+    totals = Counter()
+    for kind, model in [*COUNTED_MODELS.items(), *ARCHIVED_MODELS.items()]:
+        rows = model.objects.order_by().values_list('university_id', 'status', 'approval_status').annotate(
+            total=Count('id')
+        )
+        for university_id, item_status, approval_status, total in rows:
+            totals[(university_id, kind, item_status, approval_status)] += total
+    counters = [
+        ItemCounter(university_id=university_id, kind=kind, status=item_status,
+                    approval_status=approval_status, count=total)
+        for (university_id, kind, item_status, approval_status), total in totals.items()
+    ]
+    with transaction.atomic():
+        ItemCounter.objects.all().delete()
+        ItemCounter.objects.bulk_create(counters)
+    return len(counters)
+
+
+def get_stats(university_id=None):
+    """
+    {university_id: {'lost': {...}, 'found': {...}}} with open, claimed, resolved,
+    pending and rejected counts. Open, claimed and resolved only count approved items.
+    Reads the counters table, so the cost does not depend on the number of items.
+    """
+    counters = ItemCounter.objects.filter(count__gt=0)
+    if university_id is not None:
+        counters = counters.filter(university_id=university_id)
+    stats = {}
+    for university, kind, item_status, approval_status, count in counters.values_list(
+        'university_id', 'kind', 'status', 'approval_status', 'count'
+    ):
+        kinds = stats.setdefault(university, {name: dict.fromkeys(STAT_NAMES, 0) for name in COUNTED_MODELS})
+        if approval_status != 'approved':
+            name = approval_status
+        elif item_status in UNRESOLVED_STATUSES:
+            name = item_status
+        else:
+            name = 'resolved'
+        kinds[kind][name] += count
+    return stats
@@ -0,0 +1,98 @@
+from django.db.models import IntegerField, Value
+
+# Cache tag of the feeds not limited to one university, which every item change bumps.
+ALL_ITEMS_TAG = 'items'
+
+
+def get_university_tag(university_id):
+    return f'university:{university_id}:items'
+
+
+def get_item_tags(*university_ids):
+    """Tags of the feeds that show items of these universities: their own and the unfiltered ones."""
+    return {ALL_ITEMS_TAG, *(get_university_tag(pk) for pk in university_ids if pk is not None)}
+
+
+def get_feed_tags(university_id=None):
+    """Tags a feed depends on: its university's when limited to one, otherwise the unfiltered feeds'."""
+    return [ALL_ITEMS_TAG] if university_id is None else [get_university_tag(university_id)]
+
+
+class MergedFeed:
+    """
+    Merges several querysets into one feed ordered newest first by (created_at, id, source).
+    The interleave runs in the database as a UNION ALL over (created_at, id, source)
+    keys, and only the rows of the requested slice are loaded, so a page costs the
+    same whatever the size of the underlying tables.
+    Works with the stock paginators: it exposes count(), filter(), order_by() and
+    slicing like a queryset, as long as filters and ordering use shared columns.
+    Ids of different models overlap, so each row also carries its queryset's index
+    as `feed_source`, which keyset paginators add to their key.
+    """
+    source_field = 'feed_source'
+
+    def __init__(self, *querysets, ordering=('-created_at', '-id', 'feed_source')):
+        self.querysets = tuple(
+            queryset if self.source_field in queryset.query.annotations
+            else queryset.annotate(**{self.source_field: Value(index, output_field=IntegerField())})
+            for index, queryset in enumerate(querysets)
+        )
+        self.ordering = tuple(ordering)
+
+    @property
+    def model(self):
+        return self.querysets[0].model
+
+    def filter(self, *args, **kwargs):
+        return MergedFeed(*(queryset.filter(*args, **kwargs) for queryset in self.querysets), ordering=self.ordering)
+
+    def order_by(self, *ordering):
+        return MergedFeed(*self.querysets, ordering=ordering)
+
+    def keys(self):
+        parts = [
+            queryset.order_by().values_list('created_at', 'id', self.source_field)
+            for queryset in self.querysets
+        ]
+        if len(parts) == 1:
+            return parts[0].order_by(*self.ordering)
+        return parts[0].union(*parts[1:], all=True).order_by(*self.ordering)
+
+    def count(self):
+        return sum(queryset.count() for queryset in self.querysets)
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            return self[key:key + 1][0]
+        return self.load(list(self.keys()[key]))
+
+    def load(self, keys):
+        """Fetches the model instances for (created_at, id, source) keys, keeping their order."""
+        ids_by_source = {}
+        for _, pk, source in keys:
+            ids_by_source.setdefault(source, []).append(pk)
+        rows = {
+            source: self.querysets[source].in_bulk(ids)
+            for source, ids in ids_by_source.items()
+        }
+        return [rows[source][pk] for _, pk, source in keys if pk in rows[source]]
+
+
+def serialize_feed(items, serializer_classes, context):
+    """
+    Serializes a mixed page of instances, one many=True pass per model,
+    and returns the results in the page order.
+    serializer_classes maps a model class to the serializer used for it.
+    """
+    grouped = {}
+    for item in items:
+        grouped.setdefault(type(item), []).append(item)
+    data = {}
+    for model, instances in grouped.items():
+        serializer = serializer_classes[model](instances, many=True, context=context)
+        for instance, item_data in zip(instances, serializer.data):
+            data[(model, instance.pk)] = item_data
+    return [data[(type(item), item.pk)] for item in items]
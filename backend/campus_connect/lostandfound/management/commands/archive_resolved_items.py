@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+from lostandfound.archive import archive_resolved_items
+
+class Command(BaseCommand):
+    help = 'Move lost and found items resolved more than ITEM_ARCHIVE_AFTER_DAYS ago to the archive tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, help='Archive items resolved more than this many days ago')
+        parser.add_argument('--batch-size', type=int, help='Items moved per transaction')
+        parser.add_argument('--pause', type=float, default=0, help='Seconds to wait between batches')
+
+    def handle(self, *args, **options):
+        moved = archive_resolved_items(options['days'], options['batch_size'], options['pause'])
+        self.stdout.write(self.style.SUCCESS(f"Archived {moved['lost']} lost and {moved['found']} found items"))
@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from campus_connect.uploads import clear_expired_sessions
+
+class Command(BaseCommand):
+    help = 'Delete resumable upload sessions older than MEDIA_UPLOAD_SESSION_TTL'
+
+    def handle(self, *args, **kwargs):
+        removed = clear_expired_sessions()
+        self.stdout.write(self.style.SUCCESS(f'Removed {removed} expired upload sessions'))
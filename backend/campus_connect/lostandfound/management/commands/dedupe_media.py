@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from campus_connect.storage import media_storage
+from lostandfound.models import ItemMedia, ArchivedItemMedia
+from places.models import PlaceMedia
+
+class Command(BaseCommand):
+    help = 'Replace duplicate item and place media files with links to shared content-addressed blobs'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--prune', action='store_true', help='Also delete blobs no media file links to')
+
+    def handle(self, *args, **options):
+        files = freed = 0
+        for model in (ItemMedia, ArchivedItemMedia, PlaceMedia):
+            for name in model.objects.exclude(file='').values_list('file', flat=True).distinct().iterator():
+                try:
+                    freed += media_storage.adopt(name)
+                except FileNotFoundError:
+                    self.stderr.write(f'Missing file: {name}')
+                    continue
+                files += 1
+        self.stdout.write(self.style.SUCCESS(f'Checked {files} files, freed {freed} bytes'))
+        if options['prune']:
+            removed = media_storage.prune_blobs()
+            self.stdout.write(self.style.SUCCESS(f'Removed {removed} unused blobs'))
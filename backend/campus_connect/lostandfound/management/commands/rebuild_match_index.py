@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from lostandfound.matching import rebuild_index
+
+class Command(BaseCommand):
+    help = 'Rebuild the token index used to match lost and found items'
+
+    def handle(self, *args, **kwargs):
+        indexed = rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f'Indexed {indexed} items'))
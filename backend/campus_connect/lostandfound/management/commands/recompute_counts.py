@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from campus_connect.counts import COUNTED_FIELDS
+
+class Command(BaseCommand):
+    help = 'Recompute the denormalized claim, media and donor counts in bulk'
+
+    def handle(self, *args, **kwargs):
+        for count in COUNTED_FIELDS:
+            rows = count.recompute()
+            self.stdout.write(self.style.SUCCESS(f'Recomputed {count} on {rows} rows'))
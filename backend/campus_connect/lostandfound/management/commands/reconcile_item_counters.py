@@ -0,0 +1,9 @@
+from django.core.management.base import BaseCommand
+from lostandfound.counters import reconcile_counters
+
+class Command(BaseCommand):
+    help = 'Recompute the per-university lost and found counters; run periodically, e.g. from cron'
+
+    def handle(self, *args, **kwargs):
+        rows = reconcile_counters()
+        self.stdout.write(self.style.SUCCESS(f'Reconciled {rows} counters'))
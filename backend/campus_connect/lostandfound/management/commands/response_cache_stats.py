@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from campus_connect.response_cache import get_metrics, reset_metrics
+
+class Command(BaseCommand):
+    help = 'Show hit, miss and bypass counts of the cached anonymous API responses'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true', help='Zero the counters after printing them')
+
+    def handle(self, *args, **options):
+        for view_name, counts in sorted(get_metrics().items()):
+            lookups = counts['hit'] + counts['miss']
+            ratio = f"{counts['hit'] / lookups:.0%}" if lookups else '-'
+            self.stdout.write(
+                f"{view_name}: {counts['hit']} hits, {counts['miss']} misses, "
+                f"{counts['bypass']} bypassed, hit ratio {ratio}"
+            )
+        if options['reset']:
+            reset_metrics()
+            self.stdout.write(self.style.SUCCESS('Counters reset'))
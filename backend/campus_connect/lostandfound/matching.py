@@ -0,0 +1,186 @@
+import math
+import re
+from django.db.models import Case, Count, F, FloatField, Sum, Value, When
+from .models import LostItem, FoundItem, ItemToken
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+STOPWORDS = frozenset(
+    'a an and are as at be by for from has have i in is it its me my near of on or '
+    'our that the this to was were with lost found item please'.split()
+)
+# Heavier fields count for more, both in the index and in the query.
+FIELD_WEIGHTS = (('title', 3), ('location', 2), ('description', 1))
+MAX_TOKENS = 64
+MATCHABLE_STATUSES = ['open', 'claimed']
+# Candidates fetched from the index before the full score is computed.
+CANDIDATE_POOL = 100
+# Postings the candidate query may read. The rarest tokens are summed until their
+# postings reach this; common words like 'black' carry little signal and would
+# otherwise make every lookup read most of the index.
+POSTING_BUDGET = 25000
+TEXT_WEIGHT, DATE_WEIGHT, TIME_WEIGHT = 0.6, 0.25, 0.15
+DATE_SCALE_DAYS = 7
+TIME_SCALE_MINUTES = 180
+
+
+def normalize(token):
+    if len(token) > 3 and token.endswith('s') and not token.endswith('ss'):
+        token = token[:-1]
+    return token[:ItemToken._meta.get_field('token').max_length]
+
+
+def tokenize(item):
+    """{token: weight} for an item's title, location and description."""
+    weights = {}
+    for field, weight in FIELD_WEIGHTS:
+        for word in TOKEN_RE.findall(getattr(item, field).lower()):
+            if len(word) < 2 or word in STOPWORDS:
+                continue
+            token = normalize(word)
+            if token not in weights and len(weights) >= MAX_TOKENS:
+                continue
+            weights[token] = max(weights.get(token, 0), weight)
+    return weights
+
+
+def get_item_type(item):
+    return 'lost' if isinstance(item, LostItem) else 'found'
+
+
+def is_matchable(item):
+    return item.approval_status == 'approved' and item.status in MATCHABLE_STATUSES
+
+
+def build_tokens(item):
+    return [
+        ItemToken(university_id=item.university_id, item_type=get_item_type(item),
+                  item_id=item.pk, token=token, weight=weight)
+        for token, weight in tokenize(item).items()
+    ]
+
+
+def sync_item(item):
+    """Replaces an item's index entries; only approved, unresolved items are indexed."""
+    ItemToken.objects.filter(item_type=get_item_type(item), item_id=item.pk).delete()
+    if is_matchable(item):
+        ItemToken.objects.bulk_create(build_tokens(item))
+
+
+def sync_items(model, ids):
+    """sync_item() for many items of one model, for changes made with queryset.update()."""
+    item_type = 'lost' if model is LostItem else 'found'
+    ItemToken.objects.filter(item_type=item_type, item_id__in=ids).delete()
+    items = model.objects.filter(pk__in=ids, approval_status='approved', status__in=MATCHABLE_STATUSES).only(
+        'id', 'university_id', 'title', 'location', 'description'
+    )
+    ItemToken.objects.bulk_create([token for item in items for token in build_tokens(item)])
+
+
+def remove_item(item):
+    ItemToken.objects.filter(item_type=get_item_type(item), item_id=item.pk).delete()
+
+
+def rebuild_index(batch_size=2000):
+    """Rebuilds the whole index from the matchable items; returns the number indexed."""
+    ItemToken.objects.all().delete()
+    indexed = 0
+    for model in (LostItem, FoundItem):
+        items = model.objects.filter(approval_status='approved', status__in=MATCHABLE_STATUSES).only(
+            'id', 'university_id', 'title', 'location', 'description'
+        )
+        tokens = []
+        for item in items.iterator(chunk_size=batch_size):
+            tokens.extend(build_tokens(item))
+            indexed += 1
+            if len(tokens) >= batch_size:
+                ItemToken.objects.bulk_create(tokens)
+                tokens = []
+        ItemToken.objects.bulk_create(tokens)
+    return indexed
+
+
+def date_score(lost_date, found_date):
+    """1 on the same day, decaying with the gap; nothing found well before it was lost."""
+    gap = (found_date - lost_date).days
+    if gap < -1:
+        return 0.0
+    return math.exp(-max(gap, 0) / DATE_SCALE_DAYS)
+
+
+def time_score(lost_time, found_time):
+    if lost_time is None or found_time is None:
+        return 0.5
+    minutes = abs((lost_time.hour * 60 + lost_time.minute) - (found_time.hour * 60 + found_time.minute))
+    return math.exp(-min(minutes, 1440 - minutes) / TIME_SCALE_MINUTES)
+
+
+def find_matches(item, limit=10, queryset=None):
+    """
+    Best matching items on the other side, in the same university, as a list of
+    (candidate, scores) ordered by scores['score'].
+
+    Candidates come from the token index: one query for token frequencies, one that
+    sums the IDF-weighted overlap per candidate not posted by the item's owner and
+    keeps the top CANDIDATE_POOL, and one that loads them. Only the rarest tokens whose postings fit POSTING_BUDGET are
+    summed, always at least one. The final score mixes that text similarity (relative
+    to the item matching itself, without the skipped tokens) with how close the dates
+    and approximate times are.
+    """
+    query = tokenize(item)
+    if not query:
+        return []
+    target_model = FoundItem if isinstance(item, LostItem) else LostItem
+    tokens = ItemToken.objects.filter(
+        university_id=item.university_id,
+        item_type='found' if target_model is FoundItem else 'lost',
+        token__in=list(query),
+    )
+    frequencies = dict(tokens.values_list('token').annotate(count=Count('id')).order_by())
+    if not frequencies:
+        return []
+    total = target_model.objects.filter(
+        university_id=item.university_id, approval_status='approved', status__in=MATCHABLE_STATUSES
+    ).count()
+    idf = {token: math.log((total + 1) / (frequencies.get(token, 0) + 1)) + 1 for token in query}
+    used, postings = [], 0
+    for token in sorted(frequencies, key=lambda token: (frequencies[token], token)):
+        if used and postings + frequencies[token] > POSTING_BUDGET:
+            break
+        used.append(token)
+        postings += frequencies[token]
+    skipped = set(frequencies).difference(used)
+    self_score = sum(weight * weight * idf[token] for token, weight in query.items() if token not in skipped)
+
+    token_scores = Case(
+        *[When(token=token, then=Value(query[token] * idf[token])) for token in used],
+        output_field=FloatField(),
+    )
+    # The owner's own posts are left out here, before the pool is cut, or they could fill it.
+    own_items = target_model.objects.filter(user_id=item.user_id).values('id')
+    pool = list(
+        tokens.filter(token__in=used).exclude(item_id__in=own_items)
+        .values('item_id').annotate(text=Sum(token_scores * F('weight')))
+        .order_by('-text', 'item_id')[:CANDIDATE_POOL]
+    )
+    text_scores = {row['item_id']: min(row['text'] / self_score, 1.0) for row in pool}
+
+    queryset = queryset if queryset is not None else target_model.objects.all()
+    candidates = queryset.filter(
+        pk__in=list(text_scores), approval_status='approved', status__in=MATCHABLE_STATUSES
+    ).exclude(user_id=item.user_id)
+
+    lost_side = isinstance(item, LostItem)
+    matches = []
+    for candidate in candidates:
+        lost, found = (item, candidate) if lost_side else (candidate, item)
+        scores = {
+            'text_score': text_scores[candidate.pk],
+            'date_score': date_score(lost.lost_date, found.found_date),
+            'time_score': time_score(lost.approximate_time, found.approximate_time),
+        }
+        scores['score'] = (
+            TEXT_WEIGHT * scores['text_score'] + DATE_WEIGHT * scores['date_score'] + TIME_WEIGHT * scores['time_score']
+        )
+        matches.append((candidate, {name: round(value, 4) for name, value in scores.items()}))
+    matches.sort(key=lambda match: (-match[1]['score'], match[0].pk))
+    return matches[:limit]
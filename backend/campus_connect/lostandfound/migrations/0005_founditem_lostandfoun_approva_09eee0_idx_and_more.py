@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-16 20:47
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lostandfound', '0004_remove_founditem_lostandfoun_univers_5275b8_idx_and_more'),
+        ('universities', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='founditem',
+            index=models.Index(fields=['approval_status', 'created_at', 'status'], name='lostandfoun_approva_09eee0_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='lostitem',
+            index=models.Index(fields=['approval_status', 'created_at', 'status'], name='lostandfoun_approva_53c254_idx'),
+        ),
+    ]
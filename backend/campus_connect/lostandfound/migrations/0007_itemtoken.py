@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-16 21:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lostandfound', '0006_itemmediaderivative'),
+        ('universities', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItemToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('item_type', models.CharField(choices=[('lost', 'Lost'), ('found', 'Found')], max_length=5)),
+                ('item_id', models.PositiveBigIntegerField()),
+                ('token', models.CharField(max_length=32)),
+                ('weight', models.PositiveSmallIntegerField()),
+                ('university', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='universities.university')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['university', 'item_type', 'token', 'item_id', 'weight'], name='lostandfoun_univers_285e8d_idx'), models.Index(fields=['item_type', 'item_id'], name='lostandfoun_item_ty_f62412_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,55 @@
+from django.db import migrations
+
+# The index as it stood at this migration, frozen here rather than imported from
+# lostandfound.search, which follows the live models.
+COLUMNS = ('title', 'description', 'location')
+MODELS = ('LostItem', 'FoundItem')
+
+
+def get_index_statements(table):
+    fts = f'{table}_fts'
+    columns = ', '.join(COLUMNS)
+    new_values = ', '.join(f'new.{column}' for column in COLUMNS)
+    old_values = ', '.join(f'old.{column}' for column in COLUMNS)
+    delete_old = f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_values});"
+    insert_new = f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({columns}, content='{table}', content_rowid='id', "
+        f"tokenize='porter unicode61 remove_diacritics 2', prefix='2 3')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN {delete_old} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {columns} ON {table} BEGIN {delete_old} {insert_new} END",
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+
+def get_tables(apps):
+    return [apps.get_model('lostandfound', name)._meta.db_table for name in MODELS]
+
+
+def install_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for table in get_tables(apps):
+        for statement in get_index_statements(table):
+            schema_editor.execute(statement)
+
+
+def uninstall_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for table in get_tables(apps):
+        for suffix in ('_ai', '_ad', '_au'):
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {table}_fts{suffix}")
+        schema_editor.execute(f"DROP TABLE IF EXISTS {table}_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lostandfound', '0007_itemtoken'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
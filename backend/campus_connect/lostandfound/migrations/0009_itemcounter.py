@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_items(apps, schema_editor):
+    ItemCounter = apps.get_model('lostandfound', 'ItemCounter')
+    counters = []
+    for kind, model_name in (('lost', 'LostItem'), ('found', 'FoundItem')):
+        rows = apps.get_model('lostandfound', model_name).objects.order_by().values(
+            'university_id', 'status', 'approval_status'
+        ).annotate(total=Count('id'))
+        counters.extend(
+            ItemCounter(university_id=row['university_id'], kind=kind, status=row['status'],
+                        approval_status=row['approval_status'], count=row['total'])
+            for row in rows
+        )
+    ItemCounter.objects.bulk_create(counters)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lostandfound', '0008_item_search_index'),
+        ('universities', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ItemCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('lost', 'Lost'), ('found', 'Found')], max_length=5)),
+                ('status', models.CharField(max_length=20)),
+                ('approval_status', models.CharField(max_length=20)),
+                ('count', models.IntegerField(default=0)),
+                ('university', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='universities.university')),
+            ],
+            options={
+                'unique_together': {('university', 'kind', 'status', 'approval_status')},
+            },
+        ),
+        migrations.RunPython(count_items, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:48
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def recompute_counts(apps, schema_editor):
+    ItemMedia = apps.get_model('lostandfound', 'ItemMedia')
+    for kind in ('lost', 'found'):
+        model = apps.get_model('lostandfound', f'{kind.capitalize()}Item')
+        claim_model = apps.get_model('lostandfound', f'{kind.capitalize()}ItemClaim')
+        for field, related_model in (('claims_count', claim_model), ('media_count', ItemMedia)):
+            counts = related_model.objects.filter(**{f'{kind}_item': OuterRef('pk')}).order_by().values(
+                f'{kind}_item'
+            ).annotate(total=Count('pk')).values('total')
+            model.objects.update(**{field: Coalesce(Subquery(counts), 0)})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lostandfound', '0009_itemcounter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='founditem',
+            name='claims_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='founditem',
+            name='media_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='lostitem',
+            name='claims_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='lostitem',
+            name='media_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(recompute_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,154 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:59
+
+import campus_connect.storage
+import django.db.models.deletion
+import django.db.models.functions.datetime
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lostandfound', '0011_media_storage'),
+        ('universities', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedFoundItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=255)),
+                ('description', models.TextField()),
+                ('found_date', models.DateField()),
+                ('approximate_time', models.TimeField(blank=True, null=True)),
+                ('location', models.CharField(max_length=255)),
+                ('status', models.CharField(choices=[('open', 'Open'), ('claimed', 'Claimed'), ('returned', 'Returned'), ('externally_returned', 'Externally Returned')], max_length=20)),
+                ('approval_status', models.CharField(choices=[('pending', 'Pending'), ('approved', 'Approved'), ('rejected', 'Rejected')], max_length=20)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('claims_count', models.PositiveIntegerField(default=0, editable=False)),
+                ('media_count', models.PositiveIntegerField(default=0, editable=False)),
+                ('archived_at', models.DateTimeField(db_default=django.db.models.functions.datetime.Now())),
+                ('resolved_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('university', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='universities.university')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedFoundItemClaim',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('description', models.TextField()),
+                ('created_at', models.DateTimeField()),
+                ('claimant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('found_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='claims', to='lostandfound.archivedfounditem')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedItemMedia',
+            fields=[
+                ('id', models.CharField(editable=False, max_length=16, primary_key=True, serialize=False)),
+                ('file', models.FileField(storage=campus_connect.storage.get_media_storage, upload_to='lostandfound/media/')),
+                ('uploaded_at', models.DateTimeField()),
+                ('found_item', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='media', to='lostandfound.archivedfounditem')),
+                ('found_item_claim', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='media', to='lostandfound.archivedfounditemclaim')),
+            ],
+            options={
+                'ordering': ['-uploaded_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedItemMediaDerivative',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('size', models.CharField(choices=[('thumb', 'Thumbnail'), ('medium', 'Medium')], max_length=10)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('ready', 'Ready'), ('failed', 'Failed')], max_length=10)),
+                ('file', models.FileField(blank=True, upload_to='lostandfound/media/derivatives/')),
+                ('width', models.PositiveIntegerField(blank=True, null=True)),
+                ('height', models.PositiveIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('media', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='derivatives', to='lostandfound.archiveditemmedia')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedLostItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=255)),
+                ('description', models.TextField()),
+                ('lost_date', models.DateField()),
+                ('approximate_time', models.TimeField(blank=True, null=True)),
+                ('location', models.CharField(max_length=255)),
+                ('status', models.CharField(choices=[('open', 'Open'), ('claimed', 'Claimed'), ('found', 'Found'), ('externally_found', 'Externally Found')], max_length=20)),
+                ('approval_status', models.CharField(choices=[('pending', 'Pending'), ('approved', 'Approved'), ('rejected', 'Rejected')], max_length=20)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('claims_count', models.PositiveIntegerField(default=0, editable=False)),
+                ('media_count', models.PositiveIntegerField(default=0, editable=False)),
+                ('archived_at', models.DateTimeField(db_default=django.db.models.functions.datetime.Now())),
+                ('resolved_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('university', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='universities.university')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='archiveditemmedia',
+            name='lost_item',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='media', to='lostandfound.archivedlostitem'),
+        ),
+        migrations.CreateModel(
+            name='ArchivedLostItemClaim',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('description', models.TextField()),
+                ('created_at', models.DateTimeField()),
+                ('claimant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('lost_item', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='claims', to='lostandfound.archivedlostitem')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='archiveditemmedia',
+            name='lost_item_claim',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='media', to='lostandfound.archivedlostitemclaim'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedfounditem',
+            index=models.Index(fields=['approval_status', 'created_at'], name='lostandfoun_approva_1d7a85_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedfounditem',
+            index=models.Index(fields=['user'], name='lostandfoun_user_id_cf4345_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedfounditemclaim',
+            index=models.Index(fields=['claimant'], name='lostandfoun_claiman_48ba86_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedlostitem',
+            index=models.Index(fields=['approval_status', 'created_at'], name='lostandfoun_approva_06c8c1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedlostitem',
+            index=models.Index(fields=['user'], name='lostandfoun_user_id_65b581_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='archivedlostitemclaim',
+            index=models.Index(fields=['claimant'], name='lostandfoun_claiman_49bdbc_idx'),
+        ),
+    ]
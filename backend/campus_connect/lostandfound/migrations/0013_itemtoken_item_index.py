@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-17 00:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lostandfound', '0012_archive'),
+        ('universities', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='itemtoken',
+            name='lostandfoun_item_ty_f62412_idx',
+        ),
+        migrations.AddIndex(
+            model_name='itemtoken',
+            index=models.Index(fields=['item_id', 'item_type'], name='lostandfoun_item_id_7df3f9_idx'),
+        ),
+    ]
@@ -1,14 +1,18 @@
 import secrets
 from django.db import models
+from django.db.models.functions import Now
 from django.conf import settings
 from django.core.validators import FileExtensionValidator
 from universities.models import University
+from campus_connect.counts import CountedModel
+from campus_connect.derivatives import DERIVATIVE_SIZE_CHOICES, DERIVATIVE_STATUS_CHOICES
+from campus_connect.storage import get_media_storage
 from django.utils.translation import gettext_lazy as _
 
 def generate_random_id():
     return secrets.token_urlsafe(12)
 
-class LostItem(models.Model):
+class LostItem(CountedModel):
     STATUS_CHOICES = (
         ('open', 'Open'),
         ('claimed', 'Claimed'),
@@ -47,18 +51,21 @@ class LostItem(models.Model):
         blank=True,
         related_name='resolved_lost_items'
     )
+    claims_count = models.PositiveIntegerField(default=0, editable=False)
+    media_count = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['university', 'status', 'approval_status']),
             models.Index(fields=['user']),
+            models.Index(fields=['approval_status', 'created_at', 'status']),
         ]
 
     def __str__(self):
         return f"Lost: {self.title} by {self.user.email}"
 
-class FoundItem(models.Model):
+class FoundItem(CountedModel):
     STATUS_CHOICES = (
         ('open', 'Open'),
         ('claimed', 'Claimed'),
@@ -97,12 +104,15 @@ class FoundItem(models.Model):
         blank=True,
         related_name='resolved_found_items'
     )
+    claims_count = models.PositiveIntegerField(default=0, editable=False)
+    media_count = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         ordering = ['-created_at']
         indexes = [
             models.Index(fields=['university', 'status', 'approval_status']),
             models.Index(fields=['user']),
+            models.Index(fields=['approval_status', 'created_at', 'status']),
         ]
 
     def __str__(self):
@@ -145,6 +155,7 @@ class ItemMedia(models.Model):
     )
     file = models.FileField(
         upload_to='lostandfound/media/',
+        storage=get_media_storage,
         validators=[FileExtensionValidator(allowed_extensions=['jpg', 'jpeg', 'png', 'mp4', 'mov'])]
     )
     uploaded_at = models.DateTimeField(auto_now_add=True)
@@ -163,6 +174,27 @@ class ItemMedia(models.Model):
             return f"Media for Found Claim: {self.found_item_claim.found_item.title}"
         return "Media"
 
+class ItemMediaDerivative(models.Model):
+    """A scaled-down copy of an item media image, rendered after upload."""
+    media = models.ForeignKey(
+        ItemMedia,
+        on_delete=models.CASCADE,
+        related_name='derivatives'
+    )
+    size = models.CharField(max_length=10, choices=DERIVATIVE_SIZE_CHOICES)
+    status = models.CharField(max_length=10, choices=DERIVATIVE_STATUS_CHOICES, default='pending')
+    file = models.FileField(upload_to='lostandfound/media/derivatives/', blank=True)
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['media', 'size']
+
+    def __str__(self):
+        return f"{self.get_size_display()} of {self.media_id} ({self.status})"
+
 class LostItemClaim(models.Model):
     lost_item = models.ForeignKey(
         LostItem,
@@ -203,4 +235,189 @@ class FoundItemClaim(models.Model):
         unique_together = ['found_item', 'claimant']
 
     def __str__(self):
-        return f"Claim by {self.claimant.email} for {self.found_item.title}"
\ No newline at end of file
+        return f"Claim by {self.claimant.email} for {self.found_item.title}"
+
+
+class ItemToken(models.Model):
+    """
+    Inverted index entry used to match lost and found items: one row per token of an
+    approved, unresolved item, weighted by the field it came from.
+    """
+    ITEM_TYPE_CHOICES = (
+        ('lost', 'Lost'),
+        ('found', 'Found'),
+    )
+
+    university = models.ForeignKey(
+        University,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    item_type = models.CharField(max_length=5, choices=ITEM_TYPE_CHOICES)
+    item_id = models.PositiveBigIntegerField()
+    token = models.CharField(max_length=32)
+    weight = models.PositiveSmallIntegerField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['university', 'item_type', 'token', 'item_id', 'weight']),
+            # item_id first: led by item_type, SQLite would scan it for the candidate query's GROUP BY item_id.
+            models.Index(fields=['item_id', 'item_type']),
+        ]
+
+    def __str__(self):
+        return f"{self.token} -> {self.item_type} {self.item_id}"
+
+
+class ItemCounter(models.Model):
+    """
+    Number of lost or found items of a university in each (status, approval_status),
+    kept up to date as items change so stats never need to count the item tables.
+    """
+    KIND_CHOICES = (
+        ('lost', 'Lost'),
+        ('found', 'Found'),
+    )
+
+    university = models.ForeignKey(
+        University,
+        on_delete=models.CASCADE,
+        related_name='+'
+    )
+    kind = models.CharField(max_length=5, choices=KIND_CHOICES)
+    status = models.CharField(max_length=20)
+    approval_status = models.CharField(max_length=20)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ['university', 'kind', 'status', 'approval_status']
+
+    def __str__(self):
+        return f"{self.university_id} {self.kind} {self.status}/{self.approval_status}: {self.count}"
+
+
+class ArchivedLostItem(models.Model):
+    """
+    A resolved lost item moved out of LostItem by the archiver, with the same id and
+    columns, so the hot table and its indexes only hold live posts.
+    """
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    university = models.ForeignKey(University, on_delete=models.CASCADE, related_name='+')
+    title = models.CharField(max_length=255)
+    description = models.TextField()
+    lost_date = models.DateField()
+    approximate_time = models.TimeField(null=True, blank=True)
+    location = models.CharField(max_length=255)
+    status = models.CharField(max_length=20, choices=LostItem.STATUS_CHOICES)
+    approval_status = models.CharField(max_length=20, choices=LostItem.APPROVAL_STATUS_CHOICES)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    resolved_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+    claims_count = models.PositiveIntegerField(default=0, editable=False)
+    media_count = models.PositiveIntegerField(default=0, editable=False)
+    archived_at = models.DateTimeField(db_default=Now())
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['approval_status', 'created_at']),
+            models.Index(fields=['user']),
+        ]
+
+    def __str__(self):
+        return f"Archived lost: {self.title}"
+
+class ArchivedFoundItem(models.Model):
+    """A resolved found item moved out of FoundItem by the archiver."""
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    university = models.ForeignKey(University, on_delete=models.CASCADE, related_name='+')
+    title = models.CharField(max_length=255)
+    description = models.TextField()
+    found_date = models.DateField()
+    approximate_time = models.TimeField(null=True, blank=True)
+    location = models.CharField(max_length=255)
+    status = models.CharField(max_length=20, choices=FoundItem.STATUS_CHOICES)
+    approval_status = models.CharField(max_length=20, choices=FoundItem.APPROVAL_STATUS_CHOICES)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    resolved_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name='+'
+    )
+    claims_count = models.PositiveIntegerField(default=0, editable=False)
+    media_count = models.PositiveIntegerField(default=0, editable=False)
+    archived_at = models.DateTimeField(db_default=Now())
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['approval_status', 'created_at']),
+            models.Index(fields=['user']),
+        ]
+
+    def __str__(self):
+        return f"Archived found: {self.title}"
+
+class ArchivedLostItemClaim(models.Model):
+    lost_item = models.ForeignKey(ArchivedLostItem, on_delete=models.CASCADE, related_name='claims')
+    claimant = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    description = models.TextField()
+    created_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [models.Index(fields=['claimant'])]
+
+    def __str__(self):
+        return f"Archived claim for {self.lost_item_id}"
+
+class ArchivedFoundItemClaim(models.Model):
+    found_item = models.ForeignKey(ArchivedFoundItem, on_delete=models.CASCADE, related_name='claims')
+    claimant = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='+')
+    description = models.TextField()
+    created_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [models.Index(fields=['claimant'])]
+
+    def __str__(self):
+        return f"Archived claim for {self.found_item_id}"
+
+class ArchivedItemMedia(models.Model):
+    """Media of an archived item or claim; the file itself stays where it was stored."""
+    id = models.CharField(max_length=16, primary_key=True, editable=False)
+    lost_item = models.ForeignKey(
+        ArchivedLostItem, on_delete=models.CASCADE, null=True, blank=True, related_name='media'
+    )
+    found_item = models.ForeignKey(
+        ArchivedFoundItem, on_delete=models.CASCADE, null=True, blank=True, related_name='media'
+    )
+    lost_item_claim = models.ForeignKey(
+        ArchivedLostItemClaim, on_delete=models.CASCADE, null=True, blank=True, related_name='media'
+    )
+    found_item_claim = models.ForeignKey(
+        ArchivedFoundItemClaim, on_delete=models.CASCADE, null=True, blank=True, related_name='media'
+    )
+    file = models.FileField(upload_to='lostandfound/media/', storage=get_media_storage)
+    uploaded_at = models.DateTimeField()
+
+    class Meta:
+        ordering = ['-uploaded_at']
+
+    def __str__(self):
+        return f"Archived media {self.id}"
+
+class ArchivedItemMediaDerivative(models.Model):
+    media = models.ForeignKey(ArchivedItemMedia, on_delete=models.CASCADE, related_name='derivatives')
+    size = models.CharField(max_length=10, choices=DERIVATIVE_SIZE_CHOICES)
+    status = models.CharField(max_length=10, choices=DERIVATIVE_STATUS_CHOICES)
+    file = models.FileField(upload_to='lostandfound/media/derivatives/', blank=True)
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.get_size_display()} of archived {self.media_id}"
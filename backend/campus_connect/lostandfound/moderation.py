@@ -0,0 +1,66 @@
+from collections import Counter
+from django.db import transaction
+from django.db.models import IntegerField, Value
+from django.utils import timezone
+from campus_connect.response_cache import invalidate_tags
+from .counters import apply_deltas
+from .feeds import get_item_tags
+from .matching import sync_items
+from .models import LostItem, FoundItem
+
+MODERATION_MODELS = {'lost': LostItem, 'found': FoundItem}
+
+
+def can_moderate(user, university_id):
+    if user.admin_level == 'app':
+        return True
+    return user.admin_level == 'university' and university_id == user.university_id
+
+
+def moderate_items(user, approval_status, ids_by_type):
+    """
+    Sets approval_status on many lost and found items at once.
+    ids_by_type maps 'lost'/'found' to item IDs. Inside one transaction the items'
+    universities and statuses are read with one query, the permitted items are
+    changed with one UPDATE per model and the university counters are adjusted.
+    Returns the outcome of every ID per type: approval_status when applied,
+    'forbidden' or 'not_found' otherwise.
+    """
+    ids_by_type = {post_type: set(ids) for post_type, ids in ids_by_type.items() if ids}
+    post_types = list(ids_by_type)
+    parts = [
+        MODERATION_MODELS[post_type].objects.filter(pk__in=ids).order_by()
+        .annotate(post_type=Value(index, output_field=IntegerField()))
+        .values_list('id', 'university_id', 'status', 'approval_status', 'post_type')
+        for index, (post_type, ids) in enumerate(ids_by_type.items())
+    ]
+    outcomes = {}
+    deltas = Counter()
+    with transaction.atomic():
+        stored = {}
+        if parts:
+            rows = parts[0].union(*parts[1:], all=True) if len(parts) > 1 else parts[0]
+            stored = {(post_types[index], pk): row for pk, *row, index in rows}
+
+        for post_type, ids in ids_by_type.items():
+            outcomes[post_type] = {}
+            allowed = []
+            for pk in sorted(ids):
+                if (post_type, pk) not in stored:
+                    outcomes[post_type][pk] = 'not_found'
+                    continue
+                university_id, item_status, old_approval_status = stored[(post_type, pk)]
+                if not can_moderate(user, university_id):
+                    outcomes[post_type][pk] = 'forbidden'
+                    continue
+                outcomes[post_type][pk] = approval_status
+                allowed.append(pk)
+                deltas[(university_id, post_type, item_status, old_approval_status)] -= 1
+                deltas[(university_id, post_type, item_status, approval_status)] += 1
+            if allowed:
+                model = MODERATION_MODELS[post_type]
+                model.objects.filter(pk__in=allowed).update(approval_status=approval_status, updated_at=timezone.now())
+                sync_items(model, allowed)
+                invalidate_tags(get_item_tags(*{stored[(post_type, pk)][0] for pk in allowed}))
+        apply_deltas(deltas)
+    return outcomes
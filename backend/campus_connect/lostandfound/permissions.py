@@ -0,0 +1,48 @@
+from .models import LostItemClaim, FoundItemClaim
+
+ADMIN_LEVELS = ['app', 'university']
+
+
+class ClaimedItems:
+    """The (kind, item id) pairs a user has claimed, loaded on first lookup."""
+    def __init__(self, user):
+        self.user = user
+        self.pairs = None
+
+    def __contains__(self, pair):
+        if self.pairs is None:
+            lost = LostItemClaim.objects.filter(claimant=self.user).values_list('lost_item_id', flat=True)
+            found = FoundItemClaim.objects.filter(claimant=self.user).values_list('found_item_id', flat=True)
+            self.pairs = {('lost', pk) for pk in lost} | {('found', pk) for pk in found}
+        return pair in self.pairs
+
+
+def get_claimed_items(request):
+    """Returns the ClaimedItems cached on the request, creating it on first use."""
+    claimed = getattr(request, '_claimed_items', None)
+    if claimed is None:
+        claimed = request._claimed_items = ClaimedItems(request.user)
+    return claimed
+
+
+def can_access_media(media, user, claimed_items):
+    """
+    Owners access all their posts' media; others access approved, unresolved posts'
+    media if they claimed the post or are admins. Claim media is visible to the
+    claimant and admins.
+    """
+    if not user.is_authenticated:
+        return False
+    is_admin = user.admin_level in ADMIN_LEVELS
+    if media.lost_item_id or media.found_item_id:
+        kind, item = ('lost', media.lost_item) if media.lost_item_id else ('found', media.found_item)
+        if item.user_id == user.pk:
+            return True
+        if item.approval_status != 'approved' or item.status not in ['open', 'claimed']:
+            return False
+        return is_admin or (kind, item.pk) in claimed_items
+    if media.lost_item_claim_id and media.lost_item_claim.claimant_id == user.pk:
+        return True
+    if media.found_item_claim_id and media.found_item_claim.claimant_id == user.pk:
+        return True
+    return is_admin
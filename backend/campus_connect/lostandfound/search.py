@@ -0,0 +1,105 @@
+import re
+from functools import reduce
+from operator import and_, or_
+from django.db import connections
+from django.db.models import Q
+from campus_connect.virtual_tables import FullTextResults, drop, install_missing
+from .feeds import MergedFeed
+from .models import LostItem, FoundItem
+
+SEARCH_FIELDS = ('title', 'description', 'location')
+# bm25() column weights, in SEARCH_FIELDS order.
+BM25_WEIGHTS = (10.0, 1.0, 4.0)
+TERM_RE = re.compile(r'(\w+)(\*?)')
+MAX_TERMS = 16
+TRIGGER_SUFFIXES = ('_ai', '_ad', '_au')
+
+
+def get_fts_table(model):
+    return f'{model._meta.db_table}_fts'
+
+
+def get_trigger_names(model):
+    fts = get_fts_table(model)
+    return [f'{fts}{suffix}' for suffix in TRIGGER_SUFFIXES]
+
+
+def get_index_statements(model):
+    """
+    SQL for an external-content FTS5 table over the model's SEARCH_FIELDS, plus the
+    triggers that keep it in step with inserts, updates and deletes.
+    """
+    table, fts = model._meta.db_table, get_fts_table(model)
+    columns = ', '.join(SEARCH_FIELDS)
+    new_values = ', '.join(f'new.{field}' for field in SEARCH_FIELDS)
+    old_values = ', '.join(f'old.{field}' for field in SEARCH_FIELDS)
+    delete_old = f"INSERT INTO {fts}({fts}, rowid, {columns}) VALUES ('delete', old.id, {old_values});"
+    insert_new = f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new_values});"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({columns}, content='{table}', content_rowid='id', "
+        f"tokenize='porter unicode61 remove_diacritics 2', prefix='2 3')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} BEGIN {delete_old} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {columns} ON {table} BEGIN {delete_old} {insert_new} END",
+    ]
+
+
+def fts_available(using='default'):
+    return connections[using].vendor == 'sqlite'
+
+
+def install_search_index(using='default'):
+    """
+    Creates the FTS5 tables and triggers where they are missing and rebuilds the
+    index of any table that was missing one. Does nothing on other backends, which
+    use the icontains fallback.
+    """
+    if not fts_available(using):
+        return
+    for model in (LostItem, FoundItem):
+        fts = get_fts_table(model)
+        statements = [*get_index_statements(model), f"INSERT INTO {fts}({fts}) VALUES ('rebuild')"]
+        install_missing(using, fts, get_trigger_names(model), statements)
+
+
+def uninstall_search_index(using='default'):
+    if not fts_available(using):
+        return
+    for model in (LostItem, FoundItem):
+        drop(using, get_fts_table(model), get_trigger_names(model))
+
+
+def parse_query(text):
+    """[(term, is_prefix)] for the words of a user query; 'wall*' asks for a prefix match."""
+    return [(term.lower(), bool(star)) for term, star in TERM_RE.findall(text)][:MAX_TERMS]
+
+
+def build_match(terms):
+    """An FTS5 MATCH expression requiring every term, with quoting so input cannot inject syntax."""
+    return ' '.join(f'"{term}"' + ('*' if prefix else '') for term, prefix in terms)
+
+
+class SearchResults(FullTextResults):
+    """Lost and found items matching an FTS5 query, from one queryset per model."""
+    weights = BM25_WEIGHTS
+
+    def get_fts_table(self, model):
+        return get_fts_table(model)
+
+
+def search_items(text, *querysets):
+    """
+    Full-text search over the items of the given querysets. Uses the FTS5 index with
+    BM25 ranking on SQLite; elsewhere every term must appear (as a substring) in one
+    of the SEARCH_FIELDS and results come newest first.
+    """
+    terms = parse_query(text)
+    if not terms:
+        return MergedFeed(*(queryset.none() for queryset in querysets))
+    if fts_available(querysets[0].db):
+        return SearchResults(build_match(terms), *querysets)
+    condition = reduce(and_, (
+        reduce(or_, (Q(**{f'{field}__icontains': term}) for field in SEARCH_FIELDS))
+        for term, _ in terms
+    ))
+    return MergedFeed(*(queryset.filter(condition) for queryset in querysets))
@@ -1,13 +1,25 @@
 from rest_framework import serializers
-from .models import LostItem, FoundItem, LostItemClaim, FoundItemClaim, ItemMedia
+from .models import (
+    LostItem, FoundItem, LostItemClaim, FoundItemClaim, ItemMedia, ItemMediaDerivative,
+    ArchivedLostItem, ArchivedFoundItem, ArchivedLostItemClaim, ArchivedFoundItemClaim,
+)
 from universities.models import University
+from django.db import transaction
 from django.utils import timezone
 from django.contrib.auth import get_user_model
-from django.urls import reverse
 from accounts.serializers import SimpleUserSerializer
+from campus_connect.prefetch import QuerysetPlanMixin
+from campus_connect.links import get_link_builder
+from campus_connect.media import signed_media_url
+from campus_connect.derivatives import get_media_file, schedule_derivatives
+from campus_connect.uploads import UploadSessionListField, commit_sessions
+from .permissions import can_access_media, get_claimed_items
 
 User = get_user_model()
 
+LOST_MODELS = (LostItem, ArchivedLostItem)
+ITEM_MEDIA_FILE = ItemMedia._meta.get_field('file')
+
 # class SimpleUserSerializer(serializers.ModelSerializer):
 #     detail_url = serializers.SerializerMethodField()
 
@@ -24,7 +36,20 @@ User = get_user_model()
 #         except:
 #             return None  # Fallback if user-detail is not defined
 
-class SimpleItemMediaSerializer(serializers.ModelSerializer):
+def create_media(files, **owner):
+    """
+    Creates an ItemMedia for each uploaded file or committed upload session name,
+    attached to `owner`. Callers run it in the transaction that creates the owner,
+    inside commit_sessions(), so a failed post leaves no files and keeps its sessions.
+    """
+    for file in files:
+        media = ItemMedia.objects.create(file=file, **owner)
+        schedule_derivatives(media, ItemMediaDerivative)
+    return len(files)
+
+class SimpleItemMediaSerializer(QuerysetPlanMixin, serializers.ModelSerializer):
+    prefetch_related_fields = ('derivatives',)
+
     file_url = serializers.SerializerMethodField()
 
     class Meta:
@@ -32,12 +57,23 @@ class SimpleItemMediaSerializer(serializers.ModelSerializer):
         fields = ['id', 'file_url']
 
     def get_file_url(self, obj):
+        """
+        Signed link when the requester may see the file, the checked endpoint otherwise.
+        Lists link to thumbnails, single objects to the original.
+        """
         request = self.context.get('request')
         if request is None:
             return None
-        return request.build_absolute_uri(reverse('lostandfound:media-access', kwargs={'pk': obj.id}))
+        size = 'thumb' if isinstance(self.root, serializers.ListSerializer) else None
+        if can_access_media(obj, request.user, get_claimed_items(request)):
+            return signed_media_url(request, get_media_file(obj, size).name)
+        url = get_link_builder(request).url('lostandfound:media-access', obj.id)
+        return f"{url}?size={size}" if size else url
+
+class BaseItemSerializer(QuerysetPlanMixin, serializers.ModelSerializer):
+    select_related_fields = ('user',)
+    prefetch_related_fields = ('media',)
 
-class BaseItemSerializer(serializers.ModelSerializer):
     user = SimpleUserSerializer(read_only=True)
     media = SimpleItemMediaSerializer(many=True, read_only=True)
     post_type = serializers.SerializerMethodField()
@@ -48,7 +84,7 @@ class BaseItemSerializer(serializers.ModelSerializer):
     approve_url = serializers.SerializerMethodField()
 
     def get_post_type(self, obj):
-        return 'lost' if isinstance(obj, LostItem) else 'found'
+        return 'lost' if isinstance(obj, LOST_MODELS) else 'found'
 
     def get_is_admin(self, obj):
         request = self.context.get('request')
@@ -60,25 +96,25 @@ class BaseItemSerializer(serializers.ModelSerializer):
         request = self.context.get('request')
         if request is None:
             return None
-        view_name = 'lostandfound:lost-item-detail' if isinstance(obj, LostItem) else 'lostandfound:found-item-detail'
-        return request.build_absolute_uri(reverse(view_name, kwargs={'pk': obj.pk}))
+        view_name = 'lostandfound:lost-item-detail' if isinstance(obj, LOST_MODELS) else 'lostandfound:found-item-detail'
+        return get_link_builder(request).url(view_name, obj.pk)
 
     def get_claims_url(self, obj):
         request = self.context.get('request')
         if request is None:
             return None
-        view_name = 'lostandfound:lost-item-claims' if isinstance(obj, LostItem) else 'lostandfound:found-item-claims'
-        return request.build_absolute_uri(reverse(view_name, kwargs={'pk': obj.pk}))
+        view_name = 'lostandfound:lost-item-claims' if isinstance(obj, LOST_MODELS) else 'lostandfound:found-item-claims'
+        return get_link_builder(request).url(view_name, obj.pk)
 
     def get_resolve_url(self, obj):
         request = self.context.get('request')
         if request is None or not request.user.is_authenticated:
             return None
         # Only owners can resolve
-        if obj.user != request.user:
+        if obj.user_id != request.user.pk:
             return None
-        view_name = 'lostandfound:lost-item-resolve' if isinstance(obj, LostItem) else 'lostandfound:found-item-resolve'
-        return request.build_absolute_uri(reverse(view_name, kwargs={'pk': obj.pk}))
+        view_name = 'lostandfound:lost-item-resolve' if isinstance(obj, LOST_MODELS) else 'lostandfound:found-item-resolve'
+        return get_link_builder(request).url(view_name, obj.pk)
 
     def get_approve_url(self, obj):
         request = self.context.get('request')
@@ -86,9 +122,9 @@ class BaseItemSerializer(serializers.ModelSerializer):
             return None
         # Only admins with permission can approve
         user = request.user
-        if user.admin_level == 'app' or (user.admin_level == 'university' and obj.university == user.university):
-            view_name = 'lostandfound:lost-item-approve' if isinstance(obj, LostItem) else 'lostandfound:found-item-approve'
-            return request.build_absolute_uri(reverse(view_name, kwargs={'pk': obj.pk}))
+        if user.admin_level == 'app' or (user.admin_level == 'university' and obj.university_id == user.university_id):
+            view_name = 'lostandfound:lost-item-approve' if isinstance(obj, LOST_MODELS) else 'lostandfound:found-item-approve'
+            return get_link_builder(request).url(view_name, obj.pk)
         return None
 
 class SimpleLostItemSerializer(BaseItemSerializer):
@@ -97,7 +133,7 @@ class SimpleLostItemSerializer(BaseItemSerializer):
         fields = [
             'id', 'user', 'title', 'description', 'lost_date', 'approximate_time',
             'location', 'status', 'approval_status', 'created_at', 'updated_at',
-            'media', 'post_type', 'is_admin', 'detail_url', 'claims_url',
+            'media', 'claims_count', 'media_count', 'post_type', 'is_admin', 'detail_url', 'claims_url',
             'resolve_url', 'approve_url'
         ]
 
@@ -108,13 +144,17 @@ class LostItemSerializer(BaseItemSerializer):
         write_only=True,
         required=False
     )
+    upload_ids = UploadSessionListField(
+        write_only=True,
+        required=False
+    )
 
     class Meta:
         model = LostItem
         fields = [
             'id', 'user', 'university', 'title', 'description', 'lost_date',
             'approximate_time', 'location', 'status', 'approval_status',
-            'created_at', 'updated_at', 'media', 'media_files', 'post_type',
+            'created_at', 'updated_at', 'media', 'media_files', 'upload_ids', 'claims_count', 'media_count', 'post_type',
             'is_admin', 'detail_url', 'claims_url', 'resolve_url', 'approve_url'
         ]
         read_only_fields = ['user', 'approval_status', 'created_at', 'updated_at']
@@ -131,9 +171,11 @@ class LostItemSerializer(BaseItemSerializer):
 
     def create(self, validated_data):
         media_files = validated_data.pop('media_files', [])
-        lost_item = LostItem.objects.create(**validated_data)
-        for file in media_files:
-            ItemMedia.objects.create(lost_item=lost_item, file=file)
+        upload_sessions = validated_data.pop('upload_ids', [])
+        with commit_sessions(upload_sessions, ITEM_MEDIA_FILE) as names, transaction.atomic():
+            lost_item = LostItem.objects.create(**validated_data)
+            if create_media([*media_files, *names], lost_item=lost_item):
+                lost_item.refresh_from_db(fields=['media_count'])
         return lost_item
 
 class FoundItemSerializer(BaseItemSerializer):
@@ -143,13 +185,17 @@ class FoundItemSerializer(BaseItemSerializer):
         write_only=True,
         required=False
     )
+    upload_ids = UploadSessionListField(
+        write_only=True,
+        required=False
+    )
 
     class Meta:
         model = FoundItem
         fields = [
             'id', 'user', 'university', 'title', 'description', 'found_date',
             'approximate_time', 'location', 'status', 'approval_status',
-            'created_at', 'updated_at', 'media', 'media_files', 'post_type',
+            'created_at', 'updated_at', 'media', 'media_files', 'upload_ids', 'claims_count', 'media_count', 'post_type',
             'is_admin', 'detail_url', 'claims_url', 'resolve_url', 'approve_url'
         ]
         read_only_fields = ['user', 'approval_status', 'created_at', 'updated_at']
@@ -166,12 +212,42 @@ class FoundItemSerializer(BaseItemSerializer):
 
     def create(self, validated_data):
         media_files = validated_data.pop('media_files', [])
-        found_item = FoundItem.objects.create(**validated_data)
-        for file in media_files:
-            ItemMedia.objects.create(found_item=found_item, file=file)
+        upload_sessions = validated_data.pop('upload_ids', [])
+        with commit_sessions(upload_sessions, ITEM_MEDIA_FILE) as names, transaction.atomic():
+            found_item = FoundItem.objects.create(**validated_data)
+            if create_media([*media_files, *names], found_item=found_item):
+                found_item.refresh_from_db(fields=['media_count'])
         return found_item
 
-class LostItemClaimSerializer(serializers.ModelSerializer):
+class ArchivedItemSerializerMixin:
+    """
+    Archived items are read-only: they can no longer be resolved or moderated, and
+    the detail and claims views only read the live tables, so they get no links.
+    """
+    def get_detail_url(self, obj):
+        return None
+
+    def get_claims_url(self, obj):
+        return None
+
+    def get_resolve_url(self, obj):
+        return None
+
+    def get_approve_url(self, obj):
+        return None
+
+class ArchivedLostItemSerializer(ArchivedItemSerializerMixin, SimpleLostItemSerializer):
+    class Meta(SimpleLostItemSerializer.Meta):
+        model = ArchivedLostItem
+
+class ArchivedFoundItemSerializer(ArchivedItemSerializerMixin, FoundItemSerializer):
+    class Meta(FoundItemSerializer.Meta):
+        model = ArchivedFoundItem
+
+class LostItemClaimSerializer(QuerysetPlanMixin, serializers.ModelSerializer):
+    select_related_fields = ('claimant',)
+    prefetch_related_fields = ('media',)
+
     claimant = SimpleUserSerializer(read_only=True)
     lost_item = serializers.PrimaryKeyRelatedField(
         queryset=LostItem.objects.filter(approval_status='approved', status='open')
@@ -182,10 +258,14 @@ class LostItemClaimSerializer(serializers.ModelSerializer):
         write_only=True,
         required=False
     )
+    upload_ids = UploadSessionListField(
+        write_only=True,
+        required=False
+    )
 
     class Meta:
         model = LostItemClaim
-        fields = ['id', 'lost_item', 'claimant', 'description', 'created_at', 'media', 'media_files']
+        fields = ['id', 'lost_item', 'claimant', 'description', 'created_at', 'media', 'media_files', 'upload_ids']
         read_only_fields = ['claimant', 'created_at']
 
     def validate(self, data):
@@ -199,12 +279,16 @@ class LostItemClaimSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         media_files = validated_data.pop('media_files', [])
-        claim = LostItemClaim.objects.create(**validated_data)
-        for file in media_files:
-            ItemMedia.objects.create(lost_item_claim=claim, file=file)
+        upload_sessions = validated_data.pop('upload_ids', [])
+        with commit_sessions(upload_sessions, ITEM_MEDIA_FILE) as names, transaction.atomic():
+            claim = LostItemClaim.objects.create(**validated_data)
+            create_media([*media_files, *names], lost_item_claim=claim)
         return claim
 
-class FoundItemClaimSerializer(serializers.ModelSerializer):
+class FoundItemClaimSerializer(QuerysetPlanMixin, serializers.ModelSerializer):
+    select_related_fields = ('claimant',)
+    prefetch_related_fields = ('media',)
+
     claimant = SimpleUserSerializer(read_only=True)
     found_item = serializers.PrimaryKeyRelatedField(
         queryset=FoundItem.objects.filter(approval_status='approved', status='open')
@@ -215,10 +299,14 @@ class FoundItemClaimSerializer(serializers.ModelSerializer):
         write_only=True,
         required=False
     )
+    upload_ids = UploadSessionListField(
+        write_only=True,
+        required=False
+    )
 
     class Meta:
         model = FoundItemClaim
-        fields = ['id', 'found_item', 'claimant', 'description', 'created_at', 'media', 'media_files']
+        fields = ['id', 'found_item', 'claimant', 'description', 'created_at', 'media', 'media_files', 'upload_ids']
         read_only_fields = ['claimant', 'created_at']
 
     def validate(self, data):
@@ -232,11 +320,20 @@ class FoundItemClaimSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         media_files = validated_data.pop('media_files', [])
-        claim = FoundItemClaim.objects.create(**validated_data)
-        for file in media_files:
-            ItemMedia.objects.create(found_item_claim=claim, file=file)
+        upload_sessions = validated_data.pop('upload_ids', [])
+        with commit_sessions(upload_sessions, ITEM_MEDIA_FILE) as names, transaction.atomic():
+            claim = FoundItemClaim.objects.create(**validated_data)
+            create_media([*media_files, *names], found_item_claim=claim)
         return claim
 
+class ArchivedLostItemClaimSerializer(LostItemClaimSerializer):
+    class Meta(LostItemClaimSerializer.Meta):
+        model = ArchivedLostItemClaim
+
+class ArchivedFoundItemClaimSerializer(FoundItemClaimSerializer):
+    class Meta(FoundItemClaimSerializer.Meta):
+        model = ArchivedFoundItemClaim
+
 class LostItemResolveSerializer(serializers.Serializer):
     status = serializers.ChoiceField(choices=['found', 'externally_found'])
     resolved_by = serializers.PrimaryKeyRelatedField(
@@ -273,39 +370,12 @@ class LostItemApprovalSerializer(serializers.Serializer):
 class FoundItemApprovalSerializer(serializers.Serializer):
     approval_status = serializers.ChoiceField(choices=['approved', 'rejected'])
 
-class HistorySerializer(serializers.Serializer):
-    posts = serializers.SerializerMethodField()
-    claims_made = serializers.SerializerMethodField()
-    claims_received = serializers.SerializerMethodField()
-
-    def get_posts(self, obj):
-        request = self.context['request']
-        lost_items = LostItem.objects.filter(user=request.user)
-        found_items = FoundItem.objects.filter(user=request.user)
-        lost_serializer = SimpleLostItemSerializer(lost_items, many=True, context={'request': request})
-        found_serializer = FoundItemSerializer(found_items, many=True, context={'request': request})
-        all_posts = lost_serializer.data + found_serializer.data
-        all_posts.sort(key=lambda x: x['created_at'], reverse=True)
-        return all_posts
-
-    def get_claims_made(self, obj):
-        request = self.context['request']
-        lost_claims = LostItemClaim.objects.filter(claimant=request.user)
-        found_claims = FoundItemClaim.objects.filter(claimant=request.user)
-        lost_serializer = LostItemClaimSerializer(lost_claims, many=True, context={'request': request})
-        found_serializer = FoundItemClaimSerializer(found_claims, many=True, context={'request': request})
-        all_claims = lost_serializer.data + found_serializer.data
-        all_claims.sort(key=lambda x: x['created_at'], reverse=True)
-        return all_claims
-
-    def get_claims_received(self, obj):
-        request = self.context['request']
-        lost_items = LostItem.objects.filter(user=request.user)
-        found_items = FoundItem.objects.filter(user=request.user)
-        lost_claims = LostItemClaim.objects.filter(lost_item__in=lost_items)
-        found_claims = FoundItemClaim.objects.filter(found_item__in=found_items)
-        lost_serializer = LostItemClaimSerializer(lost_claims, many=True, context={'request': request})
-        found_serializer = FoundItemClaimSerializer(found_claims, many=True, context={'request': request})
-        all_claims = lost_serializer.data + found_serializer.data
-        all_claims.sort(key=lambda x: x['created_at'], reverse=True)
-        return all_claims
\ No newline at end of file
+class BulkApprovalSerializer(serializers.Serializer):
+    approval_status = serializers.ChoiceField(choices=['approved', 'rejected'])
+    lost_ids = serializers.ListField(child=serializers.IntegerField(min_value=1), max_length=500, required=False, default=list)
+    found_ids = serializers.ListField(child=serializers.IntegerField(min_value=1), max_length=500, required=False, default=list)
+
+    def validate(self, data):
+        if not data['lost_ids'] and not data['found_ids']:
+            raise serializers.ValidationError("Provide lost_ids, found_ids or both.")
+        return data
@@ -0,0 +1,97 @@
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from .counters import get_counter_key, get_stored_key, record_change
+from .feeds import get_item_tags
+from .matching import remove_item, sync_item
+from .search import install_search_index
+from campus_connect.counts import register_count
+from campus_connect.response_cache import register_tags
+from .models import LostItem, FoundItem, ItemMedia, LostItemClaim, FoundItemClaim
+
+register_count(LostItem, 'claims_count', LostItemClaim, 'lost_item')
+register_count(FoundItem, 'claims_count', FoundItemClaim, 'found_item')
+register_count(LostItem, 'media_count', ItemMedia, 'lost_item')
+register_count(FoundItem, 'media_count', ItemMedia, 'found_item')
+
+
+def get_item_university_id(instance, field):
+    """University of the item that `field` of a claim or media points at, from the loaded item if there is one."""
+    item_id = getattr(instance, f'{field}_id')
+    if item_id is None:
+        return None
+    item_field = instance._meta.get_field(field)
+    item = item_field.get_cached_value(instance, None)
+    if item is not None:
+        return item.university_id
+    return item_field.related_model.objects.filter(pk=item_id).values_list('university_id', flat=True).first()
+
+
+def get_saved_item_tags(item):
+    # read_counter_key() read the stored university, which a save may have changed.
+    stored_key = getattr(item, '_stored_counter_key', None)
+    return get_item_tags(item.university_id, stored_key[0] if stored_key else None)
+
+
+def get_media_tags(media):
+    # The feeds count the media of items; media attached to a claim shows in none of them.
+    for field in ('lost_item', 'found_item'):
+        if getattr(media, f'{field}_id') is not None:
+            return get_item_tags(get_item_university_id(media, field))
+    return set()
+
+
+# The anonymous item feeds show items with their media and claim counts.
+register_tags(LostItem, get_saved_item_tags)
+register_tags(FoundItem, get_saved_item_tags)
+register_tags(ItemMedia, get_media_tags)
+register_tags(LostItemClaim, lambda claim: get_item_tags(get_item_university_id(claim, 'lost_item')))
+register_tags(FoundItemClaim, lambda claim: get_item_tags(get_item_university_id(claim, 'found_item')))
+
+
+@receiver(post_save, sender=LostItem)
+@receiver(post_save, sender=FoundItem)
+def index_item(sender, instance, **kwargs):
+    """Keeps the match index in step as items are created, approved or resolved."""
+    sync_item(instance)
+
+
+@receiver(pre_save, sender=LostItem)
+@receiver(pre_save, sender=FoundItem)
+@receiver(pre_delete, sender=LostItem)
+@receiver(pre_delete, sender=FoundItem)
+def read_counter_key(sender, instance, **kwargs):
+    """
+    Reads the stored counter key of the row about to be written. The in-memory
+    values may be stale: another copy of the item may have been saved since
+    this one was loaded, and only the stored row says which counter holds it.
+    """
+    instance._stored_counter_key = None if instance._state.adding else get_stored_key(instance)
+
+
+@receiver(post_save, sender=LostItem)
+@receiver(post_save, sender=FoundItem)
+def count_item(sender, instance, created, **kwargs):
+    """
+    Moves the item between the university counters when it is created, approved or
+    resolved. CountedModel.save() runs this in the transaction of the save, with
+    the row locked since read_counter_key().
+    """
+    old_key = None if created else instance._stored_counter_key
+    record_change(old_key, get_counter_key(instance))
+
+
+@receiver(post_delete, sender=LostItem)
+@receiver(post_delete, sender=FoundItem)
+def uncount_item(sender, instance, **kwargs):
+    record_change(instance._stored_counter_key, None)
+
+
+@receiver(post_delete, sender=LostItem)
+@receiver(post_delete, sender=FoundItem)
+def unindex_item(sender, instance, **kwargs):
+    remove_item(instance)
+
+
+def restore_search_index(sender, using, **kwargs):
+    """Reinstalls search triggers that a migration dropped by remaking an item table."""
+    install_search_index(using)
@@ -0,0 +1,1148 @@
+import io
+import os
+import shutil
+import tempfile
+from datetime import timedelta
+from PIL import Image
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.core.management import call_command
+from django.test.utils import CaptureQueriesContext
+from unittest import mock
+from urllib.parse import quote
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from accounts.models import User
+from campus_connect.media import get_media_expiry, sign_media
+from campus_connect.response_cache import get_metrics
+from campus_connect.storage import media_storage
+from campus_connect.uploads import UploadSession, clear_expired_sessions
+from universities.models import University
+from .archive import archive_batch, archive_resolved_items, TIERS
+from .counters import get_stats, reconcile_counters
+from .matching import find_matches
+from .models import (
+    LostItem, FoundItem, ItemCounter, ItemMedia, ItemMediaDerivative, ItemToken, LostItemClaim,
+    ArchivedLostItem, ArchivedFoundItem, ArchivedLostItemClaim, ArchivedItemMedia, ArchivedItemMediaDerivative,
+)
+
+
+class LostAndFoundTestMixin:
+    def setUp(self):
+        self.client = APIClient()
+        self.university = University.objects.create(name="Test University", short_name="TU")
+        self.owner = User.objects.create_user(email="owner@example.com", password="password123", name="Owner")
+        self.other = User.objects.create_user(email="other@example.com", password="password123", name="Other")
+        self.admin = User.objects.create_user(
+            email="admin@example.com", password="password123", name="Admin", admin_level='app'
+        )
+
+    def create_item(self, model, minutes_ago=0, **kwargs):
+        fields = {
+            'user': self.owner,
+            'university': self.university,
+            'title': f"{model.__name__} item",
+            'description': "A black backpack",
+            'location': "Library",
+            'approval_status': 'approved',
+        }
+        fields['lost_date' if model is LostItem else 'found_date'] = timezone.now().date()
+        fields.update(kwargs)
+        item = model.objects.create(**fields)
+        if minutes_ago:
+            model.objects.filter(pk=item.pk).update(created_at=timezone.now() - timedelta(minutes=minutes_ago))
+        return item
+
+
+class MergedFeedTestCase(LostAndFoundTestMixin, TestCase):
+    def test_all_items_interleaves_lost_and_found_newest_first(self):
+        lost_old = self.create_item(LostItem, minutes_ago=30)
+        found_mid = self.create_item(FoundItem, minutes_ago=20)
+        lost_new = self.create_item(LostItem, minutes_ago=10)
+        self.create_item(FoundItem, approval_status='pending')
+        self.create_item(LostItem, status='found')
+
+        response = self.client.get(reverse('lostandfound:all-items'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(
+            [(row['post_type'], row['id']) for row in response.data['results']],
+            [('lost', lost_new.pk), ('found', found_mid.pk), ('lost', lost_old.pk)]
+        )
+
+    def test_all_items_pages_through_the_merged_feed(self):
+        for minutes in range(1, 8):
+            self.create_item(LostItem if minutes % 2 else FoundItem, minutes_ago=minutes)
+
+        seen = []
+        for offset in range(0, 7, 3):
+            response = self.client.get(reverse('lostandfound:all-items'), {'limit': 3, 'offset': offset})
+            self.assertEqual(response.data['count'], 7)
+            seen.extend(row['created_at'] for row in response.data['results'])
+        self.assertEqual(len(seen), 7)
+        self.assertEqual(seen, sorted(seen, reverse=True))
+
+        walked = []
+        url, params = reverse('lostandfound:all-items'), {'limit': 3}
+        while url:
+            response = self.client.get(url, params)
+            walked.extend(row['created_at'] for row in response.data['results'])
+            url, params = response.data['next'], None
+        self.assertEqual(walked, seen)
+
+    def test_cursor_keeps_lost_and_found_rows_sharing_an_id(self):
+        lost = self.create_item(LostItem)
+        found = self.create_item(FoundItem)
+        self.assertEqual(lost.pk, found.pk)
+        FoundItem.objects.filter(pk=found.pk).update(created_at=lost.created_at)
+
+        walked = []
+        url, params = reverse('lostandfound:all-items'), {'limit': 1}
+        while url:
+            response = self.client.get(url, params)
+            walked.extend((row['post_type'], row['id']) for row in response.data['results'])
+            url, params = response.data['next'], None
+        self.assertEqual(sorted(walked), [('found', found.pk), ('lost', lost.pk)])
+
+    def test_pending_and_resolved_use_the_same_feed(self):
+        pending = self.create_item(FoundItem, approval_status='pending')
+        resolved = self.create_item(LostItem, status='externally_found')
+
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get(reverse('lostandfound:pending-items'))
+        self.assertEqual([row['id'] for row in response.data['results']], [pending.pk])
+
+        response = self.client.get(reverse('lostandfound:resolved-items'))
+        self.assertEqual([row['id'] for row in response.data['results']], [resolved.pk])
+
+
+class KeysetPaginationTestCase(LostAndFoundTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.items = [self.create_item(LostItem, minutes_ago=minutes) for minutes in range(1, 8)]
+
+    def test_cursor_walks_forward_and_back(self):
+        url = reverse('lostandfound:lost-items')
+        response = self.client.get(url, {'limit': 3})
+        self.assertEqual(response.data['count'], 7)
+        self.assertIsNone(response.data['previous'])
+        first_page = [row['id'] for row in response.data['results']]
+        self.assertEqual(first_page, [item.pk for item in self.items[:3]])
+
+        response = self.client.get(response.data['next'])
+        self.assertEqual([row['id'] for row in response.data['results']], [item.pk for item in self.items[3:6]])
+        response = self.client.get(response.data['next'])
+        self.assertEqual([row['id'] for row in response.data['results']], [self.items[6].pk])
+        self.assertIsNone(response.data['next'])
+
+        response = self.client.get(response.data['previous'])
+        self.assertEqual([row['id'] for row in response.data['results']], [item.pk for item in self.items[3:6]])
+        response = self.client.get(response.data['previous'])
+        self.assertEqual([row['id'] for row in response.data['results']], first_page)
+        self.assertIsNone(response.data['previous'])
+
+    def test_no_count_mode_and_offset_fallback(self):
+        url = reverse('lostandfound:lost-items')
+        response = self.client.get(url, {'limit': 3, 'count': 'false'})
+        self.assertNotIn('count', response.data)
+        self.assertIn('cursor=', response.data['next'])
+
+        response = self.client.get(url, {'limit': 3, 'offset': 3})
+        self.assertEqual(response.data['count'], 7)
+        self.assertIn('offset=6', response.data['next'])
+        self.assertEqual([row['id'] for row in response.data['results']], [item.pk for item in self.items[3:6]])
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get(reverse('lostandfound:all-items'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class QueryCountTestCase(LostAndFoundTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        for minutes in range(1, 11):
+            lost = self.create_item(LostItem, minutes_ago=minutes)
+            found = self.create_item(FoundItem, minutes_ago=minutes)
+            ItemMedia.objects.bulk_create([
+                ItemMedia(lost_item=lost, file='lostandfound/media/a.jpg'),
+                ItemMedia(found_item=found, file='lostandfound/media/b.jpg'),
+            ])
+            LostItemClaim.objects.create(lost_item=lost, claimant=self.other, description="Mine")
+        self.create_item(LostItem, status='found')
+
+    def count_queries(self, url, params=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['results'])
+        return len(queries)
+
+    def assert_fixed_query_count(self, url):
+        self.assertEqual(self.count_queries(url, {'limit': 4}), self.count_queries(url, {'limit': 25}))
+
+    def test_item_lists_run_a_fixed_number_of_queries(self):
+        self.client.force_authenticate(user=self.owner)
+        for name in ['all-items', 'lost-items', 'found-items', 'resolved-items', 'my-posts']:
+            with self.subTest(view=name):
+                self.assert_fixed_query_count(reverse(f'lostandfound:{name}'))
+
+    def test_claim_lists_run_a_fixed_number_of_queries(self):
+        self.client.force_authenticate(user=self.other)
+        self.assert_fixed_query_count(reverse('lostandfound:my-claims'))
+        self.client.force_authenticate(user=self.admin)
+        lost = LostItem.objects.filter(status='open').first()
+        LostItemClaim.objects.create(lost_item=lost, claimant=self.admin, description="Also mine")
+        self.assert_fixed_query_count(reverse('lostandfound:lost-item-claims', kwargs={'pk': lost.pk}))
+
+    def test_item_detail_query_count(self):
+        item = LostItem.objects.filter(status='open').first()
+        # ETag validators, item with its user, media, then the media derivatives.
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse('lostandfound:lost-item-detail', kwargs={'pk': item.pk}))
+        self.assertEqual(len(response.data['media']), 1)
+
+
+class HistoryViewTestCase(LostAndFoundTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.owner)
+        for minutes in range(1, 6):
+            lost = self.create_item(LostItem, minutes_ago=minutes)
+            self.create_item(FoundItem, minutes_ago=minutes, approval_status='pending')
+            LostItemClaim.objects.create(lost_item=lost, claimant=self.other, description="Mine")
+
+    def test_sections_are_paged_independently(self):
+        response = self.client.get(reverse('lostandfound:history'), {'limit': 4})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(set(response.data), {'posts', 'claims_made', 'claims_received'})
+        self.assertEqual(len(response.data['posts']['results']), 4)
+        self.assertEqual(len(response.data['claims_received']['results']), 4)
+        self.assertEqual(response.data['claims_made']['results'], [])
+
+        posts = [row['created_at'] for row in response.data['posts']['results']]
+        next_url = response.data['posts']['next']
+        self.assertIn('posts_cursor=', next_url)
+        while next_url:
+            response = self.client.get(next_url)
+            posts.extend(row['created_at'] for row in response.data['posts']['results'])
+            next_url = response.data['posts']['next']
+        self.assertEqual(len(posts), 10)
+        self.assertEqual(posts, sorted(posts, reverse=True))
+
+    def test_sections_parameter_limits_the_response(self):
+        response = self.client.get(reverse('lostandfound:history'), {'sections': 'claims_received'})
+        self.assertEqual(list(response.data), ['claims_received'])
+        self.assertEqual(len(response.data['claims_received']['results']), 5)
+
+        response = self.client.get(reverse('lostandfound:history'), {'sections': 'posts,unknown'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class MediaDeliveryTestCase(LostAndFoundTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        item = self.create_item(LostItem)
+        self.content = bytes(range(256)) * 4
+        self.media = ItemMedia.objects.create(
+            lost_item=item, file=SimpleUploadedFile("clip.MP4", self.content)
+        )
+        self.url = reverse('lostandfound:media-access', kwargs={'pk': self.media.pk})
+        self.client.force_authenticate(user=self.owner)
+
+    def test_full_download_sends_validators(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'video/mp4')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+
+        etag, last_modified = response['ETag'], response['Last-Modified']
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_byte_ranges(self):
+        response = self.client.get(self.url, HTTP_RANGE='bytes=100-199')
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(response['Content-Range'], f'bytes 100-199/{len(self.content)}')
+        self.assertEqual(b''.join(response.streaming_content), self.content[100:200])
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=-24')
+        self.assertEqual(b''.join(response.streaming_content), self.content[-24:])
+
+        response = self.client.get(self.url, HTTP_RANGE=f'bytes={len(self.content)}-')
+        self.assertEqual(response.status_code, status.HTTP_416_REQUESTED_RANGE_NOT_SATISFIABLE)
+
+        response = self.client.get(self.url, HTTP_RANGE='bytes=0-9', HTTP_IF_RANGE='"stale"')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_proxy_backends_hand_off_the_transfer(self):
+        with override_settings(MEDIA_DELIVERY_BACKEND='x-accel-redirect', MEDIA_ACCEL_REDIRECT_PREFIX='/protected/'):
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected/{self.media.file.name}')
+        self.assertEqual(response.content, b'')
+        self.assertIn('ETag', response)
+
+        self.media.file = SimpleUploadedFile("café #1.mp4", self.content)
+        self.media.save()
+        with override_settings(MEDIA_DELIVERY_BACKEND='x-accel-redirect', MEDIA_ACCEL_REDIRECT_PREFIX='/protected/'):
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected/{quote(self.media.file.name)}')
+        self.assertIn('%C3%A9', response['X-Accel-Redirect'])
+
+        with override_settings(MEDIA_DELIVERY_BACKEND='x-sendfile'):
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Sendfile'], self.media.file.path)
+
+    def test_forbidden_and_missing_files(self):
+        self.client.force_authenticate(user=self.other)
+        self.media.lost_item.status = 'found'
+        self.media.lost_item.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        self.client.force_authenticate(user=self.owner)
+        self.media.file.delete(save=False)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_serializers_mint_signed_links_for_permitted_users(self):
+        detail_url = reverse('lostandfound:lost-item-detail', kwargs={'pk': self.media.lost_item_id})
+        file_url = self.client.get(detail_url).data['media'][0]['file_url']
+        self.assertIn('/api/media/', file_url)
+        self.assertIn('signature=', file_url)
+
+        anonymous = APIClient()
+        with self.assertNumQueries(0):
+            response = anonymous.get(file_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(b''.join(response.streaming_content), self.content)
+
+        self.client.force_authenticate(user=self.other)
+        self.assertEqual(self.client.get(detail_url).data['media'][0]['file_url'], 'http://testserver' + self.url)
+        LostItemClaim.objects.create(lost_item=self.media.lost_item, claimant=self.other, description="Mine")
+        self.assertIn('signature=', self.client.get(detail_url).data['media'][0]['file_url'])
+
+    def test_signed_links_reject_tampering_and_expiry(self):
+        name = self.media.file.name
+        expires = get_media_expiry()
+        url = reverse('signed-media', kwargs={'name': name})
+        response = self.client.get(url, {'expires': expires, 'signature': sign_media(name, expires)})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = self.client.get(url, {'expires': expires + 1, 'signature': sign_media(name, expires)})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        response = self.client.get(url, {'expires': 1000, 'signature': sign_media(name, 1000)})
+        self.assertEqual(response.data['error'], "Media link has expired.")
+
+
+@override_settings(MEDIA_DERIVATIVE_WORKERS=0)
+class MediaDerivativeTestCase(LostAndFoundTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.client.force_authenticate(user=self.owner)
+
+    def upload_photo(self):
+        photo = io.BytesIO()
+        Image.new('RGB', (2000, 1500), 'red').save(photo, 'JPEG')
+        data = {
+            'university': self.university.pk, 'title': "Camera", 'description': "Black camera",
+            'lost_date': timezone.now().date(), 'location': "Library",
+            'media_files': [SimpleUploadedFile("photo.jpg", photo.getvalue(), content_type='image/jpeg')],
+        }
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('lostandfound:lost-items'), data, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return ItemMedia.objects.get(lost_item_id=response.data['id'])
+
+    def test_upload_renders_thumb_and_medium(self):
+        media = self.upload_photo()
+        derivatives = {d.size: d for d in media.derivatives.all()}
+        self.assertEqual(set(derivatives), {'thumb', 'medium'})
+        self.assertEqual({d.status for d in derivatives.values()}, {'ready'})
+        self.assertEqual((derivatives['thumb'].width, derivatives['thumb'].height), (320, 240))
+        self.assertEqual(derivatives['medium'].width, 1280)
+        self.assertTrue(derivatives['thumb'].file.name.endswith('_thumb.webp'))
+
+        url = reverse('lostandfound:media-access', kwargs={'pk': media.pk})
+        response = self.client.get(url, {'size': 'thumb'})
+        self.assertEqual(response['Content-Type'], 'image/webp')
+        response = self.client.get(url)
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+        response = self.client.get(url, {'size': 'huge'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_lists_link_thumbnails_and_details_link_originals(self):
+        media = self.upload_photo()
+        LostItem.objects.filter(pk=media.lost_item_id).update(approval_status='approved')
+        list_url = self.client.get(reverse('lostandfound:lost-items')).data['results'][0]['media'][0]['file_url']
+        self.assertIn('_thumb.webp', list_url)
+        detail = self.client.get(reverse('lostandfound:lost-item-detail', kwargs={'pk': media.lost_item_id}))
+        self.assertIn(media.file.name, detail.data['media'][0]['file_url'])
+
+    def test_pending_derivatives_fall_back_to_the_original(self):
+        media = self.upload_photo()
+        ItemMediaDerivative.objects.filter(media=media).update(status='pending')
+        url = reverse('lostandfound:media-access', kwargs={'pk': media.pk})
+        response = self.client.get(url, {'size': 'thumb'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'image/jpeg')
+
+
+class MatchingTestCase(LostAndFoundTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        today = timezone.now().date()
+        self.lost = self.create_item(
+            LostItem, title="Black leather wallet", description="Leather wallet with student ID card",
+            location="Central library", lost_date=today - timedelta(days=2)
+        )
+        self.wallet = self.create_item(
+            FoundItem, user=self.other, title="Wallet", description="Black wallet with ID cards",
+            location="Library second floor", found_date=today - timedelta(days=1)
+        )
+        self.late_wallet = self.create_item(
+            FoundItem, user=self.other, title="Wallet", description="Black wallet",
+            location="Cafeteria", found_date=today
+        )
+        self.umbrella = self.create_item(FoundItem, user=self.other, title="Blue umbrella", description="Umbrella",
+                                         location="Gym")
+        self.own = self.create_item(FoundItem, title="Black wallet", description="Wallet")
+        self.pending = self.create_item(
+            FoundItem, user=self.other, title="Leather wallet", description="Black leather wallet with ID",
+            location="Central library", approval_status='pending'
+        )
+        self.url = reverse('lostandfound:lost-item-matches', kwargs={'pk': self.lost.pk})
+        self.client.force_authenticate(user=self.owner)
+
+    def test_matches_are_ranked_and_limited_to_indexed_candidates(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        ids = [row['item']['id'] for row in response.data['results']]
+        self.assertEqual(ids, [self.wallet.pk, self.late_wallet.pk])
+        best = response.data['results'][0]
+        self.assertEqual(best['item']['post_type'], 'found')
+        self.assertGreater(best['score'], response.data['results'][1]['score'])
+        self.assertEqual(set(best), {'score', 'text_score', 'date_score', 'time_score', 'item'})
+
+        response = self.client.get(reverse('lostandfound:found-item-matches', kwargs={'pk': self.wallet.pk}))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.client.force_authenticate(user=self.other)
+        response = self.client.get(reverse('lostandfound:found-item-matches', kwargs={'pk': self.wallet.pk}))
+        self.assertEqual([row['item']['id'] for row in response.data['results']], [self.lost.pk])
+
+    def test_index_follows_approval_and_resolution(self):
+        self.assertFalse(ItemToken.objects.filter(item_type='found', item_id=self.pending.pk).exists())
+        self.client.force_authenticate(user=self.admin)
+        self.client.post(
+            reverse('lostandfound:found-item-approve', kwargs={'pk': self.pending.pk}), {'approval_status': 'approved'}
+        )
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['results'][0]['item']['id'], self.pending.pk)
+
+        self.pending.status = 'returned'
+        self.pending.save()
+        response = self.client.get(self.url)
+        self.assertNotIn(self.pending.pk, [row['item']['id'] for row in response.data['results']])
+        self.assertFalse(ItemToken.objects.filter(item_type='found', item_id=self.pending.pk).exists())
+
+    def test_own_posts_do_not_take_up_the_candidate_pool(self):
+        self.create_item(
+            FoundItem, title=self.lost.title, description=self.lost.description, location=self.lost.location
+        )
+        with mock.patch('lostandfound.matching.CANDIDATE_POOL', 1):
+            matches = find_matches(self.lost)
+        self.assertEqual([candidate.pk for candidate, _ in matches], [self.wallet.pk])
+
+    def test_common_tokens_are_skipped_past_the_posting_budget(self):
+        # With room for one posting only the rarest token, 'card', is summed; 'wallet' and 'black' are skipped.
+        with mock.patch('lostandfound.matching.POSTING_BUDGET', 1):
+            matches = find_matches(self.lost)
+        self.assertEqual([candidate.pk for candidate, _ in matches], [self.wallet.pk])
+
+
+class SearchTestCase(LostAndFoundTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('lostandfound:item-search')
+        self.wallet = self.create_item(LostItem, title="Brown wallet", description="Leather, with cards")
+        self.mention = self.create_item(FoundItem, title="Keys", description="Found next to a wallet stand")
+        self.bottle = self.create_item(FoundItem, title="Water bottle", location="Gym", status='returned')
+        self.pending = self.create_item(LostItem, title="Wallet", approval_status='pending', user=self.other)
+        self.elsewhere = self.create_item(
+            FoundItem, title="Wallet", university=University.objects.create(name="Other University", short_name="OU")
+        )
+
+    def ids(self, response):
+        return [(row['post_type'], row['id']) for row in response.data['results']]
+
+    def test_bm25_ranks_title_matches_first_and_supports_prefixes(self):
+        response = self.client.get(self.url, {'q': 'wallets'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(self.ids(response)[-1], ('found', self.mention.pk))
+
+        response = self.client.get(self.url, {'q': 'wal* leath'})
+        self.assertEqual(self.ids(response), [])
+        response = self.client.get(self.url, {'q': 'wal* leath*'})
+        self.assertEqual(self.ids(response), [('lost', self.wallet.pk)])
+        response = self.client.get(self.url, {'q': '"wallet" OR NEAR('})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_filters_and_visibility(self):
+        response = self.client.get(self.url, {'q': 'wallet', 'university': self.university.pk, 'type': 'lost'})
+        self.assertEqual(self.ids(response), [('lost', self.wallet.pk)])
+        response = self.client.get(self.url, {'q': 'bottle', 'status': 'returned,externally_returned'})
+        self.assertEqual(self.ids(response), [('found', self.bottle.pk)])
+
+        response = self.client.get(self.url, {'q': 'wallet', 'approval_status': 'pending'})
+        self.assertEqual(self.ids(response), [])
+        self.client.force_authenticate(user=self.other)
+        response = self.client.get(self.url, {'q': 'wallet', 'approval_status': 'pending'})
+        self.assertEqual(self.ids(response), [('lost', self.pending.pk)])
+
+        response = self.client.get(self.url, {'q': 'wallet', 'type': 'both'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_index_follows_updates_and_deletes(self):
+        self.wallet.title = "Brown purse"
+        self.wallet.save()
+        response = self.client.get(self.url, {'q': 'purse'})
+        self.assertEqual(self.ids(response), [('lost', self.wallet.pk)])
+        self.wallet.delete()
+        response = self.client.get(self.url, {'q': 'purse'})
+        self.assertEqual(self.ids(response), [])
+
+    def test_fallback_without_fts(self):
+        with mock.patch('lostandfound.search.fts_available', return_value=False):
+            response = self.client.get(self.url, {'q': 'wallet'})
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(
+            sorted(self.ids(response)),
+            sorted([('lost', self.wallet.pk), ('found', self.mention.pk), ('found', self.elsewhere.pk)])
+        )
+
+
+class BulkModerationTestCase(LostAndFoundTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.other_university = University.objects.create(name="Other University", short_name="OU")
+        self.university_admin = User.objects.create_user(
+            email="uniadmin@example.com", password="password123", name="Uni Admin",
+            admin_level='university', university=self.university, role='officer',
+            designation="Registrar", workplace="Admin building"
+        )
+        self.lost = [self.create_item(LostItem, approval_status='pending') for _ in range(3)]
+        self.found = self.create_item(FoundItem, approval_status='pending')
+        self.foreign = self.create_item(FoundItem, approval_status='pending', university=self.other_university)
+        self.url = reverse('lostandfound:bulk-approve')
+
+    def test_bulk_approve_reports_each_id_with_fixed_queries(self):
+        self.client.force_authenticate(user=self.university_admin)
+        payload = {
+            'approval_status': 'approved',
+            'lost_ids': [item.pk for item in self.lost] + [9999],
+            'found_ids': [self.found.pk, self.foreign.pk],
+        }
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, payload, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['lost'], [{'id': item.pk, 'result': 'approved'} for item in self.lost] + [
+            {'id': 9999, 'result': 'not_found'}
+        ])
+        self.assertEqual(response.data['found'], [
+            {'id': self.found.pk, 'result': 'approved'}, {'id': self.foreign.pk, 'result': 'forbidden'}
+        ])
+        updates = [
+            query for query in queries.captured_queries
+            if query['sql'].startswith(('UPDATE "lostandfound_lostitem"', 'UPDATE "lostandfound_founditem"'))
+        ]
+        self.assertEqual(len(updates), 2)
+        self.assertEqual(LostItem.objects.filter(approval_status='approved').count(), 3)
+        self.assertEqual(FoundItem.objects.get(pk=self.foreign.pk).approval_status, 'pending')
+        self.assertTrue(ItemToken.objects.filter(item_type='found', item_id=self.found.pk).exists())
+
+    def test_bulk_approve_validation_and_permissions(self):
+        self.client.force_authenticate(user=self.owner)
+        response = self.client.post(self.url, {'approval_status': 'approved', 'lost_ids': [1]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.post(self.url, {'approval_status': 'approved'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(self.url, {'approval_status': 'pending', 'lost_ids': [1]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_admin_action_uses_the_bulk_path(self):
+        self.admin.is_staff = self.admin.is_superuser = True
+        self.admin.save()
+        self.client.force_login(self.admin)
+        response = self.client.post(reverse('admin:lostandfound_founditem_changelist'), {
+            'action': 'reject_items', '_selected_action': [self.found.pk, self.foreign.pk]
+        })
+        self.assertEqual(response.status_code, status.HTTP_302_FOUND)
+        self.assertEqual(FoundItem.objects.filter(approval_status='rejected').count(), 2)
+
+
+class ItemStatsTestCase(LostAndFoundTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('lostandfound:item-stats')
+
+    def stats(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {row['university']: row for row in response.data['results']}
+
+    def test_counters_follow_create_approve_resolve_and_delete(self):
+        lost = self.create_item(LostItem, approval_status='pending')
+        found = self.create_item(FoundItem)
+        self.create_item(FoundItem, status='claimed')
+        stats = self.stats()[self.university.pk]
+        self.assertEqual(stats['lost'], {'open': 0, 'claimed': 0, 'resolved': 0, 'pending': 1, 'rejected': 0})
+        self.assertEqual(stats['found'], {'open': 1, 'claimed': 1, 'resolved': 0, 'pending': 0, 'rejected': 0})
+
+        lost.approval_status = 'approved'
+        lost.save()
+        found.status = 'returned'
+        found.save()
+        found.save()
+        FoundItem.objects.only('id', 'title').get(pk=found.pk).save()
+        stats = self.stats(university=self.university.pk)[self.university.pk]
+        self.assertEqual(stats['lost']['open'], 1)
+        self.assertEqual(stats['lost']['pending'], 0)
+        self.assertEqual(stats['found']['resolved'], 1)
+        self.assertEqual(stats['found']['open'], 0)
+
+        lost.delete()
+        self.assertEqual(self.stats()[self.university.pk]['lost']['open'], 0)
+
+    def test_saves_from_stale_copies_move_the_item_once(self):
+        item = self.create_item(LostItem, approval_status='pending')
+        first, second = LostItem.objects.get(pk=item.pk), LostItem.objects.get(pk=item.pk)
+        first.approval_status = 'approved'
+        first.save()
+        second.approval_status = 'approved'
+        second.save()
+        stats = self.stats()[self.university.pk]['lost']
+        self.assertEqual((stats['open'], stats['pending']), (1, 0))
+        self.assertEqual(ItemCounter.objects.get(approval_status='pending').count, 0)
+
+        # A stale copy saved later writes its old values back, and the counters follow the row.
+        item.save()
+        stats = self.stats()[self.university.pk]['lost']
+        self.assertEqual((stats['open'], stats['pending']), (0, 1))
+
+        first.delete()
+        second.delete()
+        self.assertEqual(ItemCounter.objects.get(approval_status='pending').count, 0)
+        self.assertEqual(ItemCounter.objects.get(approval_status='approved').count, 0)
+
+    def test_bulk_moderation_and_reconciliation(self):
+        items = [self.create_item(LostItem, approval_status='pending') for _ in range(3)]
+        self.client.force_authenticate(user=self.admin)
+        self.client.post(reverse('lostandfound:bulk-approve'), {
+            'approval_status': 'rejected', 'lost_ids': [item.pk for item in items[:2]]
+        }, format='json')
+        stats = self.stats()[self.university.pk]['lost']
+        self.assertEqual((stats['pending'], stats['rejected']), (1, 2))
+
+        LostItem.objects.bulk_create([
+            LostItem(user=self.owner, university=self.university, title="Bulk", description="Bulk",
+                     lost_date=timezone.now().date(), location="Library", approval_status='approved')
+            for _ in range(4)
+        ])
+        ItemCounter.objects.filter(approval_status='rejected').update(count=7)
+        reconcile_counters()
+        stats = self.stats()[self.university.pk]['lost']
+        self.assertEqual((stats['open'], stats['pending'], stats['rejected']), (4, 1, 2))
+
+        with CaptureQueriesContext(connection) as queries:
+            self.stats(university=self.university.pk)
+        self.assertEqual(len(queries), 1)
+
+
+class DenormalizedCountTestCase(LostAndFoundTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root, MEDIA_DERIVATIVE_WORKERS=0)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_counts_follow_creates_and_deletes(self):
+        self.client.force_authenticate(user=self.owner)
+        data = {
+            'university': self.university.pk, 'title': "Umbrella", 'description': "Blue umbrella",
+            'found_date': timezone.now().date(), 'location': "Gym",
+            'media_files': [SimpleUploadedFile(f"clip{i}.mp4", b"0000") for i in range(2)],
+        }
+        response = self.client.post(reverse('lostandfound:found-items'), data, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual((response.data['media_count'], response.data['claims_count']), (2, 0))
+
+        item = FoundItem.objects.get(pk=response.data['id'])
+        item.approval_status = 'approved'
+        item.save()
+        self.client.force_authenticate(user=self.other)
+        response = self.client.post(reverse('lostandfound:found-item-claim'), {
+            'found_item': item.pk, 'description': "That is my umbrella"
+        }, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        item.refresh_from_db()
+        self.assertEqual((item.claims_count, item.media_count), (1, 2))
+
+        item.media.first().delete()
+        item.claims.get().delete()
+        item.refresh_from_db()
+        self.assertEqual((item.claims_count, item.media_count), (0, 1))
+
+        response = self.client.get(reverse('lostandfound:found-items'))
+        self.assertEqual(response.data['results'][0]['media_count'], 1)
+
+    def test_saving_a_loaded_item_keeps_its_counters(self):
+        lost = self.create_item(LostItem)
+        stale = LostItem.objects.get(pk=lost.pk)
+        LostItemClaim.objects.create(lost_item=lost, claimant=self.other, description="Mine")
+        stale.status = 'claimed'
+        stale.save()
+        lost.refresh_from_db()
+        self.assertEqual((lost.status, lost.claims_count), ('claimed', 1))
+
+    def test_recompute_command_repairs_drift(self):
+        lost = self.create_item(LostItem)
+        LostItemClaim.objects.create(lost_item=lost, claimant=self.other, description="Mine")
+        LostItem.objects.filter(pk=lost.pk).update(claims_count=5, media_count=3)
+        call_command('recompute_counts', stdout=io.StringIO())
+        lost.refresh_from_db()
+        self.assertEqual((lost.claims_count, lost.media_count), (1, 0))
+
+
+class UploadSessionTestCase(LostAndFoundTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root, MEDIA_DERIVATIVE_WORKERS=0)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.client.force_authenticate(user=self.owner)
+
+    def start_upload(self, data=b"0123456789", filename="clip.mp4"):
+        response = self.client.post(reverse('upload-session-create'), {'filename': filename, 'size': len(data)})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data
+
+    def put_chunk(self, session, offset, chunk):
+        return self.client.generic(
+            'PUT', session['upload_url'], chunk, content_type='application/octet-stream',
+            HTTP_UPLOAD_OFFSET=str(offset)
+        )
+
+    def test_chunks_resume_from_reported_offset(self):
+        session = self.start_upload()
+        response = self.put_chunk(session, 0, b"01234")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['offset'], 5)
+
+        response = self.put_chunk(session, 0, b"01234")
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data['offset'], 5)
+
+        response = self.client.post(reverse('upload-session-finalize', kwargs={'session_id': session['id']}))
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+        self.assertEqual(self.client.get(session['upload_url']).data['offset'], 5)
+        self.assertEqual(self.put_chunk(session, 5, b"56789").data['offset'], 10)
+        response = self.client.post(reverse('upload-session-finalize', kwargs={'session_id': session['id']}))
+        self.assertTrue(response.data['complete'])
+
+    def test_sessions_are_private_and_validated(self):
+        response = self.client.post(reverse('upload-session-create'), {'filename': "notes.exe", 'size': 10})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        session = self.start_upload()
+        self.assertEqual(self.put_chunk(session, 0, b"0123456789ab").status_code, status.HTTP_413_REQUEST_ENTITY_TOO_LARGE)
+        self.client.force_authenticate(user=self.other)
+        self.assertEqual(self.client.get(session['upload_url']).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_finalized_upload_attaches_to_post(self):
+        session = self.start_upload()
+        self.put_chunk(session, 0, b"0123456789")
+        self.client.post(reverse('upload-session-finalize', kwargs={'session_id': session['id']}))
+        unfinished = self.start_upload()
+
+        data = {
+            'university': self.university.pk, 'title': "Camera", 'description': "Grey camera",
+            'lost_date': timezone.now().date(), 'location': "Hall", 'upload_ids': [unfinished['id']],
+        }
+        response = self.client.post(reverse('lostandfound:lost-items'), data, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        data['upload_ids'] = [session['id']]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('lostandfound:lost-items'), data, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['media_count'], 1)
+        media = ItemMedia.objects.get(lost_item_id=response.data['id'])
+        with media.file.open('rb') as handle:
+            self.assertEqual(handle.read(), b"0123456789")
+        self.assertIsNone(UploadSession.load(session['id']))
+
+    def test_failed_post_keeps_its_session_and_leaves_no_file(self):
+        session = self.start_upload()
+        self.put_chunk(session, 0, b"0123456789")
+        self.client.post(reverse('upload-session-finalize', kwargs={'session_id': session['id']}))
+        data = {
+            'university': self.university.pk, 'title': "Camera", 'description': "Grey camera",
+            'lost_date': timezone.now().date(), 'location': "Hall", 'upload_ids': [session['id']],
+        }
+        with mock.patch('lostandfound.serializers.schedule_derivatives', side_effect=RuntimeError("Queue down")):
+            with self.assertRaises(RuntimeError):
+                self.client.post(reverse('lostandfound:lost-items'), data, format='multipart')
+        self.assertFalse(LostItem.objects.filter(title="Camera").exists())
+        self.assertFalse([name for _, _, names in os.walk(os.path.join(self.media_root, 'lostandfound')) for name in names])
+        self.assertEqual(UploadSession.load(session['id']).offset, 10)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reverse('lostandfound:lost-items'), data, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertIsNone(UploadSession.load(session['id']))
+
+    def test_reused_sessions_are_rejected_without_a_partial_post(self):
+        session = self.start_upload()
+        self.put_chunk(session, 0, b"0123456789")
+        self.client.post(reverse('upload-session-finalize', kwargs={'session_id': session['id']}))
+        data = {
+            'university': self.university.pk, 'title': "Camera", 'description': "Grey camera",
+            'lost_date': timezone.now().date(), 'location': "Hall", 'upload_ids': [session['id'], session['id']],
+        }
+        response = self.client.post(reverse('lostandfound:lost-items'), data, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        # The staged file vanishing, e.g. under a concurrent commit, is a validation error too.
+        os.remove(UploadSession.load(session['id']).data_path)
+        data['upload_ids'] = [session['id']]
+        response = self.client.post(reverse('lostandfound:lost-items'), data, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(LostItem.objects.filter(title="Camera").exists())
+
+    def test_expired_sessions_are_cleared(self):
+        session = self.start_upload()
+        self.assertEqual(clear_expired_sessions(), 0)
+        with override_settings(MEDIA_UPLOAD_SESSION_TTL=0):
+            self.assertEqual(clear_expired_sessions(now=session['expires'] + 1), 1)
+        self.assertIsNone(UploadSession.load(session['id']))
+
+
+class ContentAddressedStorageTestCase(LostAndFoundTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.item = self.create_item(LostItem)
+
+    def create_media(self, content, filename="clip.mp4"):
+        return ItemMedia.objects.create(lost_item=self.item, file=SimpleUploadedFile(filename, content))
+
+    def test_identical_uploads_share_one_blob(self):
+        first, second = self.create_media(b"same bytes"), self.create_media(b"same bytes")
+        other = self.create_media(b"other bytes")
+        self.assertNotEqual(first.file.name, second.file.name)
+        self.assertTrue(os.path.samefile(first.file.path, second.file.path))
+        self.assertFalse(os.path.samefile(first.file.path, other.file.path))
+        self.assertEqual(os.stat(first.file.path).st_nlink, 3)
+        with second.file.open('rb') as handle:
+            self.assertEqual(handle.read(), b"same bytes")
+
+    def test_blob_outlives_its_last_reference_only(self):
+        first, second = self.create_media(b"same bytes"), self.create_media(b"same bytes")
+        blob_dir = os.path.join(self.media_root, 'blobs')
+        first.file.delete(save=False)
+        self.assertTrue(os.path.exists(second.file.path))
+        self.assertEqual(sum(len(files) for _, _, files in os.walk(blob_dir)), 1)
+        second.file.delete(save=False)
+        self.assertEqual(sum(len(files) for _, _, files in os.walk(blob_dir)), 0)
+
+    def test_dedupe_command_links_existing_copies(self):
+        names = []
+        for index in range(2):
+            name = f"lostandfound/media/legacy{index}.jpg"
+            os.makedirs(os.path.dirname(media_storage.path(name)), exist_ok=True)
+            with open(media_storage.path(name), 'wb') as handle:
+                handle.write(b"legacy photo")
+            ItemMedia.objects.create(lost_item=self.item, file=name)
+            names.append(name)
+        orphan = self.create_media(b"orphan")
+        os.remove(orphan.file.path)
+
+        out = io.StringIO()
+        call_command('dedupe_media', '--prune', stdout=out, stderr=io.StringIO())
+        self.assertIn(f"freed {len(b'legacy photo')} bytes", out.getvalue())
+        self.assertIn("Removed 1 unused blobs", out.getvalue())
+        self.assertTrue(os.path.samefile(*(media_storage.path(name) for name in names)))
+        self.assertEqual(os.stat(media_storage.path(names[0])).st_nlink, 3)
+
+
+class ArchiveTestCase(LostAndFoundTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.old_lost = [self.create_item(LostItem, minutes_ago=60 - i, status='found') for i in range(3)]
+        self.old_found = self.create_item(FoundItem, minutes_ago=50, status='returned')
+        self.recent_lost = self.create_item(LostItem, minutes_ago=40, status='externally_found')
+        self.open_lost = self.create_item(LostItem, minutes_ago=30)
+        long_ago = timezone.now() - timedelta(days=400)
+        LostItem.objects.filter(pk__in=[item.pk for item in self.old_lost]).update(updated_at=long_ago)
+        FoundItem.objects.filter(pk=self.old_found.pk).update(updated_at=long_ago)
+        LostItem.objects.filter(pk=self.open_lost.pk).update(updated_at=long_ago)
+
+        self.claim = LostItemClaim.objects.create(lost_item=self.old_lost[0], claimant=self.other, description="Mine")
+        self.media = ItemMedia.objects.create(
+            lost_item=self.old_lost[0], file=SimpleUploadedFile("photo.mp4", b"video bytes")
+        )
+        ItemMedia.objects.create(lost_item_claim=self.claim, file=SimpleUploadedFile("proof.mp4", b"proof"))
+        ItemMediaDerivative.objects.create(media=self.media, size='thumb', status='failed')
+
+    def test_moves_old_resolved_items_with_their_rows(self):
+        stats = get_stats()
+        moved = archive_resolved_items(days=180, batch_size=2)
+        self.assertEqual(moved, {'lost': 3, 'found': 1})
+        self.assertEqual(
+            set(LostItem.objects.values_list('pk', flat=True)), {self.recent_lost.pk, self.open_lost.pk}
+        )
+        self.assertFalse(FoundItem.objects.exists())
+        archived = ArchivedLostItem.objects.get(pk=self.old_lost[0].pk)
+        self.assertEqual((archived.title, archived.claims_count, archived.media_count), ("LostItem item", 1, 1))
+        self.assertEqual(ArchivedLostItemClaim.objects.get().lost_item_id, archived.pk)
+        self.assertEqual(ArchivedItemMedia.objects.count(), 2)
+        self.assertEqual(ArchivedItemMediaDerivative.objects.get().media_id, self.media.pk)
+        self.assertFalse(ItemMedia.objects.exists() or LostItemClaim.objects.exists())
+        self.assertTrue(ArchivedFoundItem.objects.filter(pk=self.old_found.pk).exists())
+
+        # Counters still count archived items, and reconciliation agrees.
+        self.assertEqual(get_stats(), stats)
+        reconcile_counters()
+        self.assertEqual(get_stats(), stats)
+        self.assertEqual(archive_resolved_items(days=180), {'lost': 0, 'found': 0})
+
+    def test_archiving_changes_the_owner_list_etag(self):
+        self.client.force_authenticate(user=self.owner)
+        url = reverse('lostandfound:lost-items')
+        etag = self.client.get(url)['ETag']
+        archive_resolved_items(days=180)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_batches_commit_separately(self):
+        self.assertEqual(archive_batch(TIERS[0], timezone.now() - timedelta(days=180), 1), 1)
+        self.assertEqual(ArchivedLostItem.objects.count(), 1)
+        self.assertEqual(LostItem.objects.filter(status='found').count(), 2)
+        out = io.StringIO()
+        call_command('archive_resolved_items', '--days', '180', stdout=out)
+        self.assertIn("Archived 2 lost and 1 found items", out.getvalue())
+
+    def test_views_read_both_tiers(self):
+        archive_resolved_items(days=180)
+        response = self.client.get(reverse('lostandfound:resolved-items'))
+        self.assertEqual(response.data['count'], 5)
+        ids = [(row['post_type'], row['id']) for row in response.data['results']]
+        self.assertEqual(ids, [
+            ('lost', self.recent_lost.pk), ('found', self.old_found.pk),
+            *(('lost', item.pk) for item in reversed(self.old_lost)),
+        ])
+
+        self.client.force_authenticate(user=self.owner)
+        response = self.client.get(reverse('lostandfound:history'))
+        posts = response.data['posts']['results']
+        self.assertEqual(len(posts), 6)
+        archived = next(row for row in posts if row['id'] == self.old_lost[0].pk and row['post_type'] == 'lost')
+        self.assertEqual([archived[name] for name in ('detail_url', 'claims_url', 'resolve_url')], [None] * 3)
+        self.assertEqual(len(archived['media']), 1)
+        self.assertEqual(len(response.data['claims_received']['results']), 1)
+
+        media_url = reverse('lostandfound:media-access', kwargs={'pk': self.media.pk})
+        response = self.client.get(media_url)
+        self.assertEqual(b''.join(response.streaming_content), b"video bytes")
+
+        self.client.force_authenticate(user=self.other)
+        response = self.client.get(reverse('lostandfound:history'), {'sections': 'claims_made'})
+        self.assertEqual(response.data['claims_made']['results'][0]['lost_item'], self.old_lost[0].pk)
+        self.assertEqual(len(response.data['claims_made']['results'][0]['media']), 1)
+        self.assertEqual(self.client.get(media_url).status_code, status.HTTP_403_FORBIDDEN)
+
+
+class ResponseCacheTestCase(LostAndFoundTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.url = reverse('lostandfound:all-items')
+        self.item = self.create_item(LostItem)
+
+    def get(self, params=None):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+
+    def test_anonymous_responses_are_cached_until_items_change(self):
+        self.assertEqual(self.get()['X-Cache'], 'MISS')
+        # The ETag comes from the tag versions, so a hit runs no query at all.
+        with self.assertNumQueries(0):
+            response = self.get()
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertEqual(len(response.data['results']), 1)
+
+        # Parameter order does not matter, their values do.
+        self.assertEqual(self.get({'limit': 5, 'x': 1})['X-Cache'], 'MISS')
+        self.assertEqual(self.get({'x': 1, 'limit': 5})['X-Cache'], 'HIT')
+
+        self.create_item(FoundItem)
+        response = self.get()
+        self.assertEqual((response['X-Cache'], len(response.data['results'])), ('MISS', 2))
+        LostItemClaim.objects.create(lost_item=self.item, claimant=self.other, description="Mine")
+        response = self.get()
+        self.assertEqual(response.data['results'][-1]['claims_count'], 1)
+
+        metrics = get_metrics()['AllItemsListView']
+        self.assertEqual((metrics['hit'], metrics['miss']), (2, 4))
+
+    def test_university_feeds_only_follow_their_own_items(self):
+        elsewhere = University.objects.create(name="Other University", short_name="OU")
+        mine, theirs = {'university': self.university.pk}, {'university': elsewhere.pk}
+        for params in (mine, theirs, None):
+            self.get(params)
+        item = self.create_item(FoundItem, university=elsewhere)
+        self.assertEqual(self.get(mine)['X-Cache'], 'HIT')
+        self.assertEqual(self.get()['X-Cache'], 'MISS')
+        self.get(theirs)
+
+        # Moving an item refreshes the feeds of both universities.
+        item.university = self.university
+        item.save()
+        response = self.get(mine)
+        self.assertEqual((response['X-Cache'], len(response.data['results'])), ('MISS', 2))
+        response = self.get(theirs)
+        self.assertEqual((response['X-Cache'], response.data['results']), ('MISS', []))
+        self.assertEqual(self.client.get(self.url, {'university': 'x'}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_claim_media_leaves_the_feeds_cached(self):
+        claim = LostItemClaim.objects.create(lost_item=self.item, claimant=self.other, description="Mine")
+        self.get()
+        ItemMedia.objects.create(lost_item_claim=claim, file='lostandfound/media/proof.jpg')
+        self.assertEqual(self.get()['X-Cache'], 'HIT')
+        ItemMedia.objects.create(lost_item=self.item, file='lostandfound/media/photo.jpg')
+        self.assertEqual(self.get()['X-Cache'], 'MISS')
+
+    def test_bulk_moderation_invalidates(self):
+        pending = self.create_item(LostItem, approval_status='pending')
+        self.get()
+        self.client.force_authenticate(user=self.admin)
+        self.client.post(reverse('lostandfound:bulk-approve'), {
+            'approval_status': 'approved', 'lost_ids': [pending.pk]
+        }, format='json')
+        self.client.force_authenticate(user=None)
+        response = self.get()
+        self.assertEqual((response['X-Cache'], len(response.data['results'])), ('MISS', 2))
+
+    def test_authenticated_requests_bypass_the_cache(self):
+        self.get()
+        self.client.force_authenticate(user=self.admin)
+        response = self.get()
+        self.assertNotIn('X-Cache', response)
+        self.assertTrue(response.data['results'][0]['is_admin'])
+        self.assertEqual(get_metrics()['AllItemsListView']['bypass'], 1)
+
+
+class ConditionalResponseTestCase(LostAndFoundTestMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.item = self.create_item(LostItem)
+        self.url = reverse('lostandfound:lost-item-detail', kwargs={'pk': self.item.pk})
+
+    def test_matching_etag_is_answered_before_serializing(self):
+        response = self.client.get(self.url)
+        etag = response['ETag']
+        self.assertTrue(etag.startswith('W/"'))
+        self.assertIn('Authorization', response['Vary'])
+
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+        LostItemClaim.objects.create(lost_item=self.item, claimant=self.other, description="Mine")
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_etag_depends_on_the_user(self):
+        etag = self.client.get(self.url)['ETag']
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.data['is_admin'])
+
+    def test_if_modified_since(self):
+        last_modified = self.client.get(self.url)['Last-Modified']
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        LostItem.objects.filter(pk=self.item.pk).update(updated_at=timezone.now() + timedelta(days=1))
+        response = self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_lists_revalidate_against_their_rows(self):
+        urls = [reverse('lostandfound:all-items'), reverse('lostandfound:lost-items')]
+        etags = [self.client.get(url)['ETag'] for url in urls]
+        for url, etag in zip(urls, etags):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+        self.create_item(LostItem)
+        for url, etag in zip(urls, etags):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_lists_validate_from_tag_versions_without_last_modified(self):
+        url = reverse('lostandfound:all-items')
+        response = self.client.get(url)
+        etag = response['ETag']
+        self.assertNotIn('Last-Modified', response)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+            self.assertEqual(self.client.get(url)['X-Cache'], 'HIT')
+
+        # A row leaving the list moves no timestamp, but it still changes the ETag.
+        LostItem.objects.get(pk=self.item.pk).delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_missing_items_are_not_found(self):
+        self.item.status = 'found'
+        self.item.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertNotIn('ETag', response)
@@ -0,0 +1,209 @@
+import os
+import random
+import statistics
+import time
+from datetime import timedelta
+from django.db import connection
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from unittest import mock
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework import status
+from accounts.models import User
+from campus_connect.links import LinkBuilder
+from .matching import find_matches, rebuild_index
+from universities.models import University
+from .models import LostItem, FoundItem
+
+# Row counts to benchmark, e.g. FEED_BENCH_SIZES=1000,10000,100000,1000000
+BENCH_SIZES = [int(size) for size in os.getenv('FEED_BENCH_SIZES', '1000,10000').split(',')]
+BATCH_SIZE = 5000
+# Items per side for the matching benchmark; small by default so it fits the plain test run,
+# e.g. MATCH_BENCH_SIZE=100000 for the full measurement.
+MATCH_BENCH_SIZE = int(os.getenv('MATCH_BENCH_SIZE', '1000'))
+
+
+class FeedLoadMixin:
+    def setUp(self):
+        self.client = APIClient()
+        self.university = University.objects.create(name="Load University", short_name="LU")
+        self.user = User.objects.create_user(email="load@example.com", password="password123", name="Load")
+        self.total = 0
+
+    def grow_to(self, size):
+        """Adds approved, open lost and found items (half each) until the feed holds `size` rows."""
+        today = timezone.now().date()
+        while self.total < size:
+            batch = min(BATCH_SIZE, size - self.total)
+            LostItem.objects.bulk_create([
+                LostItem(user=self.user, university=self.university, title=f"Lost {i}", description="Bench item",
+                         lost_date=today, location="Library", approval_status='approved')
+                for i in range(batch // 2)
+            ])
+            FoundItem.objects.bulk_create([
+                FoundItem(user=self.user, university=self.university, title=f"Found {i}", description="Bench item",
+                          found_date=today, location="Library", approval_status='approved')
+                for i in range(batch - batch // 2)
+            ])
+            self.total += batch
+
+
+# bulk_create() sends no signals, so cached pages would go stale; measure the uncached build.
+@override_settings(RESPONSE_CACHE_ENABLED=False)
+class MergedFeedLoadTestCase(FeedLoadMixin, TestCase):
+    def time_page(self, params, runs=5):
+        durations = []
+        for _ in range(runs):
+            start_time = time.perf_counter()
+            response = self.client.get(reverse('lostandfound:all-items'), params)
+            durations.append(time.perf_counter() - start_time)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return statistics.median(durations), response
+
+    def test_all_items_page_latency_is_flat(self):
+        """Benchmark the first page of AllItemsListView as the tables grow."""
+        query_counts = set()
+        for size in BENCH_SIZES:
+            self.grow_to(size)
+            with CaptureQueriesContext(connection) as queries:
+                duration, response = self.time_page({'limit': 25}, runs=1)
+            query_counts.add(len(queries))
+            duration, response = self.time_page({'limit': 25})
+            self.assertEqual(response.data['count'], size)
+            self.assertEqual(len(response.data['results']), 25)
+            print(f"AllItemsListView page of 25 over {size} rows: {duration * 1000:.2f} ms")
+        self.assertEqual(len(query_counts), 1, "Page query count must not depend on table size")
+
+
+class LinkBuilderBenchmark(SimpleTestCase):
+    ROUTES = [
+        ('lostandfound:lost-item-detail', 1234),
+        ('lostandfound:lost-item-claims', 1234),
+        ('lostandfound:lost-item-resolve', 1234),
+        ('lostandfound:lost-item-approve', 1234),
+        ('lostandfound:media-access', 'aB3_x-Yz9QwErTyU'),
+        ('accounts:user-detail', 42),
+    ]
+    ROWS = 2000
+
+    def test_link_builder_matches_reverse(self):
+        """Benchmark the links of a large page: reverse() + build_absolute_uri() vs LinkBuilder."""
+        request = RequestFactory().get('/api/lostandfound/all/')
+        builder = LinkBuilder(request)
+        for view_name, pk in self.ROUTES:
+            self.assertEqual(
+                builder.url(view_name, pk),
+                request.build_absolute_uri(reverse(view_name, kwargs={'pk': pk}))
+            )
+
+        start_time = time.perf_counter()
+        for _ in range(self.ROWS):
+            for view_name, pk in self.ROUTES:
+                request.build_absolute_uri(reverse(view_name, kwargs={'pk': pk}))
+        reverse_duration = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        builder = LinkBuilder(request)
+        for _ in range(self.ROWS):
+            for view_name, pk in self.ROUTES:
+                builder.url(view_name, pk)
+        builder_duration = time.perf_counter() - start_time
+
+        links = self.ROWS * len(self.ROUTES)
+        print(f"{links} links: reverse() {reverse_duration * 1000:.1f} ms, LinkBuilder {builder_duration * 1000:.1f} ms")
+
+
+class MatchingLoadTestCase(TestCase):
+    COLOURS = ['black', 'blue', 'red', 'green', 'silver', 'white', 'brown', 'grey', 'pink', 'yellow']
+    THINGS = ['wallet', 'phone', 'umbrella', 'bottle', 'laptop', 'charger', 'backpack', 'jacket', 'watch',
+              'calculator', 'notebook', 'headphones', 'keys', 'glasses', 'scarf', 'card', 'pen', 'book']
+    DETAILS = ['leather', 'plastic', 'metal', 'cotton', 'sticker', 'scratched', 'new', 'old', 'zipper', 'logo',
+               'engraved', 'cracked', 'small', 'large', 'cover', 'strap', 'case', 'tag', 'initials', 'torn']
+    PLACES = ['library', 'cafeteria', 'gym', 'auditorium', 'lab', 'hostel', 'parking', 'mosque', 'field', 'canteen']
+
+    def setUp(self):
+        self.client = APIClient()
+        self.random = random.Random(42)
+        self.university = University.objects.create(name="Match University", short_name="MU")
+        self.owner = User.objects.create_user(email="owner@example.com", password="password123", name="Owner")
+        self.finder = User.objects.create_user(email="finder@example.com", password="password123", name="Finder")
+
+    def fields(self):
+        pick = self.random.choice
+        return {
+            'title': f"{pick(self.COLOURS)} {pick(self.THINGS)}",
+            'description': ' '.join(self.random.sample(self.DETAILS, 4)) + f" {pick(self.COLOURS)} {pick(self.THINGS)}",
+            'location': f"{pick(self.PLACES)} {pick(['floor', 'entrance', 'room', 'corner'])}",
+            'university': self.university,
+            'approval_status': 'approved',
+        }
+
+    def create_items(self, size):
+        today = timezone.now().date()
+        for start in range(0, size, BATCH_SIZE):
+            batch = range(start, min(start + BATCH_SIZE, size))
+            LostItem.objects.bulk_create([
+                LostItem(user=self.owner, lost_date=today - timedelta(days=self.random.randint(0, 60)), **self.fields())
+                for _ in batch
+            ])
+            FoundItem.objects.bulk_create([
+                FoundItem(user=self.finder, found_date=today - timedelta(days=self.random.randint(0, 60)), **self.fields())
+                for _ in batch
+            ])
+
+    def test_match_latency(self):
+        """Benchmark lost -> found matching with MATCH_BENCH_SIZE items per side."""
+        start_time = time.perf_counter()
+        self.create_items(MATCH_BENCH_SIZE)
+        print(f"Created {MATCH_BENCH_SIZE} items per side in {time.perf_counter() - start_time:.1f} s")
+        start_time = time.perf_counter()
+        indexed = rebuild_index()
+        print(f"Indexed {indexed} items in {time.perf_counter() - start_time:.1f} s")
+
+        self.client.force_authenticate(user=self.owner)
+        lost_items = list(LostItem.objects.order_by('?')[:20])
+        query_counts, durations = set(), []
+        for item in lost_items:
+            url = reverse('lostandfound:lost-item-matches', kwargs={'pk': item.pk})
+            with CaptureQueriesContext(connection) as queries:
+                start_time = time.perf_counter()
+                response = self.client.get(url)
+                durations.append(time.perf_counter() - start_time)
+            query_counts.add(len(queries))
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertTrue(response.data['results'])
+
+        start_time = time.perf_counter()
+        for item in lost_items:
+            find_matches(item)
+        engine_duration = (time.perf_counter() - start_time) / len(lost_items)
+        print(
+            f"Matches over {MATCH_BENCH_SIZE} found items: endpoint median {statistics.median(durations) * 1000:.1f} ms, "
+            f"engine {engine_duration * 1000:.1f} ms, queries {sorted(query_counts)}"
+        )
+        self.assertEqual(len(query_counts), 1, "Match query count must not depend on the item")
+
+
+class SearchLoadTestCase(FeedLoadMixin, TestCase):
+    def time_search(self, params, runs=5):
+        durations = []
+        for _ in range(runs):
+            start_time = time.perf_counter()
+            response = self.client.get(reverse('lostandfound:item-search'), params)
+            durations.append(time.perf_counter() - start_time)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return statistics.median(durations), response
+
+    def test_search_latency(self):
+        """Benchmark FTS5 search against the icontains fallback as the tables grow."""
+        for size in BENCH_SIZES:
+            self.grow_to(size)
+            LostItem.objects.filter(pk=LostItem.objects.order_by('id').values('id')[:1]).update(title="Needle wallet")
+            fts_duration, response = self.time_search({'q': 'needle'})
+            self.assertEqual(response.data['count'], 1)
+            with mock.patch('lostandfound.search.fts_available', return_value=False):
+                fallback_duration, response = self.time_search({'q': 'needle'})
+            self.assertEqual(response.data['count'], 1)
+            print(f"Search over {size} rows: FTS5 {fts_duration * 1000:.2f} ms, icontains {fallback_duration * 1000:.2f} ms")
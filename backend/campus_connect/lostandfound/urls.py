@@ -3,8 +3,9 @@ from .views import (
     AllItemsListView, PendingItemsListView, LostItemListCreateView, FoundItemListCreateView,
     LostItemDetailView, FoundItemDetailView, LostItemClaimView, FoundItemClaimView,
     LostItemResolveView, FoundItemResolveView, LostItemApprovalView, FoundItemApprovalView,
-    ResolvedItemsListView, MyClaimsListView, MyPostsListView,
-    LostItemClaimsListView, FoundItemClaimsListView, HistoryView, MediaAccessView
+    BulkApprovalView, ResolvedItemsListView, MyClaimsListView, MyPostsListView,
+    LostItemClaimsListView, FoundItemClaimsListView, LostItemMatchesView, FoundItemMatchesView,
+    ItemSearchView, ItemStatsView, HistoryView, MediaAccessView
 )
 
 app_name = 'lostandfound'
@@ -23,10 +24,15 @@ urlpatterns = [
     path('found/<int:pk>/resolve/', FoundItemResolveView.as_view(), name='found-item-resolve'),
     path('lost/<int:pk>/approve/', LostItemApprovalView.as_view(), name='lost-item-approve'),
     path('found/<int:pk>/approve/', FoundItemApprovalView.as_view(), name='found-item-approve'),
+    path('approve/', BulkApprovalView.as_view(), name='bulk-approve'),
     path('my-claims/', MyClaimsListView.as_view(), name='my-claims'),
     path('my-posts/', MyPostsListView.as_view(), name='my-posts'),
     path('lost/<int:pk>/claims/', LostItemClaimsListView.as_view(), name='lost-item-claims'),
     path('found/<int:pk>/claims/', FoundItemClaimsListView.as_view(), name='found-item-claims'),
+    path('lost/<int:pk>/matches/', LostItemMatchesView.as_view(), name='lost-item-matches'),
+    path('found/<int:pk>/matches/', FoundItemMatchesView.as_view(), name='found-item-matches'),
+    path('search/', ItemSearchView.as_view(), name='item-search'),
+    path('stats/', ItemStatsView.as_view(), name='item-stats'),
     path('history/', HistoryView.as_view(), name='history'),
     path('media/<str:pk>/', MediaAccessView.as_view(), name='media-access'),
 ]
\ No newline at end of file
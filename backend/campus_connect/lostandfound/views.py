@@ -4,20 +4,96 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.parsers import MultiPartParser, FormParser
-from .models import LostItem, FoundItem, LostItemClaim, FoundItemClaim, ItemMedia
+from .models import (
+    LostItem, FoundItem, LostItemClaim, FoundItemClaim, ItemMedia,
+    ArchivedLostItem, ArchivedFoundItem, ArchivedLostItemClaim, ArchivedFoundItemClaim, ArchivedItemMedia
+)
 from .serializers import (
     SimpleLostItemSerializer, LostItemSerializer, FoundItemSerializer,
     LostItemClaimSerializer, FoundItemClaimSerializer,
+    ArchivedLostItemSerializer, ArchivedFoundItemSerializer,
+    ArchivedLostItemClaimSerializer, ArchivedFoundItemClaimSerializer,
     LostItemResolveSerializer, FoundItemResolveSerializer,
-    LostItemApprovalSerializer, FoundItemApprovalSerializer,
-    HistorySerializer
+    LostItemApprovalSerializer, FoundItemApprovalSerializer, BulkApprovalSerializer
 )
-from django.http import FileResponse
+from .feeds import MergedFeed, get_feed_tags, serialize_feed
+from .permissions import can_access_media, get_claimed_items
+from .matching import find_matches
+from .search import search_items
+from .moderation import moderate_items
+from .counters import get_stats
+from campus_connect.pagination import KeysetPagination
+from campus_connect.media import serve_media
+from campus_connect.response_cache import cache_response
+from campus_connect.conditional import conditional_response, row_validators, tag_validators
+from campus_connect.derivatives import DERIVATIVE_SIZES, get_media_file
 from django.db.models import Q
 import logging
 
 logger = logging.getLogger(__name__)
 
+ITEM_SERIALIZERS = {
+    LostItem: SimpleLostItemSerializer,
+    FoundItem: FoundItemSerializer,
+    ArchivedLostItem: ArchivedLostItemSerializer,
+    ArchivedFoundItem: ArchivedFoundItemSerializer,
+}
+
+CLAIM_SERIALIZERS = {
+    LostItemClaim: LostItemClaimSerializer,
+    FoundItemClaim: FoundItemClaimSerializer,
+    ArchivedLostItemClaim: ArchivedLostItemClaimSerializer,
+    ArchivedFoundItemClaim: ArchivedFoundItemClaimSerializer,
+}
+
+
+def get_item_querysets(**filters):
+    """Lost, found, archived lost and archived found items matching `filters`, set up for their serializers."""
+    return [
+        serializer_class.setup_queryset(model.objects.filter(**filters))
+        for model, serializer_class in ITEM_SERIALIZERS.items()
+    ]
+
+
+def get_claim_querysets(lost_filters, found_filters):
+    """Live and archived claims on lost items matching `lost_filters` and on found items matching `found_filters`."""
+    filters = {
+        LostItemClaim: lost_filters,
+        FoundItemClaim: found_filters,
+        ArchivedLostItemClaim: lost_filters,
+        ArchivedFoundItemClaim: found_filters,
+    }
+    return [
+        serializer_class.setup_queryset(model.objects.filter(**filters[model]))
+        for model, serializer_class in CLAIM_SERIALIZERS.items()
+    ]
+
+def get_feed_university(request):
+    """The id ?university= limits an item feed to; None for every university."""
+    university = request.query_params.get('university')
+    return int(university) if university is not None and university.isdigit() else None
+
+def get_university_error(request):
+    """A 400 response when ?university= is given but is not an id, otherwise None."""
+    university = request.query_params.get('university')
+    if university is not None and not university.isdigit():
+        return Response({"error": "Invalid university."}, status=status.HTTP_400_BAD_REQUEST)
+    return None
+
+def get_request_feed_tags(view, request, *args, **kwargs):
+    return get_feed_tags(get_feed_university(request))
+
+def get_feed_validators(view, request, *args, **kwargs):
+    """Validators of an item feed: the versions of the tags of the universities it shows."""
+    return tag_validators(get_request_feed_tags(view, request))
+
+def get_item_validators(model):
+    """Validators of an approved, unresolved item's detail response."""
+    def get_validators(view, request, pk):
+        queryset = model.objects.filter(approval_status='approved', status__in=['open', 'claimed'])
+        return row_validators(queryset, pk, ('claims_count', 'media_count'))
+    return get_validators
+
 class AdminPermission:
     """Permission class for university or app-wide admins."""
     def has_permission(self, request, view):
@@ -30,7 +106,7 @@ class UniversityAdminPermission(AdminPermission):
         user = request.user
         if user.admin_level == 'app':
             return True
-        return user.admin_level == 'university' and obj.university == user.university
+        return user.admin_level == 'university' and obj.university_id == user.university_id
 
 class PostOwnerOrAdminPermission(AdminPermission):
     """Permission class for post owners or authorized admins."""
@@ -38,37 +114,36 @@ class PostOwnerOrAdminPermission(AdminPermission):
         user = request.user
         if user.admin_level == 'app':
             return True
-        if user.admin_level == 'university' and obj.university == user.university:
+        if user.admin_level == 'university' and obj.university_id == user.university_id:
             return True
-        return user == obj.user
+        return user.pk == obj.user_id
 
 class AllItemsListView(APIView):
     permission_classes = [AllowAny]
-    pagination_class = LimitOffsetPagination
+    pagination_class = KeysetPagination
 
+    @conditional_response(get_feed_validators)
+    @cache_response(tags=get_request_feed_tags, timeout=30)
     def get(self, request):
         """
-        Lists all approved, unresolved lost and found items.
+        Lists all approved, unresolved lost and found items, or those of ?university=<id>.
         Includes post_type ('lost' or 'found'), is_admin, detail_url, claims_url.
         """
-        lost_items = LostItem.objects.filter(
-            approval_status='approved',
-            status__in=['open', 'claimed']
-        )
-        found_items = FoundItem.objects.filter(
-            approval_status='approved',
-            status__in=['open', 'claimed']
-        )
-
-        lost_serializer = SimpleLostItemSerializer(lost_items, many=True, context={'request': request})
-        found_serializer = FoundItemSerializer(found_items, many=True, context={'request': request})
-
-        all_items = lost_serializer.data + found_serializer.data
-        all_items.sort(key=lambda x: x['created_at'], reverse=True)
-
+        error = get_university_error(request)
+        if error is not None:
+            return error
+        filters = {'approval_status': 'approved', 'status__in': ['open', 'claimed']}
+        university = get_feed_university(request)
+        if university is not None:
+            filters['university_id'] = university
+        lost_items = SimpleLostItemSerializer.setup_queryset(LostItem.objects.filter(**filters))
+        found_items = FoundItemSerializer.setup_queryset(FoundItem.objects.filter(**filters))
+
+        feed = MergedFeed(lost_items, found_items)
         paginator = self.pagination_class()
-        paginated_items = paginator.paginate_queryset(all_items, request)
-        return paginator.get_paginated_response(paginated_items)
+        paginated_items = paginator.paginate_queryset(feed, request, view=self)
+        data = serialize_feed(paginated_items, ITEM_SERIALIZERS, {'request': request})
+        return paginator.get_paginated_response(data)
 
 class PendingItemsListView(APIView):
     permission_classes = [IsAuthenticated, AdminPermission]
@@ -90,22 +165,24 @@ class PendingItemsListView(APIView):
         else:  # app-wide admin
             lost_items = LostItem.objects.filter(approval_status='pending')
             found_items = FoundItem.objects.filter(approval_status='pending')
+        lost_items = SimpleLostItemSerializer.setup_queryset(lost_items)
+        found_items = FoundItemSerializer.setup_queryset(found_items)
 
-        lost_serializer = SimpleLostItemSerializer(lost_items, many=True, context={'request': request})
-        found_serializer = FoundItemSerializer(found_items, many=True, context={'request': request})
-
-        all_items = lost_serializer.data + found_serializer.data
-        all_items.sort(key=lambda x: x['created_at'], reverse=True)
-
+        feed = MergedFeed(lost_items, found_items)
         paginator = self.pagination_class()
-        paginated_items = paginator.paginate_queryset(all_items, request)
-        return paginator.get_paginated_response(paginated_items)
+        paginated_items = paginator.paginate_queryset(feed, request, view=self)
+        data = serialize_feed(paginated_items, ITEM_SERIALIZERS, {'request': request})
+        return paginator.get_paginated_response(data)
 
 class LostItemListCreateView(generics.ListCreateAPIView):
     permission_classes = [AllowAny]
-    pagination_class = LimitOffsetPagination
+    pagination_class = KeysetPagination
     parser_classes = [MultiPartParser, FormParser]
 
+    @conditional_response(get_feed_validators)
+    def get(self, request, *args, **kwargs):
+        return get_university_error(request) or super().get(request, *args, **kwargs)
+
     def get_permissions(self):
         return [AllowAny()] if self.request.method == 'GET' else [IsAuthenticated()]
 
@@ -114,19 +191,24 @@ class LostItemListCreateView(generics.ListCreateAPIView):
 
     def get_queryset(self):
         """
-        Lists lost items. Non-owners see approved, unresolved posts.
-        Owners see all their posts. Includes post_type, is_admin, detail_url, claims_url, resolve_url.
+        Lists lost items, or those of ?university=<id>. Non-owners see approved,
+        unresolved posts. Owners see all their posts. Includes post_type, is_admin, detail_url, claims_url, resolve_url.
         """
         user = self.request.user
         if user.is_authenticated:
-            return LostItem.objects.filter(
+            queryset = LostItem.objects.filter(
                 Q(approval_status='approved', status__in=['open', 'claimed']) |
                 Q(user=user)
             )
-        return LostItem.objects.filter(
-            approval_status='approved',
-            status__in=['open', 'claimed']
-        )
+        else:
+            queryset = LostItem.objects.filter(
+                approval_status='approved',
+                status__in=['open', 'claimed']
+            )
+        university = get_feed_university(self.request)
+        if university is not None:
+            queryset = queryset.filter(university_id=university)
+        return self.get_serializer_class().setup_queryset(queryset)
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user, approval_status='pending')
@@ -134,9 +216,13 @@ class LostItemListCreateView(generics.ListCreateAPIView):
 
 class FoundItemListCreateView(generics.ListCreateAPIView):
     permission_classes = [AllowAny]
-    pagination_class = LimitOffsetPagination
+    pagination_class = KeysetPagination
     parser_classes = [MultiPartParser, FormParser]
 
+    @conditional_response(get_feed_validators)
+    def get(self, request, *args, **kwargs):
+        return get_university_error(request) or super().get(request, *args, **kwargs)
+
     def get_permissions(self):
         return [AllowAny()] if self.request.method == 'GET' else [IsAuthenticated()]
 
@@ -145,19 +231,24 @@ class FoundItemListCreateView(generics.ListCreateAPIView):
 
     def get_queryset(self):
         """
-        Lists found items. Non-owners see approved, unresolved posts.
-        Owners see all their posts. Includes post_type, is_admin, detail_url, claims_url, resolve_url.
+        Lists found items, or those of ?university=<id>. Non-owners see approved,
+        unresolved posts. Owners see all their posts. Includes post_type, is_admin, detail_url, claims_url, resolve_url.
         """
         user = self.request.user
         if user.is_authenticated:
-            return FoundItem.objects.filter(
+            queryset = FoundItem.objects.filter(
                 Q(approval_status='approved', status__in=['open', 'claimed']) |
                 Q(user=user)
             )
-        return FoundItem.objects.filter(
-            approval_status='approved',
-            status__in=['open', 'claimed']
-        )
+        else:
+            queryset = FoundItem.objects.filter(
+                approval_status='approved',
+                status__in=['open', 'claimed']
+            )
+        university = get_feed_university(self.request)
+        if university is not None:
+            queryset = queryset.filter(university_id=university)
+        return self.get_serializer_class().setup_queryset(queryset)
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user, approval_status='pending')
@@ -166,13 +257,14 @@ class FoundItemListCreateView(generics.ListCreateAPIView):
 class LostItemDetailView(APIView):
     permission_classes = [AllowAny]
 
+    @conditional_response(get_item_validators(LostItem))
     def get(self, request, pk):
         """
         Retrieves a lost item. Only approved, unresolved posts are accessible.
         Includes post_type ('lost'), is_admin, detail_url, claims_url.
         """
         try:
-            lost_item = LostItem.objects.get(
+            lost_item = SimpleLostItemSerializer.setup_queryset(LostItem.objects.all()).get(
                 pk=pk,
                 approval_status='approved',
                 status__in=['open', 'claimed']
@@ -188,13 +280,14 @@ class LostItemDetailView(APIView):
 class FoundItemDetailView(APIView):
     permission_classes = [AllowAny]
 
+    @conditional_response(get_item_validators(FoundItem))
     def get(self, request, pk):
         """
         Retrieves a found item. Only approved, unresolved posts are accessible.
         Includes post_type ('found'), is_admin, detail_url, claims_url.
         """
         try:
-            found_item = FoundItem.objects.get(
+            found_item = FoundItemSerializer.setup_queryset(FoundItem.objects.all()).get(
                 pk=pk,
                 approval_status='approved',
                 status__in=['open', 'claimed']
@@ -377,6 +470,30 @@ class FoundItemApprovalView(APIView):
         except FoundItem.DoesNotExist:
             return Response({"error": "Found item not found."}, status=status.HTTP_404_NOT_FOUND)
 
+class BulkApprovalView(APIView):
+    permission_classes = [IsAuthenticated, AdminPermission]
+
+    def post(self, request):
+        """
+        Approves or rejects many lost and found items at once, all or nothing.
+        Takes approval_status plus lost_ids and/or found_ids, and returns the outcome
+        for every ID: the new approval_status, 'forbidden' or 'not_found'.
+        """
+        serializer = BulkApprovalSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response({"error": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+        approval_status = serializer.validated_data['approval_status']
+        outcomes = moderate_items(request.user, approval_status, {
+            'lost': serializer.validated_data['lost_ids'],
+            'found': serializer.validated_data['found_ids'],
+        })
+        changed = sum(outcome == approval_status for results in outcomes.values() for outcome in results.values())
+        logger.info(f"{changed} items set to '{approval_status}' by {request.user.email}")
+        return Response({
+            post_type: [{"id": pk, "result": outcome} for pk, outcome in results.items()]
+            for post_type, results in outcomes.items()
+        }, status=status.HTTP_200_OK)
+
 class ResolvedItemsListView(APIView):
     permission_classes = [AllowAny]
     pagination_class = LimitOffsetPagination
@@ -385,25 +502,17 @@ class ResolvedItemsListView(APIView):
         """
         Lists approved, resolved lost and found items.
         Includes post_type ('lost' or 'found'), is_admin, detail_url, claims_url.
+        Reads both the live tables and the archive of long-resolved items.
         """
-        lost_items = LostItem.objects.filter(
-            approval_status='approved',
-            status__in=['found', 'externally_found']
-        )
-        found_items = FoundItem.objects.filter(
-            approval_status='approved',
-            status__in=['returned', 'externally_returned']
-        )
-
-        lost_serializer = SimpleLostItemSerializer(lost_items, many=True, context={'request': request})
-        found_serializer = FoundItemSerializer(found_items, many=True, context={'request': request})
-
-        all_items = lost_serializer.data + found_serializer.data
-        all_items.sort(key=lambda x: x['created_at'], reverse=True)
+        lost_items, found_items, archived_lost, archived_found = get_item_querysets(approval_status='approved')
+        lost_items = lost_items.filter(status__in=['found', 'externally_found'])
+        found_items = found_items.filter(status__in=['returned', 'externally_returned'])
 
+        feed = MergedFeed(lost_items, found_items, archived_lost, archived_found)
         paginator = self.pagination_class()
-        paginated_items = paginator.paginate_queryset(all_items, request)
-        return paginator.get_paginated_response(paginated_items)
+        paginated_items = paginator.paginate_queryset(feed, request, view=self)
+        data = serialize_feed(paginated_items, ITEM_SERIALIZERS, {'request': request})
+        return paginator.get_paginated_response(data)
 
 class MyClaimsListView(APIView):
     permission_classes = [IsAuthenticated]
@@ -414,18 +523,14 @@ class MyClaimsListView(APIView):
         Lists all claims made by the authenticated user.
         Only claims on approved, unresolved posts are included.
         """
-        lost_claims = LostItemClaim.objects.filter(claimant=request.user)
-        found_claims = FoundItemClaim.objects.filter(claimant=request.user)
-
-        lost_serializer = LostItemClaimSerializer(lost_claims, many=True, context={'request': request})
-        found_serializer = FoundItemClaimSerializer(found_claims, many=True, context={'request': request})
-
-        all_claims = lost_serializer.data + found_serializer.data
-        all_claims.sort(key=lambda x: x['created_at'], reverse=True)
+        lost_claims = LostItemClaimSerializer.setup_queryset(LostItemClaim.objects.filter(claimant=request.user))
+        found_claims = FoundItemClaimSerializer.setup_queryset(FoundItemClaim.objects.filter(claimant=request.user))
 
+        feed = MergedFeed(lost_claims, found_claims)
         paginator = self.pagination_class()
-        paginated_items = paginator.paginate_queryset(all_claims, request)
-        return paginator.get_paginated_response(paginated_items)
+        paginated_claims = paginator.paginate_queryset(feed, request)
+        data = serialize_feed(paginated_claims, CLAIM_SERIALIZERS, {'request': request})
+        return paginator.get_paginated_response(data)
 
 class MyPostsListView(APIView):
     permission_classes = [IsAuthenticated]
@@ -436,18 +541,11 @@ class MyPostsListView(APIView):
         Lists all posts (lost and found) created by the authenticated user.
         Includes unapproved and resolved posts, with post_type, is_admin, detail_url, claims_url, resolve_url, approve_url.
         """
-        lost_items = LostItem.objects.filter(user=request.user)
-        found_items = FoundItem.objects.filter(user=request.user)
-
-        lost_serializer = SimpleLostItemSerializer(lost_items, many=True, context={'request': request})
-        found_serializer = FoundItemSerializer(found_items, many=True, context={'request': request})
-
-        all_posts = lost_serializer.data + found_serializer.data
-        all_posts.sort(key=lambda x: x['created_at'], reverse=True)
-
+        feed = MergedFeed(*get_item_querysets(user=request.user))
         paginator = self.pagination_class()
-        paginated_items = paginator.paginate_queryset(all_posts, request)
-        return paginator.get_paginated_response(paginated_items)
+        paginated_items = paginator.paginate_queryset(feed, request, view=self)
+        data = serialize_feed(paginated_items, ITEM_SERIALIZERS, {'request': request})
+        return paginator.get_paginated_response(data)
 
 class LostItemClaimsListView(APIView):
     permission_classes = [IsAuthenticated, PostOwnerOrAdminPermission]
@@ -469,11 +567,11 @@ class LostItemClaimsListView(APIView):
                     {"error": "You do not have permission to view claims for this item."},
                     status=status.HTTP_403_FORBIDDEN
                 )
-            claims = LostItemClaim.objects.filter(lost_item=lost_item)
-            serializer = LostItemClaimSerializer(claims, many=True, context={'request': request})
+            claims = LostItemClaimSerializer.setup_queryset(LostItemClaim.objects.filter(lost_item=lost_item))
             paginator = self.pagination_class()
-            paginated_items = paginator.paginate_queryset(serializer.data, request)
-            return paginator.get_paginated_response(paginated_items)
+            paginated_claims = paginator.paginate_queryset(claims, request)
+            serializer = LostItemClaimSerializer(paginated_claims, many=True, context={'request': request})
+            return paginator.get_paginated_response(serializer.data)
         except LostItem.DoesNotExist:
             return Response(
                 {"error": "Lost item not found, not approved, or resolved."},
@@ -500,28 +598,174 @@ class FoundItemClaimsListView(APIView):
                     {"error": "You do not have permission to view claims for this item."},
                     status=status.HTTP_403_FORBIDDEN
                 )
-            claims = FoundItemClaim.objects.filter(found_item=found_item)
-            serializer = FoundItemClaimSerializer(claims, many=True, context={'request': request})
+            claims = FoundItemClaimSerializer.setup_queryset(FoundItemClaim.objects.filter(found_item=found_item))
             paginator = self.pagination_class()
-            paginated_items = paginator.paginate_queryset(serializer.data, request)
-            return paginator.get_paginated_response(paginated_items)
+            paginated_claims = paginator.paginate_queryset(claims, request)
+            serializer = FoundItemClaimSerializer(paginated_claims, many=True, context={'request': request})
+            return paginator.get_paginated_response(serializer.data)
         except FoundItem.DoesNotExist:
             return Response(
                 {"error": "Found item not found, not approved, or resolved."},
                 status=status.HTTP_404_NOT_FOUND
             )
 
+class ItemMatchesView(APIView):
+    """
+    Lists the best matching posts from the other side for an item, e.g. found items
+    for a lost item, scored by text, date and time similarity.
+    Only the item's owner and authorized admins can see them.
+    """
+    permission_classes = [IsAuthenticated]
+    model = None
+    serializer_class = None
+    default_limit = 10
+    max_limit = 50
+
+    def get(self, request, pk):
+        label = self.model._meta.verbose_name.capitalize()
+        try:
+            item = self.model.objects.get(pk=pk)
+        except self.model.DoesNotExist:
+            return Response({"error": f"{label} not found."}, status=status.HTTP_404_NOT_FOUND)
+        if not PostOwnerOrAdminPermission().has_object_permission(request, self, item):
+            return Response(
+                {"error": "You do not have permission to view matches for this item."},
+                status=status.HTTP_403_FORBIDDEN
+            )
+        try:
+            limit = min(int(request.query_params.get('limit', self.default_limit)), self.max_limit)
+        except ValueError:
+            limit = self.default_limit
+        candidates = self.serializer_class.setup_queryset(self.serializer_class.Meta.model.objects.all())
+        matches = find_matches(item, limit=max(limit, 1), queryset=candidates)
+        data = self.serializer_class([candidate for candidate, _ in matches], many=True, context={'request': request}).data
+        results = [dict(scores, item=row) for (_, scores), row in zip(matches, data)]
+        return Response({"results": results}, status=status.HTTP_200_OK)
+
+class LostItemMatchesView(ItemMatchesView):
+    model = LostItem
+    serializer_class = FoundItemSerializer
+
+class FoundItemMatchesView(ItemMatchesView):
+    model = FoundItem
+    serializer_class = SimpleLostItemSerializer
+
+class ItemSearchView(APIView):
+    permission_classes = [AllowAny]
+    pagination_class = LimitOffsetPagination
+    post_types = {'lost': LostItem, 'found': FoundItem}
+
+    def get(self, request):
+        """
+        Full-text search over the title, description and location of lost and found items,
+        best match first. 'wall*' matches words starting with 'wall'.
+        Filters: type (lost or found), university, status and approval_status (comma-separated).
+        Defaults to approved, unresolved posts; other posts are only visible to their owners and admins.
+        """
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({"error": "The 'q' parameter is required."}, status=status.HTTP_400_BAD_REQUEST)
+        post_type = request.query_params.get('type')
+        if post_type is not None and post_type not in self.post_types:
+            return Response(
+                {"error": f"Invalid type. Use one of: {', '.join(self.post_types)}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        university = request.query_params.get('university')
+        if university is not None and not university.isdigit():
+            return Response({"error": "Invalid university."}, status=status.HTTP_400_BAD_REQUEST)
+
+        statuses = self.get_list_param(request, 'status') or ['open', 'claimed']
+        approval_statuses = self.get_list_param(request, 'approval_status') or ['approved']
+        models = [self.post_types[post_type]] if post_type else [LostItem, FoundItem]
+        querysets = []
+        for model in models:
+            queryset = model.objects.filter(
+                self.get_visible_filter(request.user),
+                status__in=statuses,
+                approval_status__in=approval_statuses
+            )
+            if university is not None:
+                queryset = queryset.filter(university_id=university)
+            querysets.append(ITEM_SERIALIZERS[model].setup_queryset(queryset))
+
+        results = search_items(query, *querysets)
+        paginator = self.pagination_class()
+        paginated_items = paginator.paginate_queryset(results, request, view=self)
+        data = serialize_feed(paginated_items, ITEM_SERIALIZERS, {'request': request})
+        return paginator.get_paginated_response(data)
+
+    def get_list_param(self, request, name):
+        value = request.query_params.get(name, '')
+        return [part.strip() for part in value.split(',') if part.strip()]
+
+    def get_visible_filter(self, user):
+        visible = Q(approval_status='approved')
+        if not user.is_authenticated:
+            return visible
+        if user.admin_level == 'app':
+            return Q()
+        if user.admin_level == 'university':
+            visible |= Q(university_id=user.university_id)
+        return visible | Q(user=user)
+
+class ItemStatsView(APIView):
+    permission_classes = [AllowAny]
+
+    def get(self, request):
+        """
+        Open, claimed, resolved, pending and rejected lost and found counts per university,
+        read from the maintained counters. '?university=<id>' limits it to one university.
+        """
+        university = request.query_params.get('university')
+        if university is not None and not university.isdigit():
+            return Response({"error": "Invalid university."}, status=status.HTTP_400_BAD_REQUEST)
+        stats = get_stats(int(university) if university is not None else None)
+        results = [dict(university=university_id, **kinds) for university_id, kinds in sorted(stats.items())]
+        return Response({"results": results}, status=status.HTTP_200_OK)
+
 class HistoryView(APIView):
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+    sections = ['posts', 'claims_made', 'claims_received']
 
     def get(self, request):
         """
         Retrieves the authenticated user's activity history.
         Includes all posts (unapproved, unresolved, resolved), claims made, and claims received.
         Posts include post_type, is_admin, detail_url, claims_url, resolve_url, approve_url.
+        Each section is paged on its own with a '<section>_cursor' parameter;
+        '?sections=posts,claims_made' limits the response to the listed sections.
         """
-        serializer = HistorySerializer({}, context={'request': request})
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        sections = request.query_params.get('sections')
+        sections = [name.strip() for name in sections.split(',') if name.strip()] if sections else self.sections
+        invalid = [name for name in sections if name not in self.sections]
+        if invalid:
+            return Response(
+                {"error": f"Invalid sections: {', '.join(invalid)}. Use {', '.join(self.sections)}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        history = {}
+        for name in sections:
+            feed, serializer_classes = getattr(self, f'get_{name}_feed')(request.user)
+            paginator = self.pagination_class()
+            paginator.cursor_query_param = f'{name}_cursor'
+            paginator.include_count = False
+            page = paginator.paginate_queryset(feed, request, view=self)
+            data = serialize_feed(page, serializer_classes, {'request': request})
+            history[name] = paginator.get_paginated_data(data)
+        return Response(history, status=status.HTTP_200_OK)
+
+    def get_posts_feed(self, user):
+        return MergedFeed(*get_item_querysets(user=user)), ITEM_SERIALIZERS
+
+    def get_claims_made_feed(self, user):
+        return MergedFeed(*get_claim_querysets({'claimant': user}, {'claimant': user})), CLAIM_SERIALIZERS
+
+    def get_claims_received_feed(self, user):
+        querysets = get_claim_querysets({'lost_item__user': user}, {'found_item__user': user})
+        return MergedFeed(*querysets), CLAIM_SERIALIZERS
 
 class MediaAccessView(APIView):
     permission_classes = [IsAuthenticated]
@@ -532,57 +776,26 @@ class MediaAccessView(APIView):
         Owners access all their posts' media; others access approved, unresolved posts' media if claimed or admin.
         """
         try:
-            media = ItemMedia.objects.get(id=pk)
-            user = request.user
-            has_access = False
-            if media.lost_item:
-                if (media.lost_item.approval_status == 'approved' and 
-                    media.lost_item.status in ['open', 'claimed']):
-                    if (
-                        media.lost_item.user == user or
-                        LostItemClaim.objects.filter(lost_item=media.lost_item, claimant=user).exists() or
-                        user.admin_level in ['app', 'university']
-                    ):
-                        has_access = True
-                elif media.lost_item.user == user:
-                    has_access = True
-            elif media.found_item:
-                if (media.found_item.approval_status == 'approved' and 
-                    media.found_item.status in ['open', 'claimed']):
-                    if (
-                        media.found_item.user == user or
-                        FoundItemClaim.objects.filter(found_item=media.found_item, claimant=user).exists() or
-                        user.admin_level in ['app', 'university']
-                    ):
-                        has_access = True
-                elif media.found_item.user == user:
-                    has_access = True
-            elif media.lost_item_claim and media.lost_item_claim.claimant == user:
-                has_access = True
-            elif media.found_item_claim and media.found_item_claim.claimant == user:
-                has_access = True
-            elif user.admin_level in ['university', 'app']:
-                has_access = True
-
-            if not has_access:
+            media = ItemMedia.objects.select_related(
+                'lost_item', 'found_item', 'lost_item_claim', 'found_item_claim'
+            ).filter(id=pk).first() or ArchivedItemMedia.objects.select_related(
+                'lost_item', 'found_item', 'lost_item_claim', 'found_item_claim'
+            ).get(id=pk)
+            if not can_access_media(media, request.user, get_claimed_items(request)):
                 return Response(
                     {"error": "You do not have permission to access this media."},
                     status=status.HTTP_403_FORBIDDEN
                 )
 
-            file_path = media.file.path
-            content_type = 'application/octet-stream'
-            if file_path.endswith(('.jpg', '.jpeg')):
-                content_type = 'image/jpeg'
-            elif file_path.endswith('.png'):
-                content_type = 'image/png'
-            elif file_path.endswith('.mp4'):
-                content_type = 'video/mp4'
-            elif file_path.endswith('.mov'):
-                content_type = 'video/quicktime'
-
-            return FileResponse(open(file_path, 'rb'), content_type=content_type)
-        except ItemMedia.DoesNotExist:
+            size = request.query_params.get('size')
+            if size is not None and size not in DERIVATIVE_SIZES:
+                return Response(
+                    {"error": f"Invalid size. Use one of: {', '.join(DERIVATIVE_SIZES)}."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            media_file = get_media_file(media, size)
+            return serve_media(request, media_file.name, media_file.storage)
+        except ArchivedItemMedia.DoesNotExist:
             return Response({"error": "Media not found."}, status=status.HTTP_404_NOT_FOUND)
         except FileNotFoundError:
             return Response({"error": "Media file not found on server."}, status=status.HTTP_404_NOT_FOUND)
\ No newline at end of file
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Place, PlaceType, PlaceMedia, PlaceUpdate
+from .models import Place, PlaceType, PlaceMedia, PlaceMediaDerivative, PlaceUpdate
 from django.core.exceptions import ValidationError
 
 @admin.register(Place)
@@ -92,6 +92,15 @@ class PlaceTypeAdmin(admin.ModelAdmin):
         super().save_model(request, obj, form, change)
 
 
+class PlaceMediaDerivativeInline(admin.TabularInline):
+    model = PlaceMediaDerivative
+    fields = ("size", "status", "file", "width", "height", "updated_at")
+    readonly_fields = fields
+    extra = 0
+    max_num = 0
+    can_delete = False
+
+
 @admin.register(PlaceMedia)
 class PlaceMediaAdmin(admin.ModelAdmin):
     list_display = ("place", "place_update", "file", "uploaded_by", "uploaded_at")
@@ -99,6 +108,7 @@ class PlaceMediaAdmin(admin.ModelAdmin):
     search_fields = ("place__name", "place_update__name", "file")
     raw_id_fields = ("place", "place_update", "uploaded_by")
     readonly_fields = ("uploaded_at",)
+    inlines = [PlaceMediaDerivativeInline]
 
 
 @admin.register(PlaceUpdate)
@@ -1,6 +1,12 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class PlacesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'places'
+
+    def ready(self):
+        from . import signals
+        post_migrate.connect(signals.restore_spatial_index, sender=self)
+        post_migrate.connect(signals.restore_search_index, sender=self)
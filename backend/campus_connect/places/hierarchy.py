@@ -0,0 +1,190 @@
+from collections import defaultdict
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.db.models import F, Q, Value
+from django.db.models.functions import Concat, Substr
+from campus_connect.response_cache import invalidate_tags
+from campus_connect.storage import remove_files
+from .models import Place, PlaceMedia, PlaceMediaDerivative, PlaceUpdate, forget_roots
+
+# Materialized paths list the ids from the root down, e.g. '/1/5/9/' for place 9
+# under 5 under root 1, so a subtree is every path starting with its root's path.
+SEPARATOR = '/'
+
+
+def get_path(pk, parent_path=None):
+    return f"{parent_path or SEPARATOR}{pk}{SEPARATOR}"
+
+
+def get_depth(path):
+    return path.count(SEPARATOR) - 2
+
+
+def get_subtree_filter(path, include_self=True):
+    """
+    Places whose path starts with `path`, as a range on the indexed column rather
+    than a LIKE: ids are digits, and '0' sorts right after the trailing '/'.
+    """
+    subtree = Q(path__gte=path, path__lt=f"{path[:-1]}0")
+    return subtree if include_self else subtree & ~Q(path=path)
+
+
+def get_descendants(place, include_self=False, max_depth=None):
+    """The subtree under `place`, down to `max_depth` levels below it when given."""
+    queryset = Place.objects.filter(get_subtree_filter(place.path, include_self))
+    if max_depth is not None:
+        queryset = queryset.filter(depth__lte=place.depth + max_depth)
+    return queryset
+
+
+def get_ancestors(place, include_self=False):
+    """The ancestor chain of `place`, root first."""
+    ids = [int(pk) for pk in place.path.strip(SEPARATOR).split(SEPARATOR) if pk]
+    if not include_self:
+        ids = ids[:-1]
+    return Place.objects.filter(pk__in=ids).order_by('depth')
+
+
+def prepare_path(place):
+    """
+    Sets the path of a place about to be saved from its parent's stored path, and
+    remembers the stored path of the place itself for move_descendants(), with its
+    stored parent and name for the cache tags of the save.
+    """
+    ids = [pk for pk in (place.pk, place.parent_id) if pk is not None]
+    rows = Place.objects.filter(pk__in=ids).order_by().values_list('pk', 'path', 'parent_id', 'name') if ids else []
+    stored = {pk: row for pk, *row in rows}
+    place._stored_path, place._stored_parent_id, place._stored_name = stored.get(place.pk, (None, None, None))
+    place._parent_path = stored.get(place.parent_id, (None,))[0]
+    if place.pk is not None:
+        place.path = get_path(place.pk, place._parent_path)
+        place.depth = get_depth(place.path)
+
+
+def move_descendants(old_path, new_path):
+    """Rewrites the paths below `old_path` to hang under `new_path`, in one UPDATE."""
+    return Place.objects.filter(get_subtree_filter(old_path, include_self=False)).update(
+        path=Concat(Value(new_path), Substr('path', len(old_path) + 1)),
+        depth=F('depth') + get_depth(new_path) - get_depth(old_path)
+    )
+
+
+def update_path(place, created):
+    """Finishes a save: a new place gets its path now that it has an id, a moved one carries its subtree along."""
+    if created:
+        place.path = get_path(place.pk, place._parent_path)
+        place.depth = get_depth(place.path)
+        Place.objects.filter(pk=place.pk).update(path=place.path, depth=place.depth)
+    elif place._stored_path and place._stored_path != place.path:
+        move_descendants(place._stored_path, place.path)
+
+
+def detach_children(place):
+    """After a delete, the children are roots (parent is SET_NULL), and their subtrees follow."""
+    if place.path:
+        move_descendants(place.path, SEPARATOR)
+
+
+def compute_paths(parents):
+    """
+    {pk: path} for {pk: parent pk}. Places in a parent cycle are never reached
+    from a root; they are left out.
+    """
+    children = defaultdict(list)
+    for pk, parent_id in parents.items():
+        children[parent_id if parent_id in parents else None].append(pk)
+    paths = {}
+    stack = [(pk, None) for pk in children[None]]
+    while stack:
+        pk, parent_path = stack.pop()
+        paths[pk] = get_path(pk, parent_path)
+        stack.extend((child, paths[pk]) for child in children[pk])
+    return paths
+
+
+def rebuild_paths(batch_size=500):
+    """
+    Recomputes every path from the parent links, e.g. after rows were written
+    without signals. Returns (updated, unreachable): the number of places whose
+    path changed and the ids of places caught in a parent cycle.
+    """
+    rows = list(Place.objects.values_list('pk', 'parent_id', 'path'))
+    paths = compute_paths({pk: parent_id for pk, parent_id, _ in rows})
+    changed = [
+        Place(pk=pk, path=paths[pk], depth=get_depth(paths[pk]))
+        for pk, _, path in rows if pk in paths and paths[pk] != path
+    ]
+    Place.objects.bulk_update(changed, ['path', 'depth'], batch_size=batch_size)
+    return len(changed), [pk for pk, _, _ in rows if pk not in paths]
+
+
+def delete_matching(queryset):
+    """
+    One DELETE of the rows matching `queryset`, bypassing the collector, which
+    would load every row and send its delete signals one at a time.
+    """
+    model = queryset.model
+    quote = connection.ops.quote_name
+    sql, params = queryset.order_by().values('pk').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {quote(model._meta.db_table)} WHERE {quote(model._meta.pk.column)} IN ({sql})", params
+        )
+        return cursor.rowcount
+
+
+def get_subtree_ids(place):
+    """Ids of `place` and every place below it, read from the parent links rather than the paths."""
+    children = defaultdict(list)
+    for pk, parent_id in Place.objects.values_list('pk', 'parent_id'):
+        children[parent_id].append(pk)
+    ids, stack = {place.pk}, [place.pk]
+    while stack:
+        for child in children[stack.pop()]:
+            if child not in ids:
+                ids.add(child)
+                stack.append(child)
+    return ids
+
+
+def delete_subtree(place, dry_run=False):
+    """
+    Deletes `place` with every place below it, their updates, media and media
+    derivatives in one DELETE per table. The files are removed in the background
+    after the transaction commits. With dry_run nothing is deleted.
+    Returns {'places': n, 'media': n}.
+    """
+    # Places written without signals, e.g. by bulk_create, are missing from the path
+    # index wherever they are in the tree. A dry run must not write, so it walks the
+    # parent links instead of reindexing.
+    unindexed = Place.objects.filter(path='').exists()
+    if unindexed and dry_run:
+        subtree = Place.objects.filter(pk__in=get_subtree_ids(place))
+    else:
+        if unindexed:
+            rebuild_paths()
+            place.refresh_from_db(fields=['path', 'depth'])
+        subtree = Place.objects.filter(get_subtree_filter(place.path))
+    updates = PlaceUpdate.objects.filter(place__in=subtree)
+    media = PlaceMedia.objects.filter(Q(place__in=subtree) | Q(place_update__in=updates))
+    derivatives = PlaceMediaDerivative.objects.filter(media__in=media)
+    with transaction.atomic():
+        place_ids = list(subtree.values_list('pk', flat=True))
+        media_names = list(media.values_list('file', flat=True))
+        counts = {'places': len(place_ids), 'media': len(media_names)}
+        if dry_run:
+            return counts
+        derivative_names = list(derivatives.exclude(file='').values_list('file', flat=True))
+
+        # Pending updates elsewhere that would move a place under this subtree lose that parent.
+        PlaceUpdate.objects.filter(parent__in=subtree).exclude(place__in=subtree).update(parent=None)
+        delete_matching(derivatives)
+        delete_matching(media)
+        delete_matching(updates)
+        delete_matching(subtree)
+        forget_roots()
+
+        invalidate_tags({'places', *(f'place:{pk}' for pk in (*place_ids, place.parent_id) if pk)})
+        remove_files(media_names)
+        remove_files(derivative_names, default_storage)
+    return counts
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from places.hierarchy import rebuild_paths
+
+class Command(BaseCommand):
+    help = 'Rebuild the materialized place paths from the parent links'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Rows per UPDATE batch')
+
+    def handle(self, *args, **options):
+        updated, unreachable = rebuild_paths(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt paths of {updated} places'))
+        if unreachable:
+            self.stdout.write(self.style.WARNING(
+                f"{len(unreachable)} places are in a parent cycle and were skipped: {unreachable}"
+            ))
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.18 on 2026-10-16 22:56
+
+import campus_connect.storage
+import django.core.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0008_placemediaderivative'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='placemedia',
+            name='file',
+            field=models.FileField(storage=campus_connect.storage.get_media_storage, upload_to='places/media/', validators=[django.core.validators.FileExtensionValidator(allowed_extensions=['jpg', 'jpeg', 'png', 'mp4', 'mov'])]),
+        ),
+    ]
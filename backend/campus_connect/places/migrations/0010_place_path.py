@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:31
+
+from django.conf import settings
+from collections import defaultdict
+from django.db import migrations, models
+
+
+def build_paths(apps, schema_editor):
+    Place = apps.get_model('places', 'Place')
+    parents = dict(Place.objects.values_list('pk', 'parent_id'))
+    children = defaultdict(list)
+    for pk, parent_id in parents.items():
+        children[parent_id if parent_id in parents else None].append(pk)
+    places = []
+    stack = [(pk, '/') for pk in children[None]]
+    while stack:
+        pk, parent_path = stack.pop()
+        path = f'{parent_path}{pk}/'
+        places.append(Place(pk=pk, path=path, depth=path.count('/') - 2))
+        stack.extend((child, path) for child in children[pk])
+    Place.objects.bulk_update(places, ['path', 'depth'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0009_media_storage'),
+        ('universities', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='place',
+            name='depth',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Number of ancestors'),
+        ),
+        migrations.AddField(
+            model_name='place',
+            name='path',
+            field=models.CharField(blank=True, editable=False, help_text='Ids from the root down to this place, e.g. /1/5/9/; maintained on save', max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name='place',
+            index=models.Index(fields=['path'], name='places_plac_path_4944d0_idx'),
+        ),
+        migrations.RunPython(build_paths, migrations.RunPython.noop),
+    ]
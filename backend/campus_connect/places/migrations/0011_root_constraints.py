@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-16 23:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0010_place_path'),
+        ('universities', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='place',
+            constraint=models.UniqueConstraint(condition=models.Q(('university_root', True)), fields=('university',), name='unique_university_root'),
+        ),
+        migrations.AddConstraint(
+            model_name='place',
+            constraint=models.UniqueConstraint(condition=models.Q(('academic_unit_root', True)), fields=('academic_unit',), name='unique_academic_unit_root'),
+        ),
+    ]
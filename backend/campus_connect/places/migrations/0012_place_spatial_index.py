@@ -0,0 +1,52 @@
+from django.db import migrations
+
+# The index as it stood at this migration, frozen here rather than imported from
+# places.spatial, which follows the live models.
+COLUMNS = ('id', 'min_latitude', 'max_latitude', 'min_longitude', 'max_longitude')
+
+
+def get_index_statements(table):
+    rtree = f'{table}_rtree'
+    has_point = "new.latitude IS NOT NULL AND new.longitude IS NOT NULL"
+    insert_new = (
+        f"INSERT INTO {rtree} SELECT new.id, new.latitude, new.latitude, new.longitude, new.longitude "
+        f"WHERE {has_point};"
+    )
+    delete_old = f"DELETE FROM {rtree} WHERE id = old.id;"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {rtree} USING rtree({', '.join(COLUMNS)})",
+        f"CREATE TRIGGER IF NOT EXISTS {rtree}_ai AFTER INSERT ON {table} BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {rtree}_ad AFTER DELETE ON {table} BEGIN {delete_old} END",
+        f"CREATE TRIGGER IF NOT EXISTS {rtree}_au AFTER UPDATE OF id, latitude, longitude ON {table} "
+        f"BEGIN {delete_old} {insert_new} END",
+        f"DELETE FROM {rtree}",
+        f"INSERT INTO {rtree} SELECT id, latitude, latitude, longitude, longitude FROM {table} "
+        f"WHERE latitude IS NOT NULL AND longitude IS NOT NULL",
+    ]
+
+
+def install_spatial_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in get_index_statements(apps.get_model('places', 'Place')._meta.db_table):
+        schema_editor.execute(statement)
+
+
+def uninstall_spatial_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    rtree = f"{apps.get_model('places', 'Place')._meta.db_table}_rtree"
+    for suffix in ('_ai', '_ad', '_au'):
+        schema_editor.execute(f"DROP TRIGGER IF EXISTS {rtree}{suffix}")
+    schema_editor.execute(f"DROP TABLE IF EXISTS {rtree}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0011_root_constraints'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_spatial_index, uninstall_spatial_index),
+    ]
@@ -0,0 +1,92 @@
+from django.db import migrations
+
+# The index as it stood at this migration, frozen here rather than imported from
+# places.search, which follows the live models.
+COLUMNS = {
+    'name': 'p.name',
+    'description': 'p.description',
+    'relative_location': 'p.relative_location',
+    'place_type': 't.name',
+    'academic_unit': 'a.name',
+    'academic_unit_short_name': 'a.short_name',
+    'university': 'u.name',
+    'university_short_name': 'u.short_name',
+}
+TRIGGER_SUFFIXES = ('_ai', '_ad', '_au', '_type_au', '_unit_au', '_university_au')
+
+
+def get_tables(apps):
+    return [
+        apps.get_model(app_label, name)._meta.db_table
+        for app_label, name in [
+            ('places', 'Place'), ('places', 'PlaceType'), ('universities', 'AcademicUnit'), ('universities', 'University'),
+        ]
+    ]
+
+
+def get_index_statements(apps):
+    table, type_table, unit_table, university_table = get_tables(apps)
+    fts = f'{table}_fts'
+    columns = ', '.join(COLUMNS)
+
+    def source(condition):
+        return (
+            f"SELECT p.id, {', '.join(COLUMNS.values())} FROM {table} p "
+            f"LEFT JOIN {type_table} t ON t.id = p.place_type_id "
+            f"LEFT JOIN {unit_table} a ON a.id = p.academic_unit_id "
+            f"LEFT JOIN {university_table} u ON u.id = p.university_id "
+            f"WHERE {condition}"
+        )
+
+    def reindex(condition):
+        return (
+            f"DELETE FROM {fts} WHERE rowid IN (SELECT id FROM {table} p WHERE {condition}); "
+            f"INSERT INTO {fts}(rowid, {columns}) {source(condition)};"
+        )
+
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({columns}, tokenize='trigram')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} "
+        f"BEGIN INSERT INTO {fts}(rowid, {columns}) {source('p.id = new.id')}; END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} "
+        f"BEGIN DELETE FROM {fts} WHERE rowid = old.id; END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF name, description, relative_location, "
+        f"place_type_id, academic_unit_id, university_id ON {table} "
+        f"BEGIN DELETE FROM {fts} WHERE rowid = old.id; INSERT INTO {fts}(rowid, {columns}) "
+        f"{source('p.id = new.id')}; END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_type_au AFTER UPDATE OF name ON {type_table} "
+        f"BEGIN {reindex('p.place_type_id = new.id')} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_unit_au AFTER UPDATE OF name, short_name ON {unit_table} "
+        f"BEGIN {reindex('p.academic_unit_id = new.id')} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_university_au AFTER UPDATE OF name, short_name "
+        f"ON {university_table} BEGIN {reindex('p.university_id = new.id')} END",
+        f"DELETE FROM {fts}",
+        f"INSERT INTO {fts}(rowid, {columns}) {source('1')}",
+    ]
+
+
+def install_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in get_index_statements(apps):
+        schema_editor.execute(statement)
+
+
+def uninstall_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    fts = f"{apps.get_model('places', 'Place')._meta.db_table}_fts"
+    for suffix in TRIGGER_SUFFIXES:
+        schema_editor.execute(f"DROP TRIGGER IF EXISTS {fts}{suffix}")
+    schema_editor.execute(f"DROP TABLE IF EXISTS {fts}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('places', '0012_place_spatial_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
@@ -1,5 +1,7 @@
 from django.db import models, transaction
 from django.conf import settings
+from campus_connect.derivatives import DERIVATIVE_SIZE_CHOICES, DERIVATIVE_STATUS_CHOICES
+from campus_connect.storage import get_media_storage
 from django.core.validators import FileExtensionValidator
 from universities.models import University, AcademicUnit
 from django.utils.translation import gettext_lazy as _
@@ -24,6 +26,60 @@ class PlaceType(models.Model):
         self.name = self.name.strip().lower()
         super().save(*args, **kwargs)
 
+def get_root_memo():
+    """
+    Root lookups shared by the saves of one transaction, so a batch looks each
+    university and academic unit up once. The memo is tied to the connection's
+    list of on-commit hooks, which Django replaces on every commit, rollback and
+    savepoint rollback, so nothing survives the transaction it was read in.
+    Outside a transaction every call starts empty.
+    """
+    connection = transaction.get_connection()
+    if not connection.in_atomic_block:
+        return {}
+    memo = getattr(connection, '_place_root_memo', None)
+    if memo is None or memo[0] is not connection.run_on_commit:
+        memo = connection._place_root_memo = (connection.run_on_commit, {})
+    return memo[1]
+
+
+def forget_roots():
+    """Drops the memo after places were deleted in bulk."""
+    get_root_memo().clear()
+
+
+def get_root(field, value, exclude_pk=None):
+    """(pk, name) of the place with `field`_root set for this university or academic unit, or None."""
+    memo = get_root_memo()
+    key = (field, value)
+    if key not in memo:
+        memo[key] = Place.objects.filter(**{field: value, f'{field}_root': True}).values_list('pk', 'name').first()
+    root = memo[key]
+    return None if root is None or root[0] == exclude_pk else root
+
+
+def get_academic_unit_university_id(instance):
+    """The university id of an instance's academic unit, without loading the unit when it is not loaded yet."""
+    field = instance._meta.get_field('academic_unit')
+    if field.is_cached(instance):
+        return instance.academic_unit.university_id
+    memo = get_root_memo()
+    key = ('academic_unit_university', instance.academic_unit_id)
+    if key not in memo:
+        memo[key] = AcademicUnit.objects.filter(pk=instance.academic_unit_id).values_list('university_id', flat=True).first()
+    return memo[key]
+
+
+def remember_roots(place):
+    """Records a saved place in the memo, as a new root or as a root that no longer is one."""
+    memo = get_root_memo()
+    for field, value in (('university', place.university_id), ('academic_unit', place.academic_unit_id)):
+        key = (field, value)
+        if getattr(place, f'{field}_root'):
+            memo[key] = (place.pk, place.name)
+        elif key in memo and memo[key] and memo[key][0] == place.pk:
+            del memo[key]
+
 class Place(models.Model):
     university = models.ForeignKey(
         University,
@@ -93,10 +149,18 @@ class Place(models.Model):
         default=False,
         help_text="Indicates if this place is the root of an academic unit subtree"
     )
+    path = models.CharField(
+        max_length=255,
+        blank=True,
+        editable=False,
+        help_text="Ids from the root down to this place, e.g. /1/5/9/; maintained on save"
+    )
+    depth = models.PositiveIntegerField(default=0, editable=False, help_text="Number of ancestors")
 
     class Meta:
         ordering = ['name']
         indexes = [
+            models.Index(fields=['path']),
             models.Index(fields=['university', 'name']),
             models.Index(fields=['place_type']),
             models.Index(fields=['parent']),
@@ -105,6 +169,14 @@ class Place(models.Model):
             models.Index(fields=['university_root']),
             models.Index(fields=['academic_unit_root']),
         ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['university'], condition=models.Q(university_root=True), name='unique_university_root'
+            ),
+            models.UniqueConstraint(
+                fields=['academic_unit'], condition=models.Q(academic_unit_root=True), name='unique_academic_unit_root'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.university.name})"
@@ -115,72 +187,71 @@ class Place(models.Model):
             raise ValidationError("Establishment year cannot be in the future.")
 
         # Validate academic unit
-        if self.academic_unit and self.academic_unit.university != self.university:
+        if self.academic_unit_id and get_academic_unit_university_id(self) != self.university_id:
             raise ValidationError("Academic unit must belong to the selected university.")
 
         # Prevent self-referential parent
-        if self.parent and self.parent == self:
+        if self.parent_id and self.parent_id == self.pk:
             raise ValidationError("A place cannot be its own parent.")
 
+        # Prevent cycles: the new parent must not lie in this place's subtree
+        if self.pk and self.parent and f"/{self.pk}/" in self.parent.path:
+            raise ValidationError("A place cannot be moved under one of its own descendants.")
+
         # Validate parent university
-        if self.parent and self.parent.university != self.university:
+        if self.parent and self.parent.university_id != self.university_id:
             raise ValidationError("Parent place must belong to the same university.")
 
         # Validate university_root
         if self.university_root:
-            if self.parent:
+            if self.parent_id:
                 raise ValidationError({
                     'university_root': "A university root place cannot have a parent."
                 })
-            if self.academic_unit:
+            if self.academic_unit_id:
                 raise ValidationError({
                     'university_root': "A university root place cannot have an academic unit."
                 })
-            existing_root = Place.objects.filter(
-                university=self.university, university_root=True
-            ).exclude(pk=self.pk).first()
+            existing_root = get_root('university', self.university_id, exclude_pk=self.pk)
             if existing_root:
                 raise ValidationError({
                     'university_root': f"A university root is already set for {self.university.name}. "
-                                      f"Existing root: ID={existing_root.id}, Name={existing_root.name}. "
+                                      f"Existing root: ID={existing_root[0]}, Name={existing_root[1]}. "
                                       "Cannot register a new root place."
                 })
 
         # Validate academic_unit_root
         if self.academic_unit_root:
-            if not self.academic_unit:
+            if not self.academic_unit_id:
                 raise ValidationError({
                     'academic_unit_root': "An academic unit root place must have an academic unit."
                 })
-            if self.parent and self.parent.university != self.university:
+            if self.parent and self.parent.university_id != self.university_id:
                 raise ValidationError({
                     'academic_unit_root': "An academic unit root place must have a parent in the same university."
                 })
-            existing_academic_root = Place.objects.filter(
-                academic_unit=self.academic_unit, academic_unit_root=True
-            ).exclude(pk=self.pk).first()
+            existing_academic_root = get_root('academic_unit', self.academic_unit_id, exclude_pk=self.pk)
             if existing_academic_root:
                 raise ValidationError({
                     'academic_unit_root': f"An academic unit root is already set for {self.academic_unit.name}. "
-                                         f"Existing root: ID={existing_academic_root.id}, Name={existing_academic_root.name}. "
+                                         f"Existing root: ID={existing_academic_root[0]}, Name={existing_academic_root[1]}. "
                                          "Cannot register a new root place."
                 })
 
         # Ensure non-root places have a parent if a university root exists
         if not self.university_root and not self.parent:
-            existing_root = Place.objects.filter(
-                university=self.university, university_root=True
-            ).first()
+            existing_root = get_root('university', self.university_id)
             if existing_root:
                 raise ValidationError({
                     'parent': f"All non-root places must have a parent. University root exists: "
-                              f"ID={existing_root.id}, Name={existing_root.name}."
+                              f"ID={existing_root[0]}, Name={existing_root[1]}."
                 })
 
     def save(self, *args, **kwargs):
         with transaction.atomic():
             self.clean()
             super().save(*args, **kwargs)
+            remember_roots(self)
 
 class PlaceMedia(models.Model):
     place = models.ForeignKey(
@@ -199,6 +270,7 @@ class PlaceMedia(models.Model):
     )
     file = models.FileField(
         upload_to='places/media/',
+        storage=get_media_storage,
         validators=[FileExtensionValidator(allowed_extensions=['jpg', 'jpeg', 'png', 'mp4', 'mov'])]
     )
     uploaded_at = models.DateTimeField(auto_now_add=True)
@@ -221,6 +293,27 @@ class PlaceMedia(models.Model):
             return f"Media for {self.place.name}"
         return f"Media for Place Update"
 
+class PlaceMediaDerivative(models.Model):
+    """A scaled-down copy of a place media image, rendered after upload."""
+    media = models.ForeignKey(
+        PlaceMedia,
+        on_delete=models.CASCADE,
+        related_name='derivatives'
+    )
+    size = models.CharField(max_length=10, choices=DERIVATIVE_SIZE_CHOICES)
+    status = models.CharField(max_length=10, choices=DERIVATIVE_STATUS_CHOICES, default='pending')
+    file = models.FileField(upload_to='places/media/derivatives/', blank=True)
+    width = models.PositiveIntegerField(null=True, blank=True)
+    height = models.PositiveIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['media', 'size']
+
+    def __str__(self):
+        return f"{self.get_size_display()} of {self.media_id} ({self.status})"
+
 class PlaceUpdate(models.Model):
     place = models.ForeignKey(
         Place,
@@ -302,58 +395,52 @@ class PlaceUpdate(models.Model):
         if self.establishment_year and self.establishment_year > timezone.now().year:
             raise ValidationError("Establishment year cannot be in the future.")
 
-        if self.academic_unit and self.academic_unit.university != self.university:
+        if self.academic_unit_id and get_academic_unit_university_id(self) != self.university_id:
             raise ValidationError("Academic unit must belong to the selected university.")
 
-        if self.parent and self.parent.university != self.university:
+        if self.parent and self.parent.university_id != self.university_id:
             raise ValidationError("Parent place must belong to the same university.")
 
         if self.university_root:
-            if self.parent:
+            if self.parent_id:
                 raise ValidationError({
                     'university_root': "A university root place cannot have a parent."
                 })
-            if self.academic_unit:
+            if self.academic_unit_id:
                 raise ValidationError({
                     'university_root': "A university root place cannot have an academic unit."
                 })
-            existing_root = Place.objects.filter(
-                university=self.university, university_root=True
-            ).exclude(pk=self.place.pk).first()
+            existing_root = get_root('university', self.university_id, exclude_pk=self.place_id)
             if existing_root:
                 raise ValidationError({
                     'university_root': f"A university root is already set for {self.university.name}. "
-                                      f"Existing root: ID={existing_root.id}, Name={existing_root.name}. "
+                                      f"Existing root: ID={existing_root[0]}, Name={existing_root[1]}. "
                                       "Cannot register a new root place."
                 })
 
         if self.academic_unit_root:
-            if not self.academic_unit:
+            if not self.academic_unit_id:
                 raise ValidationError({
                     'academic_unit_root': "An academic unit root place must have an academic unit."
                 })
-            if self.parent and self.parent.university != self.university:
+            if self.parent and self.parent.university_id != self.university_id:
                 raise ValidationError({
                     'academic_unit_root': "An academic unit root place must have a parent in the same university."
                 })
-            existing_academic_root = Place.objects.filter(
-                academic_unit=self.academic_unit, academic_unit_root=True
-            ).exclude(pk=self.place.pk).first()
+            existing_academic_root = get_root('academic_unit', self.academic_unit_id, exclude_pk=self.place_id)
             if existing_academic_root:
                 raise ValidationError({
                     'academic_unit_root': f"An academic unit root is already set for {self.academic_unit.name}. "
-                                         f"Existing root: ID={existing_academic_root.id}, Name={existing_academic_root.name}. "
+                                         f"Existing root: ID={existing_academic_root[0]}, Name={existing_academic_root[1]}. "
                                          "Cannot register a new root place."
                 })
 
         if not self.university_root and not self.parent:
-            existing_root = Place.objects.filter(
-                university=self.university, university_root=True
-            ).first()
+            existing_root = get_root('university', self.university_id)
             if existing_root:
                 raise ValidationError({
                     'parent': f"All non-root places must have a parent. University root exists: "
-                              f"ID={existing_root.id}, Name={existing_root.name}."
+                              f"ID={existing_root[0]}, Name={existing_root[1]}."
                 })
 
     def save(self, *args, **kwargs):
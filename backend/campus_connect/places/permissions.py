@@ -17,4 +17,15 @@ class UniversityAdminPermission(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         if request.user.admin_level == 'app':
             return True
-        return request.user.admin_level == 'university' and obj.university == request.user.university
\ No newline at end of file
+        return request.user.admin_level == 'university' and obj.university == request.user.university
+
+
+def can_access_place_media(media, user):
+    """Media of approved places and updates is public; pending update media is limited to its author and admins."""
+    if media.place_id and media.place.approval_status != 'approved':
+        return False
+    if media.place_update_id and media.place_update.approval_status != 'approved':
+        return user.is_authenticated and (
+            media.place_update.updated_by_id == user.pk or user.admin_level in ['university', 'app']
+        )
+    return True
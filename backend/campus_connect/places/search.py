@@ -0,0 +1,247 @@
+import difflib
+import re
+from functools import reduce
+from operator import or_
+from django.db import connections
+from django.db.models import Count, Q
+from django.db.models.expressions import RawSQL
+from campus_connect.virtual_tables import FullTextResults, drop, install_missing
+from universities.models import AcademicUnit, University
+from .models import Place, PlaceType
+
+# Indexed columns, with the SQL reading each from a place joined to its type, unit
+# and university, and the lookup used where the index cannot answer.
+SEARCH_COLUMNS = {
+    'name': ('p.name', 'name'),
+    'description': ('p.description', 'description'),
+    'relative_location': ('p.relative_location', 'relative_location'),
+    'place_type': ('t.name', 'place_type__name'),
+    'academic_unit': ('a.name', 'academic_unit__name'),
+    'academic_unit_short_name': ('a.short_name', 'academic_unit__short_name'),
+    'university': ('u.name', 'university__name'),
+    'university_short_name': ('u.short_name', 'university__short_name'),
+}
+# bm25() column weights, in SEARCH_COLUMNS order.
+BM25_WEIGHTS = (10.0, 1.0, 3.0, 4.0, 3.0, 3.0, 2.0, 2.0)
+# Columns ?name= matches: the place name and the short names of its unit and university.
+NAME_COLUMNS = ('name', 'academic_unit_short_name', 'university_short_name')
+# The trigram index finds substrings of at least this many characters; shorter ones fall back to icontains.
+MIN_TRIGRAM_LENGTH = 3
+MAX_TERMS = 16
+TRIGGER_SUFFIXES = ('_ai', '_ad', '_au', '_type_au', '_unit_au', '_university_au')
+# Typo tolerance: how many places sharing trigrams with the query are compared
+# word by word, and how close (a difflib ratio) every term must come to a word.
+FUZZY_CANDIDATES = 200
+FUZZY_CUTOFF = 0.75
+WORD_RE = re.compile(r'\w+')
+
+
+def get_fts_table():
+    return f'{Place._meta.db_table}_fts'
+
+
+def get_source_sql(condition):
+    """SELECT of the id and the SEARCH_COLUMNS of the places matching `condition`, aliased p."""
+    columns = ', '.join(source for source, _ in SEARCH_COLUMNS.values())
+    return (
+        f"SELECT p.id, {columns} FROM {Place._meta.db_table} p "
+        f"LEFT JOIN {PlaceType._meta.db_table} t ON t.id = p.place_type_id "
+        f"LEFT JOIN {AcademicUnit._meta.db_table} a ON a.id = p.academic_unit_id "
+        f"LEFT JOIN {University._meta.db_table} u ON u.id = p.university_id "
+        f"WHERE {condition}"
+    )
+
+
+def get_index_statements():
+    """
+    SQL for an FTS5 trigram table holding the SEARCH_COLUMNS of every place, plus
+    the triggers that keep it in step with places and with renames of the place
+    types, academic units and universities whose names it copies.
+    """
+    table, fts = Place._meta.db_table, get_fts_table()
+    columns = ', '.join(SEARCH_COLUMNS)
+
+    def reindex(condition):
+        return (
+            f"DELETE FROM {fts} WHERE rowid IN (SELECT id FROM {table} p WHERE {condition}); "
+            f"INSERT INTO {fts}(rowid, {columns}) {get_source_sql(condition)};"
+        )
+
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({columns}, tokenize='trigram')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} "
+        f"BEGIN INSERT INTO {fts}(rowid, {columns}) {get_source_sql('p.id = new.id')}; END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} "
+        f"BEGIN DELETE FROM {fts} WHERE rowid = old.id; END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF name, description, relative_location, "
+        f"place_type_id, academic_unit_id, university_id ON {table} "
+        f"BEGIN DELETE FROM {fts} WHERE rowid = old.id; INSERT INTO {fts}(rowid, {columns}) "
+        f"{get_source_sql('p.id = new.id')}; END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_type_au AFTER UPDATE OF name ON {PlaceType._meta.db_table} "
+        f"BEGIN {reindex('p.place_type_id = new.id')} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_unit_au AFTER UPDATE OF name, short_name ON {AcademicUnit._meta.db_table} "
+        f"BEGIN {reindex('p.academic_unit_id = new.id')} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_university_au AFTER UPDATE OF name, short_name "
+        f"ON {University._meta.db_table} BEGIN {reindex('p.university_id = new.id')} END",
+    ]
+
+
+def get_trigger_names():
+    fts = get_fts_table()
+    return [f'{fts}{suffix}' for suffix in TRIGGER_SUFFIXES]
+
+
+def fts_available(using='default'):
+    return connections[using].vendor == 'sqlite'
+
+
+def install_search_index(using='default'):
+    """
+    Creates the trigram table and its triggers where they are missing and refills
+    the table if anything was. Does nothing on other backends, which use the
+    icontains fallback.
+    """
+    if not fts_available(using):
+        return
+    fts = get_fts_table()
+    statements = [
+        *get_index_statements(),
+        f"DELETE FROM {fts}",
+        f"INSERT INTO {fts}(rowid, {', '.join(SEARCH_COLUMNS)}) {get_source_sql('1')}",
+    ]
+    install_missing(using, fts, get_trigger_names(), statements)
+
+
+def uninstall_search_index(using='default'):
+    if not fts_available(using):
+        return
+    drop(using, get_fts_table(), get_trigger_names())
+
+
+def parse_query(text):
+    """The whitespace-separated terms of a general query, which the typo-tolerant retry matches one by one."""
+    return text.split()[:MAX_TERMS]
+
+
+def quote(text):
+    """A string for a MATCH expression; a trigram string matches wherever it occurs as a substring."""
+    return '"' + text.replace('"', '""') + '"'
+
+
+def get_substring_filter(text, columns):
+    """Places with `text` in one of `columns`, through the column lookups."""
+    return reduce(or_, (Q(**{f'{SEARCH_COLUMNS[column][1]}__icontains': text}) for column in columns))
+
+
+class PlaceSearch:
+    """
+    Conditions that each require some text to appear in some of the SEARCH_COLUMNS.
+    Text long enough for trigrams becomes part of one MATCH expression; shorter
+    text, and all of it off SQLite, becomes an icontains filter instead.
+    """
+    def __init__(self, queryset):
+        self.queryset = queryset
+        self.use_index = fts_available(queryset.db)
+        self.expressions = []
+        self.terms = []
+
+    def require(self, text, columns=None):
+        if not self.use_index or len(text) < MIN_TRIGRAM_LENGTH:
+            self.queryset = self.queryset.filter(get_substring_filter(text, columns or SEARCH_COLUMNS))
+        elif columns:
+            self.expressions.append(f"{{{' '.join(columns)}}} : {quote(text)}")
+        else:
+            self.expressions.append(quote(text))
+
+    def require_query(self, text):
+        """
+        A general query: the whole phrase must appear in one column, as ?raw_query=
+        has always matched. Its terms are kept for the typo-tolerant retry.
+        """
+        self.terms = parse_query(text)
+        self.require(' '.join(text.split()))
+
+    def run(self):
+        """
+        (results, matches): results for the paginator, best first, and a queryset of
+        the same places to count facets on. A general query whose phrase matches
+        nothing is retried term by term with typo tolerance, each term in any column.
+        """
+        if not self.expressions:
+            return self.queryset, self.queryset
+        results = SearchResults(' AND '.join(self.expressions), self.queryset)
+        if results.count() or not self.terms:
+            return results, results.matches(self.queryset)
+        places = search_similar(self.terms, self.queryset)
+        return places, self.queryset.filter(pk__in=[place.pk for place in places])
+
+
+class SearchResults(FullTextResults):
+    """Places of one queryset matching an FTS5 query against the trigram table."""
+    weights = BM25_WEIGHTS
+
+    def get_fts_table(self, model):
+        return get_fts_table()
+
+
+def get_trigrams(term):
+    term = term.lower()
+    return {term[index:index + MIN_TRIGRAM_LENGTH] for index in range(len(term) - MIN_TRIGRAM_LENGTH + 1)}
+
+
+def get_similarity(term, words):
+    """How close `term` comes to the nearest of `words`, from 0 to 1."""
+    term = term.lower()
+    return max((difflib.SequenceMatcher(None, term, word).ratio() for word in words), default=0)
+
+
+def search_similar(terms, queryset):
+    """
+    Places of `queryset` with a word close to every term, for queries with a typo.
+    The index narrows the search to the FUZZY_CANDIDATES places sharing the most
+    trigrams with the terms; those are compared word by word and kept when every
+    term comes within FUZZY_CUTOFF of one of their words, closest first.
+    """
+    terms = [term for term in terms if len(term) >= MIN_TRIGRAM_LENGTH]
+    if not terms:
+        return []
+    fts = get_fts_table()
+    match = ' AND '.join(
+        '(' + ' OR '.join(quote(trigram) for trigram in sorted(get_trigrams(term))) + ')' for term in terms
+    )
+    weights = ', '.join(str(weight) for weight in BM25_WEIGHTS)
+    hits = RawSQL(f"SELECT rowid FROM {fts} WHERE {fts} MATCH %s", [match])
+    sql, params = queryset.filter(pk__in=hits).order_by().values('id').query.sql_with_params()
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid, {', '.join(SEARCH_COLUMNS)} FROM {fts} WHERE {fts} MATCH %s AND rowid IN ({sql}) "
+            f"ORDER BY bm25({fts}, {weights}), rowid LIMIT %s",
+            [match, *params, FUZZY_CANDIDATES]
+        )
+        rows = cursor.fetchall()
+    scored = []
+    for rank, (pk, *texts) in enumerate(rows):
+        words = WORD_RE.findall(' '.join(text for text in texts if text).lower())
+        similarities = [get_similarity(term, words) for term in terms]
+        if min(similarities) >= FUZZY_CUTOFF:
+            scored.append((-sum(similarities), rank, pk))
+    ids = [pk for _, _, pk in sorted(scored)]
+    places = queryset.in_bulk(ids)
+    return [places[pk] for pk in ids if pk in places]
+
+
+def count_by(queryset, field):
+    rows = (
+        queryset.order_by().exclude(**{f'{field}__isnull': True})
+        .values(field).annotate(count=Count('id')).order_by('-count', field)
+    )
+    return [{'name': row[field], 'count': row['count']} for row in rows]
+
+
+def get_facets(queryset):
+    """Counts of the matching places by university, place type and academic unit, named as the filters take them."""
+    return {
+        'university': count_by(queryset, 'university__name'),
+        'place_type': count_by(queryset, 'place_type__name'),
+        'academic_unit': count_by(queryset, 'academic_unit__name'),
+    }
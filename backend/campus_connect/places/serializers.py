@@ -1,8 +1,13 @@
 from rest_framework import serializers
-from .models import Place, PlaceType, PlaceMedia, PlaceUpdate
+from .models import Place, PlaceType, PlaceMedia, PlaceMediaDerivative, PlaceUpdate
 from universities.models import University, AcademicUnit
 from accounts.serializers import SimpleUserSerializer
-from django.urls import reverse
+from campus_connect.links import get_link_builder
+from campus_connect.media import signed_media_url
+from campus_connect.derivatives import get_media_file, schedule_derivatives
+from campus_connect.uploads import UploadSessionListField, commit_sessions
+from .permissions import can_access_place_media
+from django.db import models, transaction
 from django.utils import timezone
 from django.core.exceptions import ValidationError as DjangoValidationError
 import logging
@@ -15,40 +20,65 @@ class PlaceTypeSerializer(serializers.ModelSerializer):
         fields = ['id', 'name']
 
 class PlaceSearchSerializer(serializers.Serializer):
+    # Parameters read by the paginator; anything else unknown is a general query, e.g. ?library.
+    PAGINATION_PARAMS = ('limit', 'offset')
+    # Text searched for within places; a general query cannot be combined with these.
+    TEXT_FIELDS = ('name', 'relative_location')
+
     university = serializers.CharField(required=False)
     place_type = serializers.CharField(required=False)
     name = serializers.CharField(required=False)
     relative_location = serializers.CharField(required=False)
     academic_unit = serializers.CharField(required=False)
+    raw_query = serializers.CharField(required=False)
+
+    def get_raw_query(self, data):
+        """?raw_query=, or else the first parameter the serializer does not know: its value, or its name if it has none."""
+        if data.get('raw_query'):
+            return data['raw_query']
+        for key, value in self.initial_data.items():
+            if key not in self.fields and key not in self.PAGINATION_PARAMS:
+                return value or key
+        return None
 
     def validate(self, data):
-        request = self.context.get('request')
-        query_string = request.META.get('QUERY_STRING', '') if request else ''
-        
-        # Extract raw query (unnamed query string)
-        raw_query = None
-        if query_string:
-            # Remove known parameters
-            specific_fields = ['university', 'place_type', 'name', 'relative_location', 'academic_unit']
-            query_parts = query_string.split('&')
-            for part in query_parts:
-                if '=' not in part or part.split('=')[0] not in specific_fields:
-                    raw_query = part.split('=')[-1] if '=' in part else part
-                    break
-        
-        # Store raw query in validated data
-        data['raw_query'] = raw_query if raw_query else None
+        data['raw_query'] = (self.get_raw_query(data) or '').strip() or None
         logger.debug(f"Raw query extracted: {data['raw_query']}")
 
-        # Prevent mixing raw query with specific fields
-        has_specific_fields = any(data.get(field) for field in ['university', 'place_type', 'name', 'relative_location', 'academic_unit'])
-        if raw_query and has_specific_fields:
+        # University, place type and academic unit narrow a general query; other fields would compete with it.
+        if data['raw_query'] and any(data.get(field) for field in self.TEXT_FIELDS):
             raise serializers.ValidationError({
-                'non_field_errors': 'Cannot use general search with specific fields (university, place_type, name, relative_location, academic_unit).'
+                'non_field_errors': 'Cannot use general search with specific text fields (name, relative_location).'
             })
-        
+
         return data
 
+class PlaceTreeSerializer(serializers.Serializer):
+    university = serializers.IntegerField()
+    depth = serializers.IntegerField(required=False, min_value=0)
+
+class PlaceNearbySerializer(serializers.Serializer):
+    lat = serializers.FloatField(min_value=-90, max_value=90)
+    lng = serializers.FloatField(min_value=-180, max_value=180)
+    radius = serializers.FloatField(required=False, default=1000, min_value=1, max_value=50000, help_text="Metres")
+    type = serializers.CharField(required=False)
+    limit = serializers.IntegerField(required=False, default=20, min_value=1, max_value=100)
+
+def link_neighbours(media):
+    """
+    Sets previous_media_id and next_media_id on each media of a list holding a
+    whole place's or update's media in upload order, without a query.
+    """
+    for index, item in enumerate(media):
+        item.previous_media_id = media[index - 1].pk if index > 0 else None
+        item.next_media_id = media[index + 1].pk if index + 1 < len(media) else None
+
+class PlaceMediaListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        media = list(data.all() if isinstance(data, models.manager.BaseManager) else data)
+        link_neighbours(media)
+        return super().to_representation(media)
+
 class PlaceMediaSerializer(serializers.ModelSerializer):
     file_url = serializers.SerializerMethodField()
     next_media_url = serializers.SerializerMethodField()
@@ -58,44 +88,38 @@ class PlaceMediaSerializer(serializers.ModelSerializer):
         model = PlaceMedia
         fields = ['id', 'file_url', 'uploaded_at', 'next_media_url', 'previous_media_url']
         read_only_fields = ['uploaded_at']
+        list_serializer_class = PlaceMediaListSerializer
 
     def get_file_url(self, obj):
+        """Lists link to thumbnails, single objects to the original."""
         request = self.context.get('request')
         if request is None:
             return None
-        return request.build_absolute_uri(reverse('places:media-access', kwargs={'pk': obj.id}))
-
-    def get_next_media_url(self, obj):
+        size = 'thumb' if isinstance(self.root, serializers.ListSerializer) else None
+        if can_access_place_media(obj, request.user):
+            return signed_media_url(request, get_media_file(obj, size).name)
+        url = get_link_builder(request).url('places:media-access', obj.id)
+        return f"{url}?size={size}" if size else url
+
+    def get_neighbour_url(self, obj, attribute):
+        """Reads the neighbour linked by the list serializer; a single media loads its siblings' ids once."""
         request = self.context.get('request')
         if request is None:
             return None
-        if obj.place:
-            next_media = PlaceMedia.objects.filter(
-                place=obj.place, uploaded_at__gt=obj.uploaded_at
-            ).order_by('uploaded_at').first()
-        else:
-            next_media = PlaceMedia.objects.filter(
-                place_update=obj.place_update, uploaded_at__gt=obj.uploaded_at
-            ).order_by('uploaded_at').first()
-        if next_media:
-            return request.build_absolute_uri(reverse('places:media-access', kwargs={'pk': next_media.id}))
-        return None
+        if not hasattr(obj, attribute):
+            siblings = PlaceMedia.objects.filter(place_id=obj.place_id, place_update_id=obj.place_update_id)
+            ids = list(siblings.order_by('uploaded_at', 'id').values_list('id', flat=True))
+            index = ids.index(obj.pk)
+            obj.previous_media_id = ids[index - 1] if index > 0 else None
+            obj.next_media_id = ids[index + 1] if index + 1 < len(ids) else None
+        pk = getattr(obj, attribute)
+        return get_link_builder(request).url('places:media-access', pk) if pk else None
+
+    def get_next_media_url(self, obj):
+        return self.get_neighbour_url(obj, 'next_media_id')
 
     def get_previous_media_url(self, obj):
-        request = self.context.get('request')
-        if request is None:
-            return None
-        if obj.place:
-            previous_media = PlaceMedia.objects.filter(
-                place=obj.place, uploaded_at__lt=obj.uploaded_at
-            ).order_by('-uploaded_at').first()
-        else:
-            previous_media = PlaceMedia.objects.filter(
-                place_update=obj.place_update, uploaded_at__lt=obj.uploaded_at
-            ).order_by('-uploaded_at').first()
-        if previous_media:
-            return request.build_absolute_uri(reverse('places:media-access', kwargs={'pk': previous_media.id}))
-        return None
+        return self.get_neighbour_url(obj, 'previous_media_id')
 
 class SimplePlaceSerializer(serializers.ModelSerializer):
     detail_url = serializers.SerializerMethodField()
@@ -108,7 +132,7 @@ class SimplePlaceSerializer(serializers.ModelSerializer):
         request = self.context.get('request')
         if request is None:
             return None
-        return request.build_absolute_uri(reverse('places:place-detail', kwargs={'pk': obj.pk}))
+        return get_link_builder(request).url('places:place-detail', obj.pk)
 
 class PlaceSerializer(serializers.ModelSerializer):
     university = serializers.PrimaryKeyRelatedField(queryset=University.objects.all())
@@ -121,6 +145,11 @@ class PlaceSerializer(serializers.ModelSerializer):
         required=False,
         max_length=5
     )
+    upload_ids = UploadSessionListField(
+        write_only=True,
+        required=False,
+        max_length=5
+    )
     media = PlaceMediaSerializer(many=True, read_only=True)
     parent_data = SimplePlaceSerializer(source='parent', read_only=True)
     children = SimplePlaceSerializer(many=True, read_only=True)
@@ -132,7 +161,7 @@ class PlaceSerializer(serializers.ModelSerializer):
             'id', 'university', 'academic_unit', 'parent', 'parent_data', 'children',
             'name', 'description', 'history', 'establishment_year', 'place_type',
             'relative_location', 'latitude', 'longitude', 'maps_link', 'created_at',
-            'updated_at', 'created_by', 'media', 'media_files', 'approval_status',
+            'updated_at', 'created_by', 'media', 'media_files', 'upload_ids', 'approval_status',
             'university_root', 'academic_unit_root'
         ]
         read_only_fields = ['created_at', 'updated_at', 'created_by', 'approval_status']
@@ -183,24 +212,28 @@ class PlaceSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         media_files = validated_data.pop('media_files', [])
+        upload_sessions = validated_data.pop('upload_ids', [])
         logger.debug(f"Received media files: {media_files}")
         validated_data.pop('created_by', None)
         try:
-            place = Place.objects.create(created_by=self.context['request'].user, **validated_data)
-            for file in media_files:
-                try:
-                    logger.debug(f"Creating PlaceMedia for file: {file}")
-                    PlaceMedia.objects.create(
-                        place=place,
-                        file=file,
-                        uploaded_by=self.context['request'].user
-                    )
-                except DjangoValidationError as e:
-                    logger.error(f"Failed to create PlaceMedia: {str(e)}")
-                    raise serializers.ValidationError(f"Invalid media file: {str(e)}")
-                except Exception as e:
-                    logger.error(f"Unexpected error creating PlaceMedia: {str(e)}")
-                    raise serializers.ValidationError(f"Error saving media file: {str(e)}")
+            file_field = PlaceMedia._meta.get_field('file')
+            with commit_sessions(upload_sessions, file_field) as names, transaction.atomic():
+                place = Place.objects.create(created_by=self.context['request'].user, **validated_data)
+                for file in [*media_files, *names]:
+                    try:
+                        logger.debug(f"Creating PlaceMedia for file: {file}")
+                        media = PlaceMedia.objects.create(
+                            place=place,
+                            file=file,
+                            uploaded_by=self.context['request'].user
+                        )
+                        schedule_derivatives(media, PlaceMediaDerivative)
+                    except DjangoValidationError as e:
+                        logger.error(f"Failed to create PlaceMedia: {str(e)}")
+                        raise serializers.ValidationError(f"Invalid media file: {str(e)}")
+                    except Exception as e:
+                        logger.error(f"Unexpected error creating PlaceMedia: {str(e)}")
+                        raise serializers.ValidationError(f"Error saving media file: {str(e)}")
             return place
         except DjangoValidationError as e:
             logger.error(f"Validation error creating place: {str(e)}")
@@ -217,6 +250,11 @@ class PlaceUpdateSerializer(serializers.ModelSerializer):
         required=False,
         max_length=5
     )
+    upload_ids = UploadSessionListField(
+        write_only=True,
+        required=False,
+        max_length=5
+    )
     media = PlaceMediaSerializer(many=True, read_only=True)
     updated_by = SimpleUserSerializer(read_only=True)
     detail_url = serializers.SerializerMethodField()
@@ -228,7 +266,7 @@ class PlaceUpdateSerializer(serializers.ModelSerializer):
             'id', 'place', 'university', 'academic_unit', 'parent', 'name', 'description',
             'history', 'establishment_year', 'place_type', 'relative_location', 'latitude',
             'longitude', 'maps_link', 'created_at', 'updated_at', 'updated_by', 'media',
-            'media_files', 'approval_status', 'university_root', 'academic_unit_root',
+            'media_files', 'upload_ids', 'approval_status', 'university_root', 'academic_unit_root',
             'detail_url', 'approval_url'
         ]
         read_only_fields = ['place', 'created_at', 'updated_at', 'updated_by', 'approval_status']
@@ -237,13 +275,13 @@ class PlaceUpdateSerializer(serializers.ModelSerializer):
         request = self.context.get('request')
         if request is None:
             return None
-        return request.build_absolute_uri(reverse('places:place-update-detail', kwargs={'pk': obj.pk}))
+        return get_link_builder(request).url('places:place-update-detail', obj.pk)
 
     def get_approval_url(self, obj):
         request = self.context.get('request')
         if request is None:
             return None
-        return request.build_absolute_uri(reverse('places:place-update-approve', kwargs={'pk': obj.pk}))
+        return get_link_builder(request).url('places:place-update-approve', obj.pk)
 
     def validate_place_type(self, value):
         if not value:
@@ -282,7 +320,7 @@ class PlaceUpdateSerializer(serializers.ModelSerializer):
                 })
 
             if request.user.admin_level not in ['university', 'app']:
-                allowed_fields = ['media_files']
+                allowed_fields = ['media_files', 'upload_ids']
                 for field in data:
                     if field not in allowed_fields:
                         raise serializers.ValidationError({
@@ -297,27 +335,31 @@ class PlaceUpdateSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         media_files = validated_data.pop('media_files', [])
+        upload_sessions = validated_data.pop('upload_ids', [])
         logger.debug(f"Received media files for update: {media_files}")
         try:
-            place_update = PlaceUpdate.objects.create(
-                updated_by=self.context['request'].user,
-                place=self.context['place'],
-                **validated_data
-            )
-            for file in media_files:
-                try:
-                    logger.debug(f"Creating PlaceMedia for update file: {file}")
-                    PlaceMedia.objects.create(
-                        place_update=place_update,
-                        file=file,
-                        uploaded_by=self.context['request'].user
-                    )
-                except DjangoValidationError as e:
-                    logger.error(f"Failed to create PlaceMedia for update: {str(e)}")
-                    raise serializers.ValidationError(f"Invalid media file: {str(e)}")
-                except Exception as e:
-                    logger.error(f"Unexpected error creating PlaceMedia for update: {str(e)}")
-                    raise serializers.ValidationError(f"Error saving media file: {str(e)}")
+            file_field = PlaceMedia._meta.get_field('file')
+            with commit_sessions(upload_sessions, file_field) as names, transaction.atomic():
+                place_update = PlaceUpdate.objects.create(
+                    updated_by=self.context['request'].user,
+                    place=self.context['place'],
+                    **validated_data
+                )
+                for file in [*media_files, *names]:
+                    try:
+                        logger.debug(f"Creating PlaceMedia for update file: {file}")
+                        media = PlaceMedia.objects.create(
+                            place_update=place_update,
+                            file=file,
+                            uploaded_by=self.context['request'].user
+                        )
+                        schedule_derivatives(media, PlaceMediaDerivative)
+                    except DjangoValidationError as e:
+                        logger.error(f"Failed to create PlaceMedia for update: {str(e)}")
+                        raise serializers.ValidationError(f"Invalid media file: {str(e)}")
+                    except Exception as e:
+                        logger.error(f"Unexpected error creating PlaceMedia for update: {str(e)}")
+                        raise serializers.ValidationError(f"Error saving media file: {str(e)}")
             return place_update
         except DjangoValidationError as e:
             logger.error(f"Validation error creating place update: {str(e)}")
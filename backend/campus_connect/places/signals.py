@@ -0,0 +1,62 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from campus_connect.response_cache import invalidate_tags, register_tags
+from .hierarchy import detach_children, get_descendants, prepare_path, update_path
+from .models import Place, PlaceMedia, PlaceType, forget_roots
+from .search import install_search_index
+from .spatial import install_spatial_index
+
+
+@receiver(pre_save, sender=Place)
+def place_pre_save(sender, instance, raw=False, **kwargs):
+    if not raw:
+        prepare_path(instance)
+
+
+@receiver(post_save, sender=Place)
+def place_saved(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        update_path(instance, created)
+
+
+@receiver(post_delete, sender=Place)
+def place_deleted(sender, instance, **kwargs):
+    if instance.path:
+        # The children lost their parent_data; their parent is already NULL, so find them by path.
+        invalidate_tags(f'place:{pk}' for pk in get_descendants(instance, max_depth=1).values_list('pk', flat=True))
+    detach_children(instance)
+    forget_roots()
+
+
+def get_place_tags(place):
+    """
+    A place shows up in the place lists, its own detail, its parent's children and its
+    children's parent_data. The old parent and name come from the row prepare_path()
+    read before the save, so the children are only looked up when a rename changed
+    the parent_data they show.
+    """
+    tags = {'places', f'place:{place.pk}'}
+    tags.update(f'place:{pk}' for pk in (place.parent_id, getattr(place, '_stored_parent_id', None)) if pk)
+    if getattr(place, '_stored_name', None) not in (None, place.name):
+        tags.update(f'place:{pk}' for pk in Place.objects.filter(parent_id=place.pk).values_list('pk', flat=True))
+    return tags
+
+
+def get_place_media_tags(media):
+    # Media of a pending update is not part of any cached response until it is approved.
+    return {'places', f'place:{media.place_id}'} if media.place_id else set()
+
+
+register_tags(Place, get_place_tags)
+register_tags(PlaceMedia, get_place_media_tags, track_changes=True)
+register_tags(PlaceType, lambda place_type: ['place-types'])
+
+
+def restore_spatial_index(sender, using, **kwargs):
+    """Reinstalls spatial index triggers that a migration dropped by remaking the place table."""
+    install_spatial_index(using)
+
+
+def restore_search_index(sender, using, **kwargs):
+    """Reinstalls search triggers that a migration dropped by remaking a place, type, unit or university table."""
+    install_search_index(using)
@@ -0,0 +1,178 @@
+import math
+from django.db import connections
+from django.db.models.expressions import RawSQL
+from campus_connect.links import get_link_builder
+from campus_connect.virtual_tables import drop, install_missing
+from .models import Place
+
+EARTH_RADIUS = 6371008.8  # metres, the mean radius
+METRES_PER_DEGREE = math.pi * EARTH_RADIUS / 180
+# Radius of the first box a nearest-places search reads; it grows by REACH_GROWTH until it holds enough places.
+INITIAL_REACH = 250
+REACH_GROWTH = 4
+RTREE_COLUMNS = ('id', 'min_latitude', 'max_latitude', 'min_longitude', 'max_longitude')
+# Columns read for each nearby place; like tree nodes these are plain rows, never model instances.
+NEARBY_FIELDS = ('id', 'name', 'place_type__name', 'university_id', 'academic_unit_id', 'latitude', 'longitude')
+
+
+def get_rtree_table():
+    return f'{Place._meta.db_table}_rtree'
+
+
+def get_trigger_names():
+    rtree = get_rtree_table()
+    return [f'{rtree}{suffix}' for suffix in ('_ai', '_ad', '_au')]
+
+
+def get_index_statements():
+    """
+    SQL for an R*Tree over the coordinates of places, with one point box per
+    place that has both a latitude and a longitude, plus the triggers that keep
+    it in step with inserts, updates and deletes.
+    """
+    table, rtree = Place._meta.db_table, get_rtree_table()
+    has_point = "new.latitude IS NOT NULL AND new.longitude IS NOT NULL"
+    insert_new = (
+        f"INSERT INTO {rtree} SELECT new.id, new.latitude, new.latitude, new.longitude, new.longitude "
+        f"WHERE {has_point};"
+    )
+    delete_old = f"DELETE FROM {rtree} WHERE id = old.id;"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {rtree} USING rtree({', '.join(RTREE_COLUMNS)})",
+        f"CREATE TRIGGER IF NOT EXISTS {rtree}_ai AFTER INSERT ON {table} BEGIN {insert_new} END",
+        f"CREATE TRIGGER IF NOT EXISTS {rtree}_ad AFTER DELETE ON {table} BEGIN {delete_old} END",
+        f"CREATE TRIGGER IF NOT EXISTS {rtree}_au AFTER UPDATE OF id, latitude, longitude ON {table} "
+        f"BEGIN {delete_old} {insert_new} END",
+    ]
+
+
+def rtree_available(using='default'):
+    return connections[using].vendor == 'sqlite'
+
+
+def install_spatial_index(using='default'):
+    """
+    Creates the R*Tree and its triggers where they are missing and refills the
+    tree if anything was. Does nothing on other backends, which filter the
+    coordinate columns instead.
+    """
+    if not rtree_available(using):
+        return
+    table, rtree = Place._meta.db_table, get_rtree_table()
+    statements = [
+        *get_index_statements(),
+        f"DELETE FROM {rtree}",
+        f"INSERT INTO {rtree} SELECT id, latitude, latitude, longitude, longitude FROM {table} "
+        f"WHERE latitude IS NOT NULL AND longitude IS NOT NULL",
+    ]
+    install_missing(using, rtree, get_trigger_names(), statements)
+
+
+def uninstall_spatial_index(using='default'):
+    if not rtree_available(using):
+        return
+    drop(using, get_rtree_table(), get_trigger_names())
+
+
+def haversine(latitude, longitude, other_latitude, other_longitude):
+    """Great-circle distance in metres between two points given in degrees."""
+    phi, other_phi = math.radians(latitude), math.radians(other_latitude)
+    half_chord = (
+        math.sin((other_phi - phi) / 2) ** 2
+        + math.cos(phi) * math.cos(other_phi) * math.sin(math.radians(other_longitude - longitude) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS * math.asin(min(1.0, math.sqrt(half_chord)))
+
+
+def get_bounding_boxes(latitude, longitude, radius):
+    """
+    [(min_lat, max_lat, min_lng, max_lng)] covering every point within `radius`
+    metres. A circle reaching a pole covers every longitude; one crossing the
+    antimeridian is split into a box on either side of it.
+    """
+    delta = radius / METRES_PER_DEGREE
+    min_latitude, max_latitude = latitude - delta, latitude + delta
+    if min_latitude <= -90 or max_latitude >= 90:
+        return [(max(min_latitude, -90), min(max_latitude, 90), -180, 180)]
+    # The widest point of the circle lies poleward of its centre, where degrees of longitude are shortest.
+    longitude_delta = math.degrees(math.asin(min(1.0, math.sin(math.radians(delta)) / math.cos(math.radians(latitude)))))
+    min_longitude, max_longitude = longitude - longitude_delta, longitude + longitude_delta
+    if longitude_delta >= 180 or max_longitude - min_longitude >= 360:
+        return [(min_latitude, max_latitude, -180, 180)]
+    if min_longitude < -180:
+        return [(min_latitude, max_latitude, min_longitude + 360, 180), (min_latitude, max_latitude, -180, max_longitude)]
+    if max_longitude > 180:
+        return [(min_latitude, max_latitude, min_longitude, 180), (min_latitude, max_latitude, -180, max_longitude - 360)]
+    return [(min_latitude, max_latitude, min_longitude, max_longitude)]
+
+
+def filter_within_boxes(queryset, boxes):
+    """
+    Narrows `queryset` to places inside `boxes`: through the R*Tree on SQLite,
+    elsewhere with ranges on the coordinate columns. The R*Tree stores 32-bit
+    floats rounded outwards, so it may let through points just outside a box,
+    never drop one inside it; callers refine by distance anyway.
+    """
+    if rtree_available(queryset.db):
+        rtree = get_rtree_table()
+        condition = ' OR '.join(
+            '(min_latitude <= %s AND max_latitude >= %s AND min_longitude <= %s AND max_longitude >= %s)'
+            for _ in boxes
+        )
+        params = [value for box in boxes for value in (box[1], box[0], box[3], box[2])]
+        return queryset.filter(pk__in=RawSQL(f"SELECT id FROM {rtree} WHERE {condition}", params))
+    places = queryset.none()
+    for min_latitude, max_latitude, min_longitude, max_longitude in boxes:
+        places |= queryset.filter(
+            latitude__range=(min_latitude, max_latitude), longitude__range=(min_longitude, max_longitude)
+        )
+    return places
+
+
+def get_hits(queryset, latitude, longitude, radius):
+    """[(distance, pk)] of the places of `queryset` within `radius` metres, unordered."""
+    rows = filter_within_boxes(queryset, get_bounding_boxes(latitude, longitude, radius)).order_by()
+    hits = []
+    for pk, place_latitude, place_longitude in rows.values_list('pk', 'latitude', 'longitude'):
+        distance = haversine(latitude, longitude, place_latitude, place_longitude)
+        if distance <= radius:
+            hits.append((distance, pk))
+    return hits
+
+
+def get_nearest(queryset, latitude, longitude, radius, limit):
+    """
+    [(distance, pk)] of the `limit` places of `queryset` nearest to the point,
+    within `radius` metres, nearest first. The search reads a small box first and
+    widens it until the circle inside holds `limit` places: none outside can be
+    nearer, so a dense campus never loads more than the neighbourhood it needs.
+    """
+    reach = min(radius, INITIAL_REACH)
+    while True:
+        hits = get_hits(queryset, latitude, longitude, reach)
+        if len(hits) >= limit or reach >= radius:
+            return sorted(hits)[:limit]
+        reach = min(reach * REACH_GROWTH, radius)
+
+
+def encode_place(row, distance, links):
+    pk, name, place_type, university, academic_unit, latitude, longitude = row
+    return {
+        'id': pk,
+        'name': name,
+        'place_type': place_type,
+        'university': university,
+        'academic_unit': academic_unit,
+        'latitude': latitude,
+        'longitude': longitude,
+        'distance': round(distance, 1),
+        'detail_url': links.url('places:place-detail', pk),
+    }
+
+
+def get_nearby(request, queryset, latitude, longitude, radius, limit):
+    """The nearest places of `queryset` as plain dicts with their distance in metres, nearest first."""
+    nearest = get_nearest(queryset, latitude, longitude, radius, limit)
+    rows = {row[0]: row for row in queryset.filter(pk__in=[pk for _, pk in nearest]).values_list(*NEARBY_FIELDS)}
+    links = get_link_builder(request)
+    return [encode_place(rows[pk], distance, links) for distance, pk in nearest]
@@ -0,0 +1,491 @@
+import io
+import os
+import shutil
+import tempfile
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import IntegrityError, connection, reset_queries, transaction
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from accounts.models import User
+from campus_connect.storage import media_storage, wait_for_removals
+from universities.models import AcademicUnit, University
+from .hierarchy import get_ancestors, get_descendants
+from .models import Place, PlaceMedia, PlaceType, PlaceUpdate
+from .serializers import PlaceMediaSerializer
+from .spatial import get_bounding_boxes, get_rtree_table, haversine, install_spatial_index
+
+
+class PlaceResponseCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.client = APIClient()
+        university = University.objects.create(name="Test University", short_name="TU")
+        user = User.objects.create_user(email="owner@example.com", password="password123", name="Owner")
+        place_type = PlaceType.objects.create(name="Building")
+        fields = {'university': university, 'place_type': place_type, 'created_by': user, 'approval_status': 'approved'}
+        self.campus = Place.objects.create(name="Campus", university_root=True, **fields)
+        self.library = Place.objects.create(name="Library", parent=self.campus, **fields)
+        self.hall = Place.objects.create(name="Hall", parent=self.campus, **fields)
+
+    def get_detail(self, place):
+        response = self.client.get(reverse('places:place-detail', kwargs={'pk': place.pk}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+
+    def test_details_are_invalidated_through_related_places(self):
+        for place in (self.campus, self.library, self.hall):
+            self.assertEqual(self.get_detail(place)['X-Cache'], 'MISS')
+            self.assertEqual(self.get_detail(place)['X-Cache'], 'HIT')
+
+        # Renaming the root changes its children's parent_data, not its siblings'.
+        self.campus.name = "Main campus"
+        self.campus.save()
+        self.assertEqual(self.get_detail(self.library).data['parent_data']['name'], "Main campus")
+        self.assertEqual(self.get_detail(self.hall)['X-Cache'], 'MISS')
+
+        # Renaming a child changes its parent's children, not its sibling.
+        self.get_detail(self.campus)
+        self.library.name = "Old library"
+        self.library.save()
+        self.assertIn("Old library", [child['name'] for child in self.get_detail(self.campus).data['children']])
+        self.assertEqual(self.get_detail(self.hall)['X-Cache'], 'HIT')
+
+        # Moving a place invalidates both its old and its new parent.
+        self.get_detail(self.campus)
+        self.hall.parent = self.library
+        self.hall.save()
+        self.assertEqual(len(self.get_detail(self.campus).data['children']), 1)
+        self.assertEqual(self.get_detail(self.library).data['children'][0]['name'], "Hall")
+
+    def test_saves_read_the_place_once_and_children_only_on_rename(self):
+        self.hall.description = "Lecture halls"
+        reset_queries()
+        with CaptureQueriesContext(connection) as queries:
+            self.hall.save()
+        selects = [query['sql'] for query in queries if query['sql'].startswith('SELECT')]
+        self.assertEqual(len(selects), 1)
+
+        self.get_detail(self.library)
+        self.campus.name = "Main campus"
+        with CaptureQueriesContext(connection) as queries:
+            self.campus.save()
+        self.assertEqual(len([query for query in queries if query['sql'].startswith('SELECT')]), 2)
+        self.assertEqual(self.get_detail(self.library)['X-Cache'], 'MISS')
+
+    def test_deleting_a_place_invalidates_its_children(self):
+        self.assertIsNotNone(self.get_detail(self.library).data['parent_data'])
+        Place.objects.get(pk=self.campus.pk).delete()
+        response = self.get_detail(self.library)
+        self.assertEqual((response['X-Cache'], response.data['parent_data']), ('MISS', None))
+
+    def test_lists_follow_place_changes(self):
+        url = reverse('places:place-list')
+        self.assertEqual(self.client.get(url).data['count'], 3)
+        self.assertEqual(self.client.get(url)['X-Cache'], 'HIT')
+        self.hall.delete()
+        response = self.client.get(url)
+        self.assertEqual((response['X-Cache'], response.data['count']), ('MISS', 2))
+
+    def test_detail_etag_follows_related_places(self):
+        url = reverse('places:place-detail', kwargs={'pk': self.library.pk})
+        etag = self.get_detail(self.library)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+        self.campus.name = "Main campus"
+        self.campus.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.data['parent_data']['name'], "Main campus")
+
+
+class PlaceHierarchyMixin:
+    def setUp(self):
+        self.client = APIClient()
+        self.university = University.objects.create(name="Test University", short_name="TU")
+        self.admin = User.objects.create_user(
+            email="admin@example.com", password="password123", name="Admin", admin_level='app'
+        )
+        self.place_type = PlaceType.objects.create(name="Building")
+        self.campus = self.create_place("Campus", university_root=True)
+        self.library = self.create_place("Library", parent=self.campus)
+        self.floor = self.create_place("Floor", parent=self.library)
+        self.room = self.create_place("Room", parent=self.floor)
+        self.hall = self.create_place("Hall", parent=self.campus)
+
+    def create_place(self, name, **fields):
+        fields.setdefault('approval_status', 'approved')
+        fields.setdefault('place_type', self.place_type)
+        return Place.objects.create(name=name, university=self.university, created_by=self.admin, **fields)
+
+    def assert_path(self, place, *ancestors):
+        place.refresh_from_db()
+        self.assertEqual(place.path, ''.join(f"/{ancestor.pk}" for ancestor in (*ancestors, place)) + '/')
+        self.assertEqual(place.depth, len(ancestors))
+
+
+class PlaceHierarchyTestCase(PlaceHierarchyMixin, TestCase):
+    def test_paths_follow_creation_and_moves(self):
+        self.assert_path(self.room, self.campus, self.library, self.floor)
+        self.floor.parent = self.hall
+        self.floor.save()
+        self.assert_path(self.floor, self.campus, self.hall)
+        self.assert_path(self.room, self.campus, self.hall, self.floor)
+        self.assert_path(self.library, self.campus)
+
+    def test_subtree_and_ancestor_queries(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                {place.name for place in get_descendants(self.campus)}, {"Library", "Floor", "Room", "Hall"}
+            )
+        with self.assertNumQueries(1):
+            self.assertEqual({place.name for place in get_descendants(self.campus, max_depth=1)}, {"Library", "Hall"})
+        with self.assertNumQueries(1):
+            self.assertEqual([place.name for place in get_ancestors(self.room)], ["Campus", "Library", "Floor"])
+
+    def test_moving_under_a_descendant_is_rejected(self):
+        self.library.parent = self.room
+        with self.assertRaises(ValidationError):
+            self.library.save()
+
+    def test_approved_updates_move_subtrees(self):
+        update = PlaceUpdate.objects.create(
+            place=self.floor, university=self.university, parent=self.hall, name="Floor",
+            place_type=self.place_type, updated_by=self.admin
+        )
+        self.client.force_authenticate(user=self.admin)
+        response = self.client.post(
+            reverse('places:place-update-approve', kwargs={'pk': update.pk}), {'approval_status': 'approved'}, format='json'
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assert_path(self.room, self.campus, self.hall, self.floor)
+
+    def test_deleting_a_place_detaches_its_subtree(self):
+        self.library.delete()
+        self.assert_path(self.floor)
+        self.assert_path(self.room, self.floor)
+
+    def test_rebuild_command_backfills_paths(self):
+        Place.objects.update(path='', depth=0)
+        call_command('rebuild_place_paths', stdout=io.StringIO())
+        self.assert_path(self.room, self.campus, self.library, self.floor)
+        self.assert_path(self.hall, self.campus)
+
+
+class PlaceRecursiveDeleteTestCase(PlaceHierarchyMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.media = [
+            PlaceMedia.objects.create(place=place, file=SimpleUploadedFile(f"{place.name}.jpg", place.name.encode()))
+            for place in (self.library, self.room, self.hall)
+        ]
+        self.client.force_authenticate(user=self.admin)
+        self.url = reverse('places:place-recursive-delete', kwargs={'pk': self.library.pk})
+
+    def test_dry_run_reports_counts(self):
+        response = self.client.delete(f"{self.url}?dry_run=true")
+        self.assertEqual(response.data, {'places': 3, 'media': 2})
+        self.assertEqual(Place.objects.count(), 5)
+
+    def test_unindexed_descendants_are_found(self):
+        shelf = Place.objects.bulk_create([Place(
+            name="Shelf", parent=self.room, university=self.university, place_type=self.place_type,
+            created_by=self.admin, approval_status='approved'
+        )])[0]
+        self.assertEqual(Place.objects.get(pk=shelf.pk).path, '')
+
+        response = self.client.delete(f"{self.url}?dry_run=true")
+        self.assertEqual(response.data, {'places': 4, 'media': 2})
+        self.assertEqual(Place.objects.get(pk=shelf.pk).path, '')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.delete(self.url)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Place.objects.filter(pk=shelf.pk).exists())
+        wait_for_removals()
+
+    def test_subtree_is_deleted_in_bulk(self):
+        for i in range(20):
+            self.create_place(f"Shelf {i}", parent=self.floor)
+        # Lookup, index check, savepoint, three reads, one UPDATE, four DELETEs and release, whatever the subtree size.
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertNumQueries(12):
+                response = self.client.delete(self.url)
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(set(Place.objects.values_list('name', flat=True)), {"Campus", "Hall"})
+        self.assertEqual(PlaceMedia.objects.get().place, self.hall)
+
+        wait_for_removals()
+        self.assertFalse(media_storage.exists(self.media[0].file.name))
+        self.assertFalse(media_storage.exists(self.media[1].file.name))
+        self.assertTrue(os.path.exists(self.media[2].file.path))
+
+
+class PlaceTreeTestCase(PlaceHierarchyMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.create_place("Annex", parent=self.library, approval_status='pending')
+        self.url = reverse('places:place-tree')
+
+    def test_tree_is_read_in_one_query(self):
+        # The ETag comes from the cache tag versions; the whole tree is one query.
+        with self.assertNumQueries(1):
+            tree = self.client.get(self.url, {'university': self.university.pk}).data
+        # Siblings are sorted by name; pending places are left out.
+        self.assertEqual([root['name'] for root in tree], ["Campus"])
+        self.assertEqual([child['name'] for child in tree[0]['children']], ["Hall", "Library"])
+        library = tree[0]['children'][1]
+        self.assertEqual(library['children'][0]['children'][0]['name'], "Room")
+        self.assertEqual(library['place_type'], "building")
+        self.assertTrue(library['detail_url'].endswith(reverse('places:place-detail', kwargs={'pk': self.library.pk})))
+
+    def test_depth_limits_the_tree(self):
+        tree = self.client.get(self.url, {'university': self.university.pk, 'depth': 1}).data
+        self.assertEqual([len(child['children']) for child in tree[0]['children']], [0, 0])
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url, {'university': 999}).status_code, status.HTTP_404_NOT_FOUND)
+
+
+class PlaceMediaNeighboursTestCase(PlaceHierarchyMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def add_media(self, place, count):
+        return [
+            PlaceMedia.objects.create(place=place, file=SimpleUploadedFile(f"{place.name}{i}.jpg", b"photo"))
+            for i in range(count)
+        ]
+
+    def get_media(self, place):
+        # The test client resets the query log on each request; start from an empty one.
+        reset_queries()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('places:place-detail', kwargs={'pk': place.pk}))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data['media'], len(queries)
+
+    def test_neighbours_cost_no_queries_per_media(self):
+        self.add_media(self.hall, 1)
+        media = self.add_media(self.library, 30)
+        data, library_queries = self.get_media(self.library)
+        _, hall_queries = self.get_media(self.hall)
+        self.assertEqual(library_queries, hall_queries)
+
+        access_url = lambda item: reverse('places:media-access', kwargs={'pk': item.pk})
+        self.assertIsNone(data[0]['previous_media_url'])
+        self.assertTrue(data[0]['next_media_url'].endswith(access_url(media[1])))
+        self.assertTrue(data[15]['previous_media_url'].endswith(access_url(media[14])))
+        self.assertIsNone(data[-1]['next_media_url'])
+
+    def test_single_media_loads_its_neighbours(self):
+        media = self.add_media(self.library, 3)
+        request = APIClient().get('/').wsgi_request
+        with self.assertNumQueries(1):
+            data = PlaceMediaSerializer(media[1], context={'request': request}).data
+        self.assertTrue(data['previous_media_url'].endswith(reverse('places:media-access', kwargs={'pk': media[0].pk})))
+        self.assertTrue(data['next_media_url'].endswith(reverse('places:media-access', kwargs={'pk': media[2].pk})))
+
+    def test_pending_update_media_is_limited_to_its_author_and_admins(self):
+        author = User.objects.create_user(email="author@example.com", password="password123", name="Author")
+        update = PlaceUpdate.objects.create(
+            place=self.hall, university=self.university, parent=self.campus, name="Hall",
+            place_type=self.place_type, updated_by=author
+        )
+        media = PlaceMedia.objects.create(place_update=update, file=SimpleUploadedFile("hall.mp4", b"video"))
+        url = reverse('places:media-access', kwargs={'pk': media.pk})
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+        for user in (author, self.admin):
+            self.client.force_authenticate(user=user)
+            self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+
+
+class PlaceRootConstraintTestCase(PlaceHierarchyMixin, TestCase):
+    def test_second_roots_are_rejected_by_clean_and_by_the_database(self):
+        with self.assertRaises(ValidationError):
+            self.create_place("Second campus", university_root=True)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Place.objects.bulk_create([Place(
+                name="Second campus", university=self.university, place_type=self.place_type, university_root=True
+            )])
+
+    def test_batch_saves_look_roots_up_once(self):
+        unit = AcademicUnit.objects.create(name="Physics", unit_type='department', university=self.university)
+        unit = AcademicUnit.objects.get(pk=unit.pk)
+        with CaptureQueriesContext(connection) as queries, transaction.atomic():
+            department = self.create_place("Physics", parent=self.campus, academic_unit_id=unit.pk, academic_unit_root=True)
+            for i in range(10):
+                self.create_place(f"Lab {i}", parent=department, academic_unit_id=unit.pk)
+        # Root lookups read (pk, name), unlike the path lookup of each save; the academic unit is read for its university id.
+        lookups = [
+            query['sql'] for query in queries
+            if query['sql'].startswith('SELECT') and (
+                ('AS "name"' in query['sql'] and 'AS "path"' not in query['sql'])
+                or 'universities_academicunit' in query['sql']
+            )
+        ]
+        self.assertEqual(len(lookups), 2)
+
+    def test_memo_does_not_outlive_a_rollback(self):
+        self.campus.delete()
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            self.create_place("New campus", university_root=True)
+            raise IntegrityError
+        self.assertEqual(self.create_place("New campus", university_root=True).name, "New campus")
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=False)
+class PlaceNearbyTestCase(PlaceHierarchyMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('places:place-nearby')
+        self.centre = (51.5, -0.12)
+        # About 111 m of latitude per 0.001 degrees.
+        Place.objects.filter(pk=self.library.pk).update(latitude=51.501, longitude=-0.12)
+        Place.objects.filter(pk=self.hall.pk).update(latitude=51.5, longitude=-0.12)
+        Place.objects.filter(pk=self.room.pk).update(latitude=51.52, longitude=-0.12)
+        self.kiosk = self.create_place(
+            "Kiosk", parent=self.campus, latitude=51.5005, longitude=-0.12, place_type=PlaceType.objects.create(name="Kiosk")
+        )
+        self.create_place("Annex", parent=self.campus, latitude=51.5001, longitude=-0.12, approval_status='pending')
+
+    def get_rtree_ids(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT id FROM {get_rtree_table()}")
+            return {row[0] for row in cursor.fetchall()}
+
+    def nearby(self, **params):
+        return self.client.get(self.url, {'lat': self.centre[0], 'lng': self.centre[1], **params})
+
+    def test_nearest_first_within_radius(self):
+        response = self.nearby(radius=500)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # Pending places and places beyond the radius are left out.
+        self.assertEqual([place['name'] for place in response.data], ["Hall", "Kiosk", "Library"])
+        self.assertEqual(response.data[0]['distance'], 0)
+        self.assertAlmostEqual(response.data[2]['distance'], 111.2, delta=0.5)
+        self.assertTrue(response.data[2]['detail_url'].endswith(reverse('places:place-detail', kwargs={'pk': self.library.pk})))
+
+        response = self.nearby(radius=5000)
+        self.assertEqual([place['name'] for place in response.data], ["Hall", "Kiosk", "Library", "Room"])
+
+    def test_limit_and_type(self):
+        self.assertEqual([place['name'] for place in self.nearby(limit=2).data], ["Hall", "Kiosk"])
+        self.assertEqual([place['name'] for place in self.nearby(type="KIOSK").data], ["Kiosk"])
+        self.assertEqual(self.nearby(type="lab").status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.client.get(self.url, {'lat': 51.5}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.nearby(lat=91).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.nearby(radius=0).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_index_follows_saves_and_deletes(self):
+        self.assertEqual(self.get_rtree_ids(), {self.library.pk, self.hall.pk, self.room.pk, self.kiosk.pk,
+                                                Place.objects.get(name="Annex").pk})
+        self.kiosk.latitude = None
+        self.kiosk.save()
+        self.hall.delete()
+        self.assertNotIn(self.kiosk.pk, self.get_rtree_ids())
+        self.assertNotIn(self.hall.pk, self.get_rtree_ids())
+        self.assertEqual([place['name'] for place in self.nearby().data], ["Library"])
+
+    def test_install_refills_a_dropped_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE {get_rtree_table()}")
+        install_spatial_index()
+        self.assertEqual([place['name'] for place in self.nearby(radius=500).data], ["Hall", "Kiosk", "Library"])
+
+    def test_bounding_boxes_cross_the_antimeridian(self):
+        boxes = get_bounding_boxes(0, 179.999, 1000)
+        self.assertEqual(len(boxes), 2)
+        self.assertEqual(boxes[0][3], 180)
+        self.assertEqual(boxes[1][2], -180)
+        self.assertAlmostEqual(haversine(0, 179.999, 0, -179.999), 222.4, delta=0.5)
+        self.assertEqual(get_bounding_boxes(89.999, 0, 1000)[0][2:], (-180, 180))
+
+
+class PlaceSearchTestCase(PlaceHierarchyMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        self.url = reverse('places:place-search')
+        self.lab = self.create_place(
+            "Physics Lab", parent=self.hall, description="Next to the library stairs",
+            place_type=PlaceType.objects.create(name="Laboratory")
+        )
+        self.create_place("Library Annex", parent=self.campus, approval_status='pending')
+
+    def search(self, query='', **params):
+        return self.client.get(f"{self.url}?{query}", params)
+
+    def names(self, response):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [place['name'] for place in response.data['results']]
+
+    def test_general_query_is_ranked(self):
+        # A match in the name outranks one in the description; pending places are left out.
+        self.assertEqual(self.names(self.search(raw_query="library")), ["Library", "Physics Lab"])
+        self.assertEqual(self.names(self.search("library")), ["Library", "Physics Lab"])
+        self.assertEqual(self.names(self.search("LIBRARY&limit=1")), ["Library"])
+        # With no place holding the whole phrase, every term must appear in some column:
+        # here the place type and the university.
+        self.assertEqual(self.names(self.search(raw_query="laboratory test")), ["Physics Lab"])
+        # Terms too short for trigrams are matched as substrings.
+        self.assertEqual(self.names(self.search(raw_query="ha")), ["Hall"])
+
+    def test_whole_phrase_is_the_strict_match(self):
+        self.create_place("Central Library", parent=self.campus)
+        self.create_place("Cafe", parent=self.campus, description="Central court, by the library")
+        self.assertEqual(self.names(self.search(raw_query="central  library")), ["Central Library"])
+        # As before, the phrase may be the name of the place's university.
+        self.assertEqual(len(self.names(self.search(raw_query="test university"))), 8)
+
+    def test_typos_are_forgiven(self):
+        self.assertEqual(self.names(self.search(raw_query="libary")), ["Library", "Physics Lab"])
+        self.assertEqual(self.names(self.search(raw_query="phisics")), ["Physics Lab"])
+        self.assertEqual(self.names(self.search(raw_query="xylophone")), [])
+
+    def test_specific_fields(self):
+        self.assertEqual(self.names(self.search(name="brar")), ["Library"])
+        # ?name= also matches the short names of the university and academic unit.
+        self.assertEqual(len(self.names(self.search(name="TU"))), 6)
+        self.assertEqual(self.names(self.search(place_type="LABORATORY")), ["Physics Lab"])
+        self.assertEqual(self.search(university="Nowhere").status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_filters_and_facets(self):
+        response = self.search(raw_query="l")
+        self.assertEqual(response.data['facets']['place_type'], [
+            {'name': "building", 'count': 5}, {'name': "laboratory", 'count': 1}
+        ])
+        self.assertEqual(response.data['facets']['university'], [{'name': "Test University", 'count': 6}])
+        response = self.search(raw_query="library", place_type="laboratory")
+        self.assertEqual(self.names(response), ["Physics Lab"])
+        self.assertEqual(response.data['facets']['place_type'], [{'name': "laboratory", 'count': 1}])
+        self.assertEqual(self.search(raw_query="library", name="Hall").status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_index_follows_renames(self):
+        self.place_type.name = "Auditorium"
+        self.place_type.save()
+        self.assertEqual(len(self.names(self.search(raw_query="auditorium"))), 5)
+        self.university.name = "Riverside College"
+        self.university.save()
+        self.lab.delete()
+        self.assertEqual(len(self.names(self.search(raw_query="riverside"))), 5)
+        self.assertEqual(self.names(self.search(raw_query="physics")), [])
+
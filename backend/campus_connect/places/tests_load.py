@@ -0,0 +1,151 @@
+import os
+import random
+import time
+from django.db import connection, reset_queries
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+from rest_framework import status
+from accounts.models import User
+from universities.models import University
+from .hierarchy import rebuild_paths
+from .models import Place, PlaceType
+from .spatial import get_hits, haversine
+
+# Places in the benchmark campus: one root, then buildings, floors and rooms.
+TREE_BENCH_SIZE = int(os.getenv('PLACE_TREE_BENCH_SIZE', '10000'))
+# Places with coordinates in the nearby benchmark, scattered over a city-sized square;
+# e.g. PLACE_NEARBY_BENCH_SIZE=100000 for the full measurement.
+NEARBY_BENCH_SIZE = int(os.getenv('PLACE_NEARBY_BENCH_SIZE', '10000'))
+BATCH_SIZE = 2000
+
+
+def count_nodes(nodes):
+    return sum(1 + count_nodes(node['children']) for node in nodes)
+
+
+# bulk_create() sends no signals, so cached trees would go stale; measure the uncached build.
+@override_settings(RESPONSE_CACHE_ENABLED=False)
+class PlaceTreeLoadTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.university = University.objects.create(name="Load University", short_name="LU")
+        self.user = User.objects.create_user(email="load@example.com", password="password123", name="Load")
+        self.place_type = PlaceType.objects.create(name="Room")
+
+    def create_level(self, parents, per_parent, label):
+        return Place.objects.bulk_create([
+            Place(university=self.university, parent=parent, name=f"{label} {i}", place_type=self.place_type,
+                  created_by=self.user, approval_status='approved')
+            for parent in parents for i in range(per_parent)
+        ], batch_size=BATCH_SIZE)
+
+    def build_campus(self, size):
+        """A root with buildings of ten floors; the rooms fill the campus up to `size` places."""
+        root = self.create_level([None], 1, "Campus")
+        buildings = self.create_level(root, max(1, size // 1000), "Building")
+        floors = self.create_level(buildings, 10, "Floor")
+        rooms_per_floor = max(1, (size - 1 - len(buildings) - len(floors)) // len(floors))
+        rooms = self.create_level(floors, rooms_per_floor, "Room")
+        rebuild_paths()
+        return 1 + len(buildings) + len(floors) + len(rooms)
+
+    def test_campus_tree_is_one_query(self):
+        """Benchmark the full campus tree against the root-level PlaceSerializer listing."""
+        total = self.build_campus(TREE_BENCH_SIZE)
+        url = reverse('places:place-tree')
+
+        # The test client resets the query log on each request; start from an empty one.
+        reset_queries()
+        start_time = time.perf_counter()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'university': self.university.pk})
+        tree_duration = time.perf_counter() - start_time
+        tree_query_count = len(queries)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(count_nodes(response.data), total)
+        tree_queries = [query for query in queries if 'parent_id' in query['sql']]
+        self.assertEqual(len(tree_queries), 1)
+
+        reset_queries()
+        start_time = time.perf_counter()
+        with CaptureQueriesContext(connection) as root_queries:
+            self.client.get(reverse('places:university-places'))
+        roots_duration = time.perf_counter() - start_time
+        root_query_count = len(root_queries)
+
+        start_time = time.perf_counter()
+        response = self.client.get(url, {'university': self.university.pk, 'depth': 2})
+        shallow_duration = time.perf_counter() - start_time
+        self.assertEqual(count_nodes(response.data), total - Place.objects.filter(depth=3).count())
+
+        print(
+            f"Campus tree of {total} places: {tree_duration * 1000:.1f} ms in {tree_query_count} queries, "
+            f"depth 2: {shallow_duration * 1000:.1f} ms; "
+            f"roots with children via PlaceSerializer: {roots_duration * 1000:.1f} ms in {root_query_count} queries"
+        )
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=False)
+class PlaceNearbyLoadTestCase(TestCase):
+    centre = (40.0, -75.0)
+    spread = 0.2  # degrees either side of the centre, roughly 20 km
+
+    def setUp(self):
+        self.client = APIClient()
+        self.university = University.objects.create(name="Load University", short_name="LU")
+        self.user = User.objects.create_user(email="load@example.com", password="password123", name="Load")
+        self.place_type = PlaceType.objects.create(name="Room")
+
+    def build_places(self, size):
+        """`size` places under one root; bulk_create() sends no signals, the index triggers still fire."""
+        root = Place.objects.create(university=self.university, name="Campus", place_type=self.place_type,
+                                    created_by=self.user, approval_status='approved', university_root=True)
+        generator = random.Random(size)
+        Place.objects.bulk_create([
+            Place(university=self.university, parent=root, name=f"Place {i}", place_type=self.place_type,
+                  created_by=self.user, approval_status='approved',
+                  latitude=self.centre[0] + generator.uniform(-self.spread, self.spread),
+                  longitude=self.centre[1] + generator.uniform(-self.spread, self.spread))
+            for i in range(size)
+        ], batch_size=BATCH_SIZE)
+
+    def scan(self, radius, limit):
+        """The nearest places found by reading every coordinate, as the baseline."""
+        rows = Place.objects.filter(approval_status='approved', latitude__isnull=False).values_list(
+            'pk', 'latitude', 'longitude'
+        )
+        hits = [(haversine(*self.centre, latitude, longitude), pk) for pk, latitude, longitude in rows]
+        return sorted(hit for hit in hits if hit[0] <= radius)[:limit]
+
+    def test_nearby_reads_the_neighbourhood_only(self):
+        """Benchmark ?nearby through the R*Tree against a scan of every place."""
+        self.build_places(NEARBY_BENCH_SIZE)
+        url = reverse('places:place-nearby')
+        params = {'lat': self.centre[0], 'lng': self.centre[1], 'radius': 5000, 'limit': 20}
+
+        reset_queries()
+        start_time = time.perf_counter()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, params)
+        nearby_duration = time.perf_counter() - start_time
+        query_count = len(queries)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        start_time = time.perf_counter()
+        expected = self.scan(params['radius'], params['limit'])
+        scan_duration = time.perf_counter() - start_time
+        self.assertEqual([place['id'] for place in response.data], [pk for _, pk in expected])
+
+        start_time = time.perf_counter()
+        hits = get_hits(Place.objects.filter(approval_status='approved'), *self.centre, params['radius'])
+        radius_duration = time.perf_counter() - start_time
+        self.assertEqual(len(hits), len(self.scan(params['radius'], NEARBY_BENCH_SIZE)))
+
+        print(
+            f"Nearest {params['limit']} of {NEARBY_BENCH_SIZE} places: {nearby_duration * 1000:.1f} ms "
+            f"in {query_count} queries; all {len(hits)} within {params['radius']} m: {radius_duration * 1000:.1f} ms; "
+            f"full scan: {scan_duration * 1000:.1f} ms"
+        )
+
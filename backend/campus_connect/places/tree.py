@@ -0,0 +1,53 @@
+from campus_connect.links import get_link_builder
+from .models import Place
+
+# Columns read for each node; the tree is built from plain rows, never model instances.
+NODE_FIELDS = (
+    'id', 'parent_id', 'name', 'place_type__name', 'academic_unit_id',
+    'university_root', 'academic_unit_root', 'latitude', 'longitude',
+)
+
+
+def get_tree_rows(university_id, depth=None):
+    """Approved places of a university, down to `depth` levels below the roots, in one query."""
+    queryset = Place.objects.filter(university_id=university_id, approval_status='approved')
+    if depth is not None:
+        queryset = queryset.filter(depth__lte=depth)
+    return queryset.order_by('name', 'id').values_list(*NODE_FIELDS)
+
+
+def encode_node(row, links):
+    pk, _, name, place_type, academic_unit, university_root, academic_unit_root, latitude, longitude = row
+    return {
+        'id': pk,
+        'name': name,
+        'place_type': place_type,
+        'academic_unit': academic_unit,
+        'university_root': university_root,
+        'academic_unit_root': academic_unit_root,
+        'latitude': latitude,
+        'longitude': longitude,
+        'detail_url': links.url('places:place-detail', pk),
+        'children': [],
+    }
+
+
+def build_tree(rows, links):
+    """
+    Nests encoded rows under their parents through an id -> node map. Rows whose
+    parent is not among them, e.g. below a pending place, are left out; rows
+    without a parent are the roots. Siblings keep the order of `rows`.
+    """
+    nodes = {row[0]: encode_node(row, links) for row in rows}
+    roots = []
+    for row in rows:
+        pk, parent_id = row[0], row[1]
+        if parent_id is None:
+            roots.append(nodes[pk])
+        elif parent_id in nodes:
+            nodes[parent_id]['children'].append(nodes[pk])
+    return roots
+
+
+def get_tree(request, university_id, depth=None):
+    return build_tree(list(get_tree_rows(university_id, depth)), get_link_builder(request))
@@ -3,7 +3,8 @@ from .views import (
     PlaceListCreateView, UniversityPlacesView, PlaceDetailView,
     PlaceUpdateView, PlaceDeleteView, PlaceSearchView,
     PlaceTypeListView, MediaAccessView, PendingPlaceUpdatesView,
-    PlaceUpdateDetailView, PlaceUpdateApprovalView, PlaceRecursiveDeleteView
+    PlaceUpdateDetailView, PlaceUpdateApprovalView, PlaceRecursiveDeleteView, PlaceTreeView,
+    PlaceNearbyView
 )
 
 app_name = 'places'
@@ -11,6 +12,8 @@ app_name = 'places'
 urlpatterns = [
     path('', PlaceListCreateView.as_view(), name='place-list'),
     path('universities/', UniversityPlacesView.as_view(), name='university-places'),
+    path('tree/', PlaceTreeView.as_view(), name='place-tree'),
+    path('nearby/', PlaceNearbyView.as_view(), name='place-nearby'),
     path('<int:pk>/', PlaceDetailView.as_view(), name='place-detail'),
     path('<int:pk>/update/', PlaceUpdateView.as_view(), name='place-update'),
     path('<int:pk>/delete/', PlaceDeleteView.as_view(), name='place-delete'),
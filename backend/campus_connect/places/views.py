@@ -4,17 +4,41 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.parsers import MultiPartParser, FormParser
-from django.http import FileResponse
+from campus_connect.media import serve_media
+from campus_connect.derivatives import DERIVATIVE_SIZES, get_media_file
+from campus_connect.response_cache import cache_response
+from campus_connect.conditional import conditional_response, merge_validators, queryset_validators, tag_validators
 from django.db.models import Q
 from django.db import transaction
+from .hierarchy import delete_subtree
 from .models import Place, PlaceType, PlaceMedia, PlaceUpdate
-from .serializers import PlaceSerializer, PlaceTypeSerializer, PlaceSearchSerializer, PlaceUpdateSerializer
+from .serializers import PlaceSerializer, PlaceTypeSerializer, PlaceSearchSerializer, PlaceTreeSerializer, PlaceNearbySerializer, PlaceUpdateSerializer
+from .search import NAME_COLUMNS, PlaceSearch, get_facets
+from .spatial import get_nearby
+from .tree import get_tree
 from universities.models import University, AcademicUnit
-from .permissions import PlaceOwnerOrAdminPermission, UniversityAdminPermission
+from .permissions import PlaceOwnerOrAdminPermission, UniversityAdminPermission, can_access_place_media
 import logging
 
 logger = logging.getLogger(__name__)
 
+
+def get_place_list_validators(view, request):
+    """Validators of the place lists and the tree, which show places with their type names and media."""
+    return tag_validators(['places', 'place-types'])
+
+
+def get_place_validators(view, request, pk):
+    """Validators of a place's detail response: the place, its parent and children, its media and place type names."""
+    row = Place.objects.filter(pk=pk, approval_status='approved').values_list('parent_id').first()
+    if row is None:
+        return None
+    return merge_validators(
+        queryset_validators(Place.objects.filter(Q(pk=pk) | Q(parent_id=pk) | Q(pk=row[0]))),
+        queryset_validators(PlaceMedia.objects.filter(place_id=pk), latest='uploaded_at'),
+        queryset_validators(PlaceType.objects.all())
+    )
+
 class PlaceListCreateView(generics.ListCreateAPIView):
     permission_classes = [AllowAny]
     pagination_class = LimitOffsetPagination
@@ -24,8 +48,15 @@ class PlaceListCreateView(generics.ListCreateAPIView):
     def get_permissions(self):
         return [AllowAny()] if self.request.method == 'GET' else [IsAuthenticated()]
 
+    @conditional_response(get_place_list_validators)
+    @cache_response(tags=['places', 'place-types'], timeout=300)
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
     def get_queryset(self):
-        return Place.objects.filter(approval_status='approved').select_related('university', 'academic_unit', 'place_type')
+        return Place.objects.filter(approval_status='approved').select_related(
+            'university', 'academic_unit', 'place_type'
+        ).prefetch_related('media__derivatives')
 
     def perform_create(self, serializer):
         with transaction.atomic():
@@ -38,14 +69,60 @@ class PlaceListCreateView(generics.ListCreateAPIView):
 class UniversityPlacesView(APIView):
     permission_classes = [AllowAny]
 
+    @conditional_response(get_place_list_validators)
+    @cache_response(tags=['places', 'place-types'], timeout=300)
     def get(self, request):
         root_places = Place.objects.filter(parent__isnull=True, approval_status='approved').select_related('university')
         serializer = PlaceSerializer(root_places, many=True, context={'request': request})
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+class PlaceTreeView(APIView):
+    permission_classes = [AllowAny]
+
+    @conditional_response(get_place_list_validators)
+    @cache_response(tags=['places', 'place-types'], timeout=300)
+    def get(self, request):
+        """
+        The approved places of ?university=<id> as a nested tree, read in one query.
+        ?depth=N stops N levels below the roots.
+        """
+        serializer = PlaceTreeSerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response({"error": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+        university_id = serializer.validated_data['university']
+        tree = get_tree(request, university_id, serializer.validated_data.get('depth'))
+        if not tree and not University.objects.filter(pk=university_id).exists():
+            return Response({"error": "University not found."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(tree, status=status.HTTP_200_OK)
+
+class PlaceNearbyView(APIView):
+    permission_classes = [AllowAny]
+
+    @cache_response(tags=['places', 'place-types'], timeout=300)
+    def get(self, request):
+        """
+        The approved places nearest to ?lat=&lng=, within ?radius= metres, nearest
+        first, with their distance. ?type= keeps one place type, ?limit= caps the list.
+        """
+        serializer = PlaceNearbySerializer(data=request.query_params)
+        if not serializer.is_valid():
+            return Response({"error": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
+        places = Place.objects.filter(approval_status='approved')
+        if data.get('type'):
+            try:
+                place_type = PlaceType.objects.get(name=data['type'].lower())
+                places = places.filter(place_type=place_type)
+            except PlaceType.DoesNotExist:
+                return Response({"error": "Place type not found."}, status=status.HTTP_404_NOT_FOUND)
+        nearby = get_nearby(request, places, data['lat'], data['lng'], data['radius'], data['limit'])
+        return Response(nearby, status=status.HTTP_200_OK)
+
 class PlaceDetailView(APIView):
     permission_classes = [AllowAny]
 
+    @conditional_response(get_place_validators)
+    @cache_response(tags=lambda view, request, pk: [f'place:{pk}', 'place-types'], timeout=300)
     def get(self, request, pk):
         try:
             place = Place.objects.get(pk=pk, approval_status='approved')
@@ -103,6 +180,10 @@ class PlaceRecursiveDeleteView(APIView):
     permission_classes = [IsAuthenticated, UniversityAdminPermission]
 
     def delete(self, request, pk):
+        """
+        Deletes a place with all places below it, their updates and media.
+        With ?dry_run=true, only reports how many places and media would go.
+        """
         try:
             place = Place.objects.get(pk=pk)
             if not UniversityAdminPermission().has_object_permission(request, self, place):
@@ -110,17 +191,14 @@ class PlaceRecursiveDeleteView(APIView):
                     {"error": "You do not have permission to perform recursive deletion."},
                     status=status.HTTP_403_FORBIDDEN
                 )
-            with transaction.atomic():
-                def delete_place_and_children(place):
-                    children = Place.objects.filter(parent=place)
-                    for child in children:
-                        delete_place_and_children(child)
-                    place_name = place.name
-                    place.delete()
-                    logger.info(f"Place '{place_name}' deleted recursively by {request.user.email}")
-
-                delete_place_and_children(place)
-                return Response({"message": "Place and all child places deleted successfully."}, status=status.HTTP_204_NO_CONTENT)
+            if request.query_params.get('dry_run', '').lower() in ('true', '1', 'yes'):
+                return Response(delete_subtree(place, dry_run=True), status=status.HTTP_200_OK)
+            counts = delete_subtree(place)
+            logger.info(
+                f"Place '{place.name}' deleted recursively with {counts['places']} places "
+                f"and {counts['media']} media by {request.user.email}"
+            )
+            return Response({"message": "Place and all child places deleted successfully."}, status=status.HTTP_204_NO_CONTENT)
         except Place.DoesNotExist:
             return Response({"error": "Place not found."}, status=status.HTTP_404_NOT_FOUND)
 
@@ -129,54 +207,52 @@ class PlaceSearchView(APIView):
     pagination_class = LimitOffsetPagination
 
     def get(self, request):
+        """
+        Approved places matching a general query (?raw_query=, or a bare ?library)
+        or the text fields ?name= and ?relative_location=, best match first.
+        ?university=, ?place_type= and ?academic_unit= filter either, and the
+        response counts the matches by each of them under "facets".
+        """
         serializer = PlaceSearchSerializer(data=request.query_params, context={'request': request})
         if serializer.is_valid():
             places = Place.objects.filter(approval_status='approved').select_related('university', 'academic_unit', 'place_type')
-            
+
+            if serializer.validated_data.get('university'):
+                try:
+                    university = University.objects.get(name=serializer.validated_data['university'])
+                    places = places.filter(university=university)
+                except University.DoesNotExist:
+                    return Response({"error": "University not found."}, status=status.HTTP_404_NOT_FOUND)
+            if serializer.validated_data.get('place_type'):
+                try:
+                    place_type = PlaceType.objects.get(name=serializer.validated_data['place_type'].lower())
+                    places = places.filter(place_type=place_type)
+                except PlaceType.DoesNotExist:
+                    return Response({"error": "Place type not found."}, status=status.HTTP_404_NOT_FOUND)
+            if serializer.validated_data.get('academic_unit'):
+                try:
+                    academic_unit = AcademicUnit.objects.get(name=serializer.validated_data['academic_unit'])
+                    places = places.filter(academic_unit=academic_unit)
+                except AcademicUnit.DoesNotExist:
+                    return Response({"error": "Academic unit not found."}, status=status.HTTP_404_NOT_FOUND)
+
+            search = PlaceSearch(places)
             raw_query = serializer.validated_data.get('raw_query')
             logger.debug(f"Processing raw query: {raw_query}")
             if raw_query:
-                places = places.filter(
-                    Q(name__icontains=raw_query) |
-                    Q(university__name__icontains=raw_query) |
-                    Q(university__short_name__icontains=raw_query) |
-                    Q(academic_unit__name__icontains=raw_query) |
-                    Q(academic_unit__short_name__icontains=raw_query)
-                )
-                logger.debug(f"Filtered places count: {places.count()}")
-            else:
-                if serializer.validated_data.get('university'):
-                    try:
-                        university = University.objects.get(name=serializer.validated_data['university'])
-                        places = places.filter(university=university)
-                    except University.DoesNotExist:
-                        return Response({"error": "University not found."}, status=status.HTTP_404_NOT_FOUND)
-                if serializer.validated_data.get('place_type'):
-                    try:
-                        place_type = PlaceType.objects.get(name=serializer.validated_data['place_type'].lower())
-                        places = places.filter(place_type=place_type)
-                    except PlaceType.DoesNotExist:
-                        return Response({"error": "Place type not found."}, status=status.HTTP_404_NOT_FOUND)
-                if serializer.validated_data.get('name'):
-                    name_query = serializer.validated_data['name']
-                    places = places.filter(
-                        Q(name__icontains=name_query) |
-                        Q(university__short_name__icontains=name_query) |
-                        Q(academic_unit__short_name__icontains=name_query)
-                    )
-                if serializer.validated_data.get('relative_location'):
-                    places = places.filter(relative_location__icontains=serializer.validated_data['relative_location'])
-                if serializer.validated_data.get('academic_unit'):
-                    try:
-                        academic_unit = AcademicUnit.objects.get(name=serializer.validated_data['academic_unit'])
-                        places = places.filter(academic_unit=academic_unit)
-                    except AcademicUnit.DoesNotExist:
-                        return Response({"error": "Academic unit not found."}, status=status.HTTP_404_NOT_FOUND)
+                search.require_query(raw_query)
+            if serializer.validated_data.get('name'):
+                search.require(serializer.validated_data['name'], NAME_COLUMNS)
+            if serializer.validated_data.get('relative_location'):
+                search.require(serializer.validated_data['relative_location'], ['relative_location'])
+            results, matches = search.run()
 
             paginator = self.pagination_class()
-            paginated_places = paginator.paginate_queryset(places, request)
+            paginated_places = paginator.paginate_queryset(results, request)
             serializer = PlaceSerializer(paginated_places, many=True, context={'request': request})
-            return paginator.get_paginated_response(serializer.data)
+            response = paginator.get_paginated_response(serializer.data)
+            response.data['facets'] = get_facets(matches)
+            return response
         return Response({"error": serializer.errors}, status=status.HTTP_400_BAD_REQUEST)
 
 class PlaceTypeListView(APIView):
@@ -193,25 +269,19 @@ class MediaAccessView(APIView):
     def get(self, request, pk):
         try:
             media = PlaceMedia.objects.get(id=pk)
-            if media.place and media.place.approval_status != 'approved':
-                return Response({"error": "Media not accessible; place is not approved."}, status=status.HTTP_403_FORBIDDEN)
-            if media.place_update and media.place_update.approval_status != 'approved':
-                if not (request.user.is_authenticated and (
-                    request.user == media.place_update.updated_by or
-                    request.user.admin_level in ['university', 'app']
-                )):
-                    return Response({"error": "Media not accessible; update is not approved."}, status=status.HTTP_403_FORBIDDEN)
-            file_path = media.file.path
-            content_type = 'application/octet-stream'
-            if file_path.endswith(('.jpg', '.jpeg')):
-                content_type = 'image/jpeg'
-            elif file_path.endswith('.png'):
-                content_type = 'image/png'
-            elif file_path.endswith('.mp4'):
-                content_type = 'video/mp4'
-            elif file_path.endswith('.mov'):
-                content_type = 'video/quicktime'
-            return FileResponse(open(file_path, 'rb'), content_type=content_type)
+            if not can_access_place_media(media, request.user):
+                return Response(
+                    {"error": "Media not accessible; place or update is not approved."},
+                    status=status.HTTP_403_FORBIDDEN
+                )
+            size = request.query_params.get('size')
+            if size is not None and size not in DERIVATIVE_SIZES:
+                return Response(
+                    {"error": f"Invalid size. Use one of: {', '.join(DERIVATIVE_SIZES)}."},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            media_file = get_media_file(media, size)
+            return serve_media(request, media_file.name, media_file.storage)
         except PlaceMedia.DoesNotExist:
             return Response({"error": "Media not found."}, status=status.HTTP_404_NOT_FOUND)
         except FileNotFoundError:
@@ -226,9 +296,9 @@ class PendingPlaceUpdatesView(APIView):
         if user.admin_level == 'university':
             updates = PlaceUpdate.objects.filter(
                 university=user.university, approval_status='pending'
-            ).select_related('place', 'university')
+            ).select_related('place', 'university').prefetch_related('media__derivatives')
         else:
-            updates = PlaceUpdate.objects.filter(approval_status='pending').select_related('place', 'university')
+            updates = PlaceUpdate.objects.filter(approval_status='pending').select_related('place', 'university').prefetch_related('media__derivatives')
         paginator = self.pagination_class()
         paginated_updates = paginator.paginate_queryset(updates, request)
         serializer = PlaceUpdateSerializer(paginated_updates, many=True, context={'request': request})
@@ -1,7 +1,7 @@
 from rest_framework import serializers
 from .models import University, AcademicUnit, TeacherDesignation
 from places.models import Place
-from django.urls import reverse
+from campus_connect.links import get_link_builder
 
 class UniversitySerializer(serializers.ModelSerializer):
     place_url = serializers.SerializerMethodField()
@@ -18,7 +18,7 @@ class UniversitySerializer(serializers.ModelSerializer):
             university=obj, parent__isnull=True, approval_status='approved'
         ).first()
         if root_place:
-            return request.build_absolute_uri(reverse('places:place-detail', kwargs={'pk': root_place.pk}))
+            return get_link_builder(request).url('places:place-detail', root_place.pk)
         return None
 
 class AcademicUnitSerializer(serializers.ModelSerializer):
@@ -42,7 +42,7 @@ class AcademicUnitSerializer(serializers.ModelSerializer):
             academic_unit=obj, parent__isnull=True, approval_status='approved'
         ).first()
         if root_place:
-            return request.build_absolute_uri(reverse('places:place-detail', kwargs={'pk': root_place.pk}))
+            return get_link_builder(request).url('places:place-detail', root_place.pk)
         return None
 
     def to_representation(self, instance):